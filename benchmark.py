@@ -0,0 +1,185 @@
+"""
+Holy War End-to-End Benchmark
+Runs HolyWarBot.run() against the local mock server and reports throughput
+and resource use, so performance changes can be measured without the live site.
+
+The mock server runs in a child process so its CPU time isn't counted against
+the bots. By default the bots run on a SimulatedClock: instead of
+sleeping until a plunder or cooldown deadline, they jump the clock (and the
+mock server's game clock) forward to it and carry on, so a run covers many
+hours of game time in a few minutes. Reported numbers:
+
+    cycles/game hour   main loop iterations per hour of game time (bot decisions)
+    cycles/wall hour   main loop iterations per hour of real time (bot overhead)
+    requests/cycle     requests the mock server received per cycle
+    gold/100 requests  plunder and elixir income per 100 requests (e.g. planned
+                       vs fixed plunder lengths, see --fixed-plunder)
+    CPU, RSS           Python process plus its browser processes, per bot
+
+Usage:
+    python3 benchmark.py [--minutes 5] [--bots 1] [--real-time] [--fixed-plunder 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from playwright.async_api import async_playwright
+from clock import SimulatedClock
+from holy_war_bot import build_bot, logger
+
+
+def mock_request(server_url: str, path: str, data: bytes = None) -> dict:
+    with urllib.request.urlopen(server_url + path, data=data, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_usage(root_pid: int, exclude=()):
+    """Return (cpu seconds, rss bytes) of a process and all its descendants (Linux /proc)
+
+    Processes in `exclude` (and their descendants) are left out. Falls back to the process itself (getrusage) where /proc isn't available.
+    """
+    if not os.path.isdir("/proc"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime + usage.ru_stime, usage.ru_maxrss * 1024
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    processes = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields after it are space-separated
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[1] = ppid, [11] = utime, [12] = stime, [21] = rss (pages)
+        processes[int(entry)] = (int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[21]))
+    tree = {root_pid}
+    added = True
+    while added:
+        added = False
+        for pid, (ppid, _, _) in processes.items():
+            if ppid in tree and pid not in tree and pid not in exclude:
+                tree.add(pid)
+                added = True
+    cpu_ticks = sum(processes[pid][1] for pid in tree if pid in processes)
+    rss_pages = sum(processes[pid][2] for pid in tree if pid in processes)
+    return cpu_ticks / ticks, rss_pages * page_size
+
+
+async def run_benchmark(minutes: float, bots: int, fast_forward: bool = True, headless: bool = True,
+                        fixed_plunder_minutes: int = None):
+    port = free_port()
+    server_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "mock_server.py", "--port", str(port)],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.DEVNULL)
+    workdir = tempfile.mkdtemp(prefix="holywar-bench-")
+    playwright = await async_playwright().start()
+    browser = None
+    try:
+        for _ in range(50):
+            try:
+                mock_request(server_url, "/__mock__/stats/")
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+
+        clock = None
+        if fast_forward:
+            async def advance_server(seconds: float):
+                await asyncio.to_thread(mock_request, server_url, f"/__mock__/advance/?seconds={seconds}", b"")
+            clock = SimulatedClock(on_advance=advance_server)
+        instances = []
+        for i in range(bots):
+            username = f"bench{i + 1}"
+            bot = build_bot(username, "secret", "17IN", overrides={
+                'base_url': server_url,
+                'stats_dir': os.path.join(workdir, username),
+                'opponent_index_path': os.path.join(workdir, "opponents.db"),
+                'metrics_port': None,
+                'session_path': None,
+                **({'plan_plunder_duration': False, 'plunder_duration_minutes': fixed_plunder_minutes}
+                   if fixed_plunder_minutes else {}),
+            })
+            if clock is not None:
+                bot.use_clock(clock)
+            instances.append(bot)
+
+        browser = await playwright.firefox.launch(headless=headless)
+        cpu_before, _ = process_tree_usage(os.getpid(), exclude={server.pid})
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(bot.run(browser=browser)) for bot in instances]
+        _, pending = await asyncio.wait(tasks, timeout=minutes * 60)
+        wall_seconds = time.perf_counter() - started
+        cpu_after, rss = process_tree_usage(os.getpid(), exclude={server.pid})
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        stats = mock_request(server_url, "/__mock__/stats/")
+    finally:
+        if browser:
+            await browser.close()
+        await playwright.stop()
+        server.terminate()
+        server.wait()
+
+    game_seconds = wall_seconds + (clock.offset if clock else 0)
+    cycles = sum(bot.cycles for bot in instances)
+    cpu_seconds = cpu_after - cpu_before
+    print("=== Holy War benchmark (mock server) ===")
+    print(f"Bots: {bots}, wall time: {wall_seconds:.0f}s, game time: {game_seconds / 3600:.1f}h"
+          f"{' (fast-forwarded)' if fast_forward else ''}")
+    print(f"Plunder length: {f'fixed {fixed_plunder_minutes} min' if fixed_plunder_minutes else 'planned'}")
+    gold = 0
+    for bot in instances:
+        stats_path = os.path.join(bot.stats_dir, "bot_stats.json")
+        totals = {}
+        if os.path.exists(stats_path):
+            with open(stats_path) as f:
+                totals = json.load(f)
+        gold += totals.get('total_gold_earned', 0)
+        print(f"  {bot.username}: {bot.cycles} cycles, {sum(bot.metrics.requests.values())} browser requests, "
+              f"{totals.get('plunder_count', 0)} plunders, {totals.get('total_gold_earned', 0)} gold earned")
+    print(f"Cycles/game hour per bot: {cycles / bots / (game_seconds / 3600):.1f}")
+    print(f"Cycles/wall hour per bot: {cycles / bots / (wall_seconds / 3600):.1f}")
+    print(f"Requests/cycle: {stats['requests'] / cycles:.1f}" if cycles else "Requests/cycle: n/a (no cycle completed)")
+    print(f"Gold/100 requests: {gold / stats['requests'] * 100:.1f}" if stats['requests'] else "Gold/100 requests: n/a")
+    print(f"Requests by path: {stats['requests_by_path']}")
+    print(f"CPU per bot: {cpu_seconds / bots:.1f}s ({cpu_seconds / wall_seconds * 100 / bots:.1f}% of one core)")
+    print(f"RSS per bot: {rss / bots / 1024 / 1024:.0f} MiB (Python + Firefox processes, shared browser split evenly)")
+    for bot in instances:
+        report = bot.metrics.report()
+        if report:
+            logger.info(f"{bot.username} action timings:\n{report}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HolyWarBot.run() against the local mock server")
+    parser.add_argument("--minutes", type=float, default=5, help="Wall-clock duration of the run")
+    parser.add_argument("--bots", type=int, default=1, help="Number of accounts run in one browser")
+    parser.add_argument("--real-time", action="store_true", help="Really wait for plunders and cooldowns")
+    parser.add_argument("--headed", action="store_true", help="Show the Firefox window")
+    parser.add_argument("--fixed-plunder", type=int, metavar="MINUTES",
+                        help="Baseline: plunder this long every time instead of planning each plunder")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.minutes, args.bots, fast_forward=not args.real_time, headless=not args.headed,
+                              fixed_plunder_minutes=args.fixed_plunder))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Holy War Clock
+Every time source of the bot goes through a Clock, so time can be simulated.
+
+Clock is real time. SimulatedClock runs at wall-clock speed but never sleeps:
+a sleep or deadline wait moves its time forward by the requested amount and
+returns at once, so plunders, cooldowns and the daily allowance go by in
+seconds. Bots sharing a simulated clock only jump to deadlines that haven't
+passed yet, so their waits don't add up. A callback can forward each jump to a
+stand-in server (see mock_server.py's /__mock__/advance endpoint) so both
+sides agree on the time.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+
+class Clock:
+    """Wall-clock time"""
+
+    simulated = False
+
+    def now(self) -> datetime:
+        """Local time (replaces datetime.now())"""
+        return datetime.now()
+
+    def time(self) -> float:
+        """Unix timestamp (replaces time.time())"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Monotonic seconds for measuring ages (replaces time.monotonic())"""
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        """Sleep (replaces asyncio.sleep())"""
+        await asyncio.sleep(seconds)
+
+    async def sleep_until(self, due: datetime):
+        """Sleep until a local time"""
+        await self.sleep(max(0.0, (due - self.now()).total_seconds()))
+
+
+class SimulatedClock(Clock):
+    """Wall-clock time plus every wait skipped so far
+
+    Args:
+        on_advance: Optional coroutine function called with the seconds skipped
+                    on each jump (e.g. to move a mock server's game clock along)
+    """
+
+    simulated = True
+
+    def __init__(self, on_advance=None):
+        self.offset = 0.0
+        self.on_advance = on_advance
+
+    def now(self) -> datetime:
+        return datetime.now() + timedelta(seconds=self.offset)
+
+    def time(self) -> float:
+        return time.time() + self.offset
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.offset
+
+    async def advance(self, seconds: float):
+        """Jump forward without waiting"""
+        if seconds <= 0:
+            return
+        self.offset += seconds
+        if self.on_advance is not None:
+            await self.on_advance(seconds)
+
+    async def sleep(self, seconds: float):
+        await self.sleep_until(self.now() + timedelta(seconds=seconds))
+
+    async def sleep_until(self, due: datetime):
+        # Only jump as far as the deadline: when several bots share the clock,
+        # a deadline another bot's jump has already passed costs nothing
+        await self.advance((due - self.now()).total_seconds())
+        await asyncio.sleep(0)  # Still yield to the other tasks
+
+
+# Shared by every bot in the process unless one is given its own
+default_clock = Clock()
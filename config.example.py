@@ -11,12 +11,70 @@ MIN_GOLD_RESERVE = 10       # Minimum gold to keep at all times
 ELIXIR_THRESHOLD = 100      # Buy elixirs when gold exceeds this (and can't train)
 
 # Plunder settings
-PLUNDER_DURATION_MINUTES = 10  # Duration of each plunder (10, 20, 30, 40, 50, or 60)
+PLUNDER_DURATION_MINUTES = 10  # Duration of each plunder (10, 20, 30, 40, 50, or 60) when not planned
+PLAN_PLUNDER_DURATION = True   # Choose each plunder's length from the time left today, the daily reset and training costs
 
 # Attack settings
 TARGET_PLAYER_LEVEL = 1     # Level of players to attack when no plunder time
-ATTACK_COOLDOWN_MINUTES = 5 # Wait time between attacks
+ATTACK_COOLDOWN_MINUTES = 5 # Wait between attacks when the page shows no countdown (normally the server's countdown is used)
+SCOUT_AHEAD = True          # Find the next opponent during the plunder wait before attacking
+MIN_WIN_PROBABILITY = 0.5   # Attack opponents the win model gives more than this chance (0.5 = lower stat total, untrained)
+WIN_MODEL_PATH = "win_model.json"  # Trained with: python3 win_model.py train (missing file = stat total ratio)
 
 # Browser settings
 HEADLESS = False            # Set to True to run browser in background
 
+# Performance settings
+HTTP_FAST_PATH = True       # Read status pages over HTTP (shares the browser's cookies) instead of navigating Firefox
+PROGRESS_BARS = None        # True/False to force progress bars on/off, None = only when running in a terminal
+PROGRESS_REFRESH_SECONDS = 5  # How often progress bars are redrawn
+DAILY_RESET_HOUR = 0        # Local hour at which the daily plunder time resets
+WAIT_TIMEOUTS = {}          # Per-condition wait timeouts in ms, e.g. {"gold": 8000, "counter": 10000, "load": 15000}
+NAV_RETRY = {}              # Per failure class retry overrides, e.g. {"timeout": {"attempts": 5, "base_seconds": 2, "max_seconds": 60}}
+CIRCUIT_BREAKER = {}        # e.g. {"failure_threshold": 5, "open_seconds": 60, "max_open_seconds": 900}
+PAGE_CACHE_MAX_AGE_SECONDS = 30  # Reuse an unchanged page snapshot instead of reloading it for this long
+BLOCK_RESOURCES = None      # Skip images/fonts/media/stylesheets (True/False, None = only when HEADLESS)
+BLOCKED_RESOURCE_TYPES = ["image", "font", "media", "stylesheet"]
+BLOCK_THIRD_PARTY = True    # Abort requests to hosts other than holy-war.net
+READ_ONLY_JAVASCRIPT = True # False = browser fallback for read-only pages uses a JavaScript-disabled context
+
+# Multi-account mode (optional)
+# When ACCOUNTS is set, every account runs in its own context of one shared Firefox.
+# "world" defaults to WORLD; any other key overrides that bot's setting.
+# ACCOUNTS = [
+#     {"username": "account_one", "password": "secret1"},
+#     {"username": "account_two", "password": "secret2", "world": "17IN", "target_player_level": 2},
+# ]
+LOGIN_STAGGER_SECONDS = 20  # Delay between account logins in multi-account mode
+LOG_DIR = "logs"            # Per-account log files in multi-account mode
+
+# Logging (written by a background thread, see log_pipeline.py)
+LOG_FILE = "bot.log"        # Main log file, rotated by size; None = console only
+LOG_CONSOLE = None          # Also log to stdout: True/False, None = only when running in a terminal
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate the log files at this size
+LOG_BACKUP_COUNT = 5        # Rotated files kept per log (gzipped: bot.log.1.gz, ...)
+# LOG_RATE_LIMITS = {"Current gold:": 60, "Plunder time remaining:": 60}  # Line prefix -> min seconds between repeats
+
+# Debug captures (anomalous pages and the actions before them, see debug_capture.py)
+CAPTURE_DIR = None          # None = "captures" next to the stats files
+CAPTURE_MAX = 20            # Captures kept; the oldest are deleted first
+CAPTURE_MAX_BYTES = 20 * 1024 * 1024  # Disk space the captures may use
+CAPTURE_SCREENSHOTS = False # Also keep a full-page screenshot (costs a browser round trip per capture)
+
+# Opponent index
+OPPONENT_INDEX_PATH = "opponents.db"  # SQLite file with every opponent seen (can be shared by all accounts)
+OPPONENT_TTL_HOURS = 24     # Opponent stats older than this are looked at again
+
+# Stats
+STATS_DIR = "."  # Where bot_stats.json, bot_state.json and the bot_journal.jsonl stats journal are written
+
+# Metrics
+METRICS_PORT = None  # e.g. 9101: serve latency histograms at http://127.0.0.1:9101/metrics (multi-account: 9101, 9102, ...)
+
+# Hibernation: free the browser's memory during long plunder/cooldown waits
+HIBERNATE = None  # "context" (close this account's context) or "browser" (close Firefox too; single account only)
+HIBERNATE_AFTER_MINUTES = 5  # Only waits longer than this hibernate
+HIBERNATE_WAKE_SECONDS = 30  # Reopen the browser this long before the wait ends (the session is restored, no login)
+
+# Sessions
+SESSION_DIR = ".sessions"  # Login cookies saved per account (<username>.json) so a restart skips the login; None = off
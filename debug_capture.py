@@ -0,0 +1,222 @@
+"""
+Holy War Debug Capture
+Keeps the last anomalous pages (an attack without a cooldown, a page without
+gold or opponent stats) for later diagnosis, without slowing the bot down.
+
+capture() only puts the page on a short queue and returns; a background
+thread compresses it and writes one gzipped JSON file per capture into the
+capture directory. The directory is a ring: past max_captures files or
+max_bytes on disk the oldest captures are deleted. If the writer falls behind,
+new captures are dropped (and counted) instead of waiting. If the writer fails
+(e.g. the directory can't be created), captures are off for the rest of the
+run and every later capture is dropped.
+
+Each capture holds:
+    time, account, reason, url   what happened where
+    trace                        the bot's last actions and browser ops
+                                 (name, start time, seconds, failed), oldest first
+    html                         the page source
+    screenshot                   base64 PNG, if screenshots are on
+
+Usage:
+    python3 debug_capture.py [DIR]                  list the captures, newest last
+    python3 debug_capture.py [DIR] --html N > p.html   page source of capture N
+    python3 debug_capture.py [DIR] --screenshot N p.png
+    python3 debug_capture.py [DIR] --trace N
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from clock import Clock, default_clock
+
+DEFAULT_MAX_CAPTURES = 20
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_QUEUE_SIZE = 4
+CLOSE_TIMEOUT_SECONDS = 10  # close() waits this long for the writer, then gives up
+
+CAPTURE_NAME_RE = re.compile(r"^(\d+)-[\w-]+\.json\.gz$")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w-]+", "-", text).strip("-")[:40] or "capture"
+
+
+class DebugCapture:
+    """Bounded on-disk ring of compressed page captures, written off the event loop
+
+    Args:
+        directory: Where the capture files live
+        account: Account name stored with every capture
+        max_captures: Most captures kept
+        max_bytes: Most bytes the captures may take on disk
+        queue_size: Captures waiting to be written before new ones are dropped
+        logger: Logger for write errors and drops
+        clock: Time source for the capture timestamps
+    """
+
+    def __init__(self, directory: str, account: str = "", max_captures: int = DEFAULT_MAX_CAPTURES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 logger: logging.Logger = None, clock: Clock = None):
+        self.directory = directory
+        self.account = account
+        self.clock = clock or default_clock
+        self.max_captures = max_captures
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._failed = False  # The writer gave up; captures are dropped
+        self._files = []  # [(sequence, path, size)] on disk, oldest first
+        self._sequence = 0
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="debug-capture", daemon=True)
+            self._thread.start()
+
+    def capture(self, reason: str, html: str, url: str = "", trace=(), screenshot: bytes = None) -> bool:
+        """Queue one capture; never blocks. Returns False if it was dropped."""
+        if self._failed:
+            self.dropped += 1
+            return False
+        record = {
+            'time': self.clock.now().isoformat(timespec='seconds'),
+            'account': self.account,
+            'reason': reason,
+            'url': url,
+            'trace': list(trace),
+            'html': html,
+        }
+        if screenshot is not None:
+            record['screenshot'] = screenshot
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.logger.debug(f"Debug capture queue full, dropped capture ({reason})")
+            return False
+
+    def _scan(self):
+        """Pick up the captures already on disk (from earlier runs)"""
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            match = CAPTURE_NAME_RE.match(name)
+            if match:
+                path = os.path.join(self.directory, name)
+                self._files.append((int(match.group(1)), path, os.path.getsize(path)))
+        self._files.sort()
+        self._sequence = self._files[-1][0] if self._files else 0
+
+    def _write(self, record: dict):
+        if 'screenshot' in record:
+            record['screenshot'] = base64.b64encode(record['screenshot']).decode('ascii')
+        self._sequence += 1
+        path = os.path.join(self.directory, f"{self._sequence:06d}-{_slug(record['reason'])}.json.gz")
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+        self._files.append((self._sequence, path, os.path.getsize(path)))
+        self.written += 1
+        # Evict the oldest captures past either bound (the newest one always stays)
+        while len(self._files) > 1 and (len(self._files) > self.max_captures
+                                        or sum(size for _, _, size in self._files) > self.max_bytes):
+            _, old_path, _ = self._files.pop(0)
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _writer(self):
+        try:
+            self._scan()
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                try:
+                    self._write(record)
+                except Exception as e:
+                    self.logger.warning(f"Could not write debug capture: {e}")
+        except Exception as e:
+            self.logger.error(f"Debug capture writer failed, captures off: {e}")
+            self._fail()
+
+    def _fail(self):
+        """Turn captures off and discard what is queued, so nothing waits on the writer"""
+        self._failed = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self.dropped += 1
+
+    def close(self, timeout: float = CLOSE_TIMEOUT_SECONDS):
+        """Write out the queued captures and stop the writer (blocks at most about `timeout` seconds)"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("Debug capture writer did not finish; unwritten captures are lost")
+        self._thread = None
+
+
+def list_captures(directory: str):
+    """Capture files in the directory, oldest first"""
+    names = [name for name in os.listdir(directory) if CAPTURE_NAME_RE.match(name)]
+    names.sort(key=lambda name: int(CAPTURE_NAME_RE.match(name).group(1)))
+    return [os.path.join(directory, name) for name in names]
+
+
+def load_capture(path: str) -> dict:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the debug captures of a bot")
+    parser.add_argument("directory", nargs="?", default="captures", help="Capture directory")
+    parser.add_argument("--html", type=int, metavar="N", help="Print the page source of capture N")
+    parser.add_argument("--trace", type=int, metavar="N", help="Print the action trace of capture N")
+    parser.add_argument("--screenshot", nargs=2, metavar=("N", "PATH"), help="Save the screenshot of capture N")
+    args = parser.parse_args()
+
+    paths = {int(CAPTURE_NAME_RE.match(os.path.basename(path)).group(1)): path
+             for path in list_captures(args.directory)}
+    if args.html is not None:
+        print(load_capture(paths[args.html])['html'])
+    elif args.trace is not None:
+        for step in load_capture(paths[args.trace])['trace']:
+            print(f"{step['started']}  {step['kind']:<6} {step['name']:<24} {step['seconds']:8.3f}s"
+                  f"{'  FAILED' if step['failed'] else ''}")
+    elif args.screenshot:
+        record = load_capture(paths[int(args.screenshot[0])])
+        if 'screenshot' not in record:
+            raise SystemExit("Capture has no screenshot")
+        with open(args.screenshot[1], 'wb') as f:
+            f.write(base64.b64decode(record['screenshot']))
+    else:
+        for number, path in paths.items():
+            record = load_capture(path)
+            print(f"{number:6d}  {record['time']}  {record['account']:<16} {record['reason']:<28} {record['url']}"
+                  f"  ({os.path.getsize(path) / 1024:.0f} KB{', screenshot' if 'screenshot' in record else ''})")
+
+
+if __name__ == "__main__":
+    main()
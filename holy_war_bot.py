@@ -4,60 +4,57 @@ Automates gameplay including plundering, training, buying elixirs, and attacking
 """
 
 import asyncio
+import json
+import os
+import re
 import time
 from datetime import datetime, timedelta
 from playwright.async_api import async_playwright, Page, Browser, Playwright
 import logging
 import config
-from tqdm import tqdm
+from waits import ReadinessWaiter
+from navigation import NavigationManager, ATTACK_PAGE, ATTRIBUTES_PAGE, ALCHEMIST_PAGE
+from opponent_index import OpponentIndex, opponent_key
+from win_model import WinModel, DEFAULT_THRESHOLD
+from planners import plan_training, plan_elixir_basket, plan_plunder, stat_label, PLUNDER_DURATIONS
+from metrics import MetricsRegistry, MetricsServer, timed_action
+from stats_ledger import StatsLedger, STAT_KEYS
+from resource_policy import ResourcePolicy, DEFAULT_BLOCKED_TYPES
+from page_parser import PageState
+from scheduler import DeadlineScheduler, default_scheduler, next_daily_reset
+from clock import Clock, default_clock
+from log_pipeline import LOG_FORMAT, setup_logging, shutdown_logging
+from retry_policy import NavigationGuard, NavigationError, ServerError, backoff_seconds, breaker_for
+from debug_capture import DebugCapture, DEFAULT_MAX_CAPTURES, DEFAULT_MAX_BYTES as DEFAULT_CAPTURE_BYTES
 
-# Setup logging
+# Pages the login form redirects to on success
+LOGGED_IN_URL_RE = re.compile(r"/welcome|/char/attributes")
+
+# Training is planned and re-verified at most this many times per call
+MAX_TRAINING_ROUNDS = 5
+
+# Scouting during a wait takes at most half the wait and never longer than this
+MAX_SCOUT_SECONDS = 120
+
+# Plain console logging for imports (benchmarks, debug scripts); main() switches
+# to the background pipeline (see log_pipeline.py)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format=LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
 
-async def wait_with_progress_bar(minutes: int, description: str, total_duration_minutes: int = None):
-    """Wait with a visual progress bar showing remaining time
-    
-    Args:
-        minutes: Time to wait in minutes
-        description: Description for the progress bar
-        total_duration_minutes: Total duration in minutes (for calculating percentage). 
-                               If provided, shows progress relative to total duration.
-    """
-    wait_seconds = minutes * 60
-    
-    # Print top border
-    print("\n" + "="*80)
-    
-    if total_duration_minutes:
-        # Calculate progress relative to total duration
-        total_seconds = total_duration_minutes * 60
-        elapsed_seconds = total_seconds - wait_seconds
-        
-        with tqdm(total=total_seconds, desc=description, unit="s", 
-                 bar_format='║ {desc}: {bar} {percentage:3.0f}% | {n_fmt}/{total_fmt}s ║',
-                 initial=elapsed_seconds,
-                 ncols=78,
-                 leave=True) as pbar:
-            for i in range(wait_seconds):
-                await asyncio.sleep(1)
-                pbar.update(1)
-    else:
-        # Standard progress bar (0% to 100% for the wait time)
-        with tqdm(total=wait_seconds, desc=description, unit="s", 
-                 bar_format='║ {desc}: {bar} {percentage:3.0f}% | {n_fmt}/{total_fmt}s ║',
-                 ncols=78,
-                 leave=True) as pbar:
-            for i in range(wait_seconds):
-                await asyncio.sleep(1)
-                pbar.update(1)
-    
-    # Print bottom border (after progress bar completes)
-    print("="*80)
+def save_private_json(path: str, data):
+    """Write JSON readable only by the owner (the session file holds login cookies)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
 
 
 class HolyWarBot:
@@ -70,65 +67,308 @@ class HolyWarBot:
         self.browser: Browser = None
         self.playwright: Playwright = None
         self.context = None
+        self.reader_context = None  # JavaScript-disabled context for read-only page loads
+        self.reader_page: Page = None
+        self.resource_policy: ResourcePolicy = None
+        self._owns_browser = True
+        self.page_state: PageState = None  # Snapshot of the browser page after the last navigation/click
+        
+        # Per-account logger (child of the module logger, so records still reach the console)
+        self.logger = logging.getLogger(f"{logger.name}.{username}")
         
         # Configuration
         self.min_gold_reserve = 10
         self.elixir_threshold = 100
-        self.plunder_duration_minutes = 10
+        self.plunder_duration_minutes = 10  # Length of every plunder when plan_plunder_duration is off
+        self.plan_plunder_duration = True  # Choose each plunder's length with planners.plan_plunder
         self.attack_cooldown_minutes = 5
         self.target_player_level = 3  # Configurable
+        self.daily_reset_hour = 0  # Local hour at which the daily plunder time resets
+        self.use_http_fast_path = True  # Read-only status pages via HTTP instead of page navigation
+        self.http_timeout_ms = 15000
+        self.block_resources = None  # Block images/CSS/fonts/media/third-party (None = only when headless)
+        self.blocked_resource_types = DEFAULT_BLOCKED_TYPES
+        self.block_third_party = True
+        self.read_only_javascript = True  # False = load read-only pages in a JS-disabled context
         
         # State tracking
         self.plunder_time_remaining = 120  # Start with 2 hours (120 minutes)
+        self.training_cost_step = None  # Observed cost increase per trained point (None = not seen yet)
+        self.training_costs = []  # Training costs last seen on the attributes page
+        self.plunder_minutes = None  # Length of the running plunder
+        self.plunder_gold_per_minute = None  # Observed plunder payout (moving average)
         self.last_plunder_time = None
         self.last_attack_time = None
+        self.plunder_ends_at = None  # Absolute deadline of the running plunder
+        self.attack_ready_at = None  # Absolute deadline of the attack cooldown
+        self.cycles = 0  # Main loop iterations, for benchmarks
+        self.clock = default_clock  # Every time source of the bot (see use_clock)
+        self.scheduler = default_scheduler
+        self.metrics = MetricsRegistry(username)
+        self.metrics_port = None  # Serve the metrics on this localhost port (None = off)
+        self.metrics_server: MetricsServer = None
+        self.guard = NavigationGuard(logger=self.logger)  # Retries, backoff and the host's circuit breaker
+        self.circuit_breaker_settings = {}  # failure_threshold, open_seconds, max_open_seconds
+        self.waits = ReadinessWaiter(logger=self.logger, metrics=self.metrics, guard=self.guard)
+        self.navigation = NavigationManager()
+        self.opponent_index_path = "opponents.db"
+        self.opponent_ttl_seconds = 24 * 3600
+        self._opponent_index: OpponentIndex = None
+        self.win_model_path = "win_model.json"  # Trained by win_model.py; without it the model is the total ratio
+        self.min_win_probability = DEFAULT_THRESHOLD  # Attack opponents with a higher win chance than this
+        self._win_model: WinModel = None
+        self.my_level = None  # Own level, last seen on the attributes page
+        self.stats_dir = "."  # Where bot_stats.json, bot_state.json and the stats journal live
+        self.ledger: StatsLedger = None
+        self.plunder_start_gold = None  # Gold when the running plunder started
+        self.headless = False
+        self.hibernate = None  # "context" or "browser": close it during long waits (None = off)
+        self.hibernate_after_seconds = 300  # Only waits longer than this hibernate
+        self.hibernate_wake_seconds = 30  # Reopen this long before the deadline
+        self._hibernated_state = None
+        self.session_path = None  # Cookies/storage of the last session, reused across restarts (None = off)
+        self._session_restored = False
+        self.startup_timings = {}  # Startup step -> seconds
+        self.scout_ahead = True  # Find the next opponent during waits before the attack phase
+        self.scouted_target = None  # Opponent found by scout_opponent(), attacked next
+        self.capture_dir = None  # Debug captures of anomalous pages (None = <stats_dir>/captures)
+        self.capture_max = DEFAULT_MAX_CAPTURES
+        self.capture_max_bytes = DEFAULT_CAPTURE_BYTES
+        self.capture_screenshots = False  # Also screenshot the page (a browser round trip per capture)
+        self.captures = None
+        
+    async def start(self, headless=False, browser: Browser = None):
+        """Initialize browser and start bot
         
-    async def start(self, headless=False):
-        """Initialize browser and start bot"""
+        Args:
+            headless: Run Firefox without a window (ignored when browser is given)
+            browser: An already running browser to share with other bots (multi-account
+                     mode). The bot only creates its own context in it and leaves the
+                     browser running when it stops.
+        """
         try:
-            logger.info("Starting Playwright...")
-            self.playwright = await async_playwright().start()
+            self.headless = headless
+            self.startup_timings = {}
+            started = time.perf_counter()
+            if self.guard.breaker is None:
+                # Shared with every other account on the same game host
+                self.guard.breaker = breaker_for(self.base_url, clock=self.clock, **self.circuit_breaker_settings)
+            storage_state = self._load_session()
             
-            logger.info("Launching Firefox browser...")
-            # Launch browser with minimal options first
-            # Using Firefox instead of Chromium due to macOS compatibility issues
-            self.browser = await self.playwright.firefox.launch(
-                headless=headless,
-                timeout=60000  # 60 second timeout
-            )
+            block_resources = headless if self.block_resources is None else self.block_resources
+            if block_resources:
+                self.resource_policy = ResourcePolicy(
+                    self.base_url,
+                    blocked_types=self.blocked_resource_types,
+                    block_third_party=self.block_third_party,
+                    logger=self.logger
+                )
             
-            logger.info("Creating browser context...")
-            # Create a browser context explicitly with network settings
-            self.context = await self.browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                ignore_https_errors=True,
-                java_script_enabled=True
-            )
+            # Firefox takes the longest; meanwhile check the saved session over
+            # plain HTTP and replay the stats journal
+            ledger = asyncio.ensure_future(self._timed_step("ledger", asyncio.to_thread(self._open_ledger)))
+            steps = [ledger]
+            if browser is None:
+                await self._timed_step("playwright", self._start_playwright())
+                steps.append(self._timed_step("browser", self._launch_browser()))
+                if storage_state is not None:
+                    steps.append(self._timed_step("session check", self._check_saved_session(storage_state)))
+                self._owns_browser = True
+            else:
+                self.browser = browser
+                self._owns_browser = False
+            results = await asyncio.gather(*steps)
+            self.ledger = results[0]
+            if self.captures is None:
+                self.captures = DebugCapture(self.capture_dir or os.path.join(self.stats_dir, "captures"),
+                                             account=self.username, max_captures=self.capture_max,
+                                             max_bytes=self.capture_max_bytes, logger=self.logger,
+                                             clock=self.clock)
+                self.captures.start()
+            if len(results) > 2:
+                storage_state = results[2]
+            
+            await self._timed_step("context", self._open_context(storage_state))
             
-            logger.info("Creating new page...")
-            # Create page from context
-            self.page = await self.context.new_page()
+            if self.metrics_port and self.metrics_server is None:
+                self.metrics_server = MetricsServer(self.metrics, self.metrics_port, logger=self.logger)
+                await self.metrics_server.start()
             
-            # Test that page is working by navigating to a simple page
-            logger.info("Testing page navigation...")
-            await self.page.goto("about:blank", timeout=10000)
+            self.ledger.start()
+            self.ledger.update_state(status="Starting", last_action="Bot started")
+            self.startup_timings["start"] = time.perf_counter() - started
             
-            logger.info("Bot started successfully")
+            self.logger.info("Bot started successfully")
         except Exception as e:
-            logger.error(f"Failed to start browser: {e}")
+            self.logger.error(f"Failed to start browser: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             # Cleanup on failure
             await self._cleanup()
             raise
     
+    async def _timed_step(self, name: str, step):
+        """Await a startup step and record its duration in startup_timings"""
+        started = time.perf_counter()
+        try:
+            return await step
+        finally:
+            self.startup_timings[name] = time.perf_counter() - started
+    
+    def _open_ledger(self) -> StatsLedger:
+        """Create the stats ledger (replays the journal; blocking)"""
+        return StatsLedger(
+            os.path.join(self.stats_dir, "bot_journal.jsonl"),
+            os.path.join(self.stats_dir, "bot_stats.json"),
+            os.path.join(self.stats_dir, "bot_state.json"),
+            logger=self.logger,
+            clock=self.clock
+        )
+    
+    async def _start_playwright(self):
+        if self.playwright is None:
+            self.logger.info("Starting Playwright...")
+            self.playwright = await async_playwright().start()
+    
+    async def _launch_browser(self):
+        """Start Playwright (if needed) and launch this bot's own Firefox"""
+        await self._start_playwright()
+        
+        self.logger.info("Launching Firefox browser...")
+        # Launch browser with minimal options first
+        # Using Firefox instead of Chromium due to macOS compatibility issues
+        self.browser = await self.playwright.firefox.launch(
+            headless=self.headless,
+            timeout=60000  # 60 second timeout
+        )
+    
+    async def _open_context(self, storage_state: dict = None):
+        """Create the browser context and page, optionally restoring a saved session
+        
+        Args:
+            storage_state: Cookies and local storage from context.storage_state()
+        """
+        self.logger.info("Creating browser context...")
+        # Create a browser context explicitly with network settings
+        self.context = await self.browser.new_context(
+            viewport={'width': 1280, 'height': 720},
+            ignore_https_errors=True,
+            java_script_enabled=True,
+            storage_state=storage_state
+        )
+        self.context.on("request", self.metrics.count_request)
+        if self.resource_policy:
+            await self.resource_policy.install(self.context)
+        
+        self.logger.info("Creating new page...")
+        # Create page from context
+        self.page = await self.context.new_page()
+    
+    def _load_session(self):
+        """Return the storage state saved by the last run, or None"""
+        self._session_restored = False
+        if not self.session_path or not os.path.exists(self.session_path):
+            return None
+        try:
+            with open(self.session_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable session file {self.session_path}: {e}")
+            return None
+        self._session_restored = True
+        self.logger.info(f"Restoring saved session from {self.session_path}")
+        return state
+    
+    async def _check_saved_session(self, storage_state: dict):
+        """Check a saved session with one HTTP read of the attributes page (no browser needed)
+        
+        Runs while Firefox is still launching. The page is kept in the navigation
+        cache, so resume_session() and the first training check don't load it again.
+        
+        Returns:
+            The storage state to open the context with: the session with any cookies
+            the server refreshed, or None if it has expired
+        """
+        request = await self.playwright.request.new_context(
+            storage_state=storage_state, ignore_https_errors=True
+        )
+        try:
+            self.metrics.count_request()
+            with self.metrics.op('http_get'):
+                response = await request.get(f"{self.base_url}{ATTRIBUTES_PAGE}?w={self.world}",
+                                             timeout=self.http_timeout_ms)
+            state = PageState.from_html(await response.text(), response.url, self.username)
+            if not state.logged_in:
+                self.logger.info("Saved session has expired")
+                self._session_restored = False
+                return None
+            self.navigation.store(ATTRIBUTES_PAGE, state)
+            return await request.storage_state()
+        except Exception as e:
+            # Can't tell yet: open the context with the session and let resume_session() check it
+            self.logger.warning(f"Could not check saved session over HTTP: {e}")
+            return storage_state
+        finally:
+            await request.dispose()
+    
+    async def save_session(self, state: dict = None):
+        """Persist the context's cookies and storage so a restart can skip the login"""
+        if not self.session_path:
+            return
+        try:
+            if state is None:
+                state = await self.context.storage_state()
+            await asyncio.to_thread(save_private_json, self.session_path, state)
+        except Exception as e:
+            self.logger.warning(f"Could not save session: {e}")
+    
+    async def _hibernate(self):
+        """Save the session and close the context (and our own browser, in "browser" mode)"""
+        self._hibernated_state = await self.context.storage_state()
+        await self.save_session(self._hibernated_state)
+        await self._close_reader()
+        try:
+            await self.context.close()
+        except:
+            pass
+        self.context = None
+        self.page = None
+        self.navigation.clear()
+        if self.hibernate == "browser" and self._owns_browser:
+            try:
+                await self.browser.close()
+            except:
+                pass
+            self.browser = None
+        self.update_status(status="Hibernating")
+        self.logger.info(f"Hibernating ({'browser closed' if self.browser is None else 'context closed'})")
+    
+    async def _wake(self):
+        """Reopen the browser/context from the session saved by _hibernate (no login needed)
+        
+        The new page starts blank; the attributes page is loaded so nothing
+        snapshots about:blank (and an expired session is renewed now).
+        """
+        started = time.perf_counter()
+        if self.browser is None:
+            await self._launch_browser()
+        await self._open_context(self._hibernated_state)
+        self._hibernated_state = None
+        await self.goto(ATTRIBUTES_PAGE)
+        self.update_status(status="Online")
+        self.logger.info(f"Woke up from hibernation in {time.perf_counter() - started:.1f}s")
+    
     async def _cleanup(self):
         """Internal cleanup method"""
+        await self._close_reader()
         try:
             if self.context:
                 await self.context.close()
         except:
             pass
+        if not self._owns_browser:
+            # Shared browser: the multi-account runner closes it
+            return
         try:
             if self.browser:
                 await self.browser.close()
@@ -140,699 +380,1102 @@ class HolyWarBot:
         except:
             pass
         
+    @property
+    def opponent_index(self) -> OpponentIndex:
+        """Opponent index database, opened on first use"""
+        if self._opponent_index is None:
+            self._opponent_index = OpponentIndex(self.opponent_index_path, ttl_seconds=self.opponent_ttl_seconds,
+                                                 clock=self.clock)
+        return self._opponent_index
+    
+    @property
+    def win_model(self) -> WinModel:
+        """Win-probability model, loaded on first use"""
+        if self._win_model is None:
+            self._win_model = WinModel.load(self.win_model_path)
+            if self._win_model.trained_on:
+                self.logger.info(f"Loaded win model {self.win_model_path} (trained on {self._win_model.trained_on} fights)")
+        return self._win_model
+    
     async def stop(self):
         """Close browser and cleanup"""
+        if self.context is not None:
+            await self.save_session()
         await self._cleanup()
-        logger.info("Bot stopped")
+        if self._opponent_index is not None:
+            self._opponent_index.close()
+            self._opponent_index = None
+        if self.ledger is not None:
+            self.ledger.update_state(status="Offline", last_action="Bot stopped")
+            await asyncio.to_thread(self.ledger.close)
+            self.ledger = None
+        if self.captures is not None:
+            await asyncio.to_thread(self.captures.close)
+            if self.captures.written or self.captures.dropped:
+                self.logger.info(f"Debug captures: {self.captures.written} written, {self.captures.dropped} dropped "
+                                 f"(in {self.captures.directory})")
+            self.captures = None
+        if self.waits.stats:
+            self.logger.info(f"Wait timings:\n{self.waits.summary()}")
+        if self.metrics.histograms:
+            self.logger.info(f"Action timings:\n{self.metrics.report()}")
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+            self.metrics_server = None
+        self.logger.info(self.navigation.report())
+        self.logger.info(self.guard.report())
+        if self.resource_policy:
+            self.logger.info(self.resource_policy.report())
+        self.logger.info("Bot stopped")
+    
+    async def wait_until(self, due: datetime, description: str, started_at: datetime = None):
+        """Wait for an absolute deadline via the shared scheduler
+        
+        If the attack phase comes next, the start of the wait is used to scout an
+        opponent (bounded to half the wait; the deadline is absolute, so it costs
+        no time). With hibernation on, waits longer than hibernate_after_seconds
+        then close the context (or browser) for their duration and reopen it with
+        the saved session hibernate_wake_seconds before the deadline.
         
-    async def is_logged_in(self) -> bool:
-        """Check if currently logged in"""
+        Args:
+            due: When to wake up
+            description: Description for the progress bar
+            started_at: Start of the awaited activity (progress is shown relative to it)
+        """
+        remaining = (due - self.clock.now()).total_seconds()
+        if self._should_scout(remaining):
+            try:
+                await self._scout_until(self.clock.now() + timedelta(seconds=min(remaining / 2, MAX_SCOUT_SECONDS)))
+            except Exception as e:
+                self.logger.warning(f"Scouting failed: {e}")
+            remaining = (due - self.clock.now()).total_seconds()
+        if not self.hibernate or self.context is None or remaining <= self.hibernate_after_seconds:
+            await self.scheduler.wait_until(due, description, owner=self.username, started_at=started_at)
+            return
+        
+        await self._hibernate()
+        wake = asyncio.ensure_future(
+            self._wake_at(due - timedelta(seconds=min(self.hibernate_wake_seconds, remaining)))
+        )
         try:
-            # Check for elements that only exist when logged in
-            # The gold counter (#spMoney) only exists when logged in
-            gold_span = self.page.locator('#spMoney')
-            if await gold_span.count() > 0:
-                return True
-            
-            # Also check if we're on the login page
-            current_url = self.page.url
-            if "/auth/loginform" in current_url or "/auth/login" in current_url:
-                return False
-            
-            # Check for login button
-            login_button = self.page.locator('button:has(img[alt="Login"])')
-            if await login_button.count() > 0:
-                return False
-            
-            # If we can see the username in the page, we're logged in
-            content = await self.page.content()
-            if self.username in content and "logout" in content.lower():
-                return True
-                
-            return False
+            await self.scheduler.wait_until(due, description, owner=self.username, started_at=started_at)
+        except BaseException:
+            wake.cancel()
+            raise
+        # The restore may still be running; a failed one surfaces here rather than on the next navigation
+        await wake
+    
+    async def _scout_until(self, deadline: datetime):
+        """Run scout_opponent(), cancelling it once the bot's clock reaches the deadline
+        
+        The deadline is checked on self.clock, not in real seconds: on a
+        SimulatedClock the time skipped inside the scout (retry backoffs) counts.
+        """
+        task = asyncio.ensure_future(self.scout_opponent())
+        try:
+            while not task.done():
+                left = (deadline - self.clock.now()).total_seconds()
+                if left <= 0:
+                    self.logger.info("Scouting ran out of time")
+                    return None
+                await asyncio.wait({task}, timeout=min(left, 0.25))
+            return task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+    
+    async def _wake_at(self, when: datetime):
+        await self.clock.sleep_until(when)
+        await self._wake()
+    
+    def use_clock(self, clock: Clock):
+        """Run the bot on another clock (e.g. a SimulatedClock); call before start()"""
+        self.clock = clock
+        self.scheduler = default_scheduler if clock is default_scheduler.clock else DeadlineScheduler(clock=clock)
+        self.navigation.clock = clock
+        self.guard.clock = clock
+    
+    def record(self, event_type: str, **fields):
+        """Journal a stats event (see stats_ledger for the event types)"""
+        if self.ledger is not None:
+            self.ledger.record(event_type, **fields)
+    
+    def update_status(self, **fields):
+        """Update the fields shown in bot_state.json"""
+        if self.ledger is not None:
+            self.ledger.update_state(**fields)
+        
+    async def is_logged_in(self, state: PageState = None) -> bool:
+        """Check if currently logged in
+        
+        Args:
+            state: Page snapshot to check. If omitted, the cheapest probe is used: the
+                   gold counter on the page the browser already shows, else one HTTP
+                   read of the attributes page (which is kept in the page cache).
+        """
+        try:
+            if state is None:
+                if self.page.url.startswith(self.base_url):
+                    with self.metrics.op('locator_count'):
+                        if await self.page.locator('#spMoney').count() > 0:
+                            return True
+                state = await self.fetch_state(ATTRIBUTES_PAGE, recover=False)
+            # The gold counter (#spMoney) only exists when logged in; the login
+            # button or login form URL means we're logged out
+            return state.logged_in
             
         except Exception as e:
-            logger.warning(f"Error checking login status: {e}")
+            self.logger.warning(f"Error checking login status: {e}")
             return False
     
+    @timed_action
     async def login(self):
         """Login to the game"""
-        logger.info(f"Logging in as {self.username}...")
+        self.logger.info(f"Logging in as {self.username}...")
         
         # Navigate to login page directly
-        await self.page.goto(f"{self.base_url}/auth/loginform/")
-        await asyncio.sleep(3)
+        await self.waits.goto(self.page, f"{self.base_url}/auth/loginform/")
         
         # Fill in credentials - using more flexible selectors
         username_field = self.page.locator('input[type="text"]').first
-        await username_field.fill(self.username)
+        with self.metrics.op('fill'):
+            await username_field.fill(self.username)
         
         password_field = self.page.locator('input[type="password"]').first
-        await password_field.fill(self.password)
+        with self.metrics.op('fill'):
+            await password_field.fill(self.password)
         
         # Submit login - click the button containing the Login image
-        await self.page.click('button:has(img[alt="Login"])')
-        await asyncio.sleep(5)
+        with self.metrics.op('click'):
+            await self.guard.call('submit', lambda: self.page.click('button:has(img[alt="Login"])'))
+        await self.waits.url(self.page, LOGGED_IN_URL_RE)
+        self.navigation.invalidate('login')
+        # The reader context holds a copy of the old session cookies
+        await self._close_reader()
         
         # Verify login by checking if we're on the welcome page
         if "/welcome" in self.page.url or "/char/attributes" in self.page.url:
-            logger.info("Logged in successfully")
+            self.logger.info("Logged in successfully")
+            self.update_status(status="Online", last_action="Logged in")
+            await self.save_session()
+        else:
+            self.logger.warning(f"Login might have failed. Current URL: {self.page.url}")
+    
+    async def resume_session(self) -> bool:
+        """True if the session restored in start() is still logged in (one HTTP request)"""
+        if not self._session_restored:
+            return False
+        started = time.perf_counter()
+        valid = await self.is_logged_in()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if valid:
+            self.logger.info(f"Saved session is still valid ({elapsed_ms:.0f} ms). Skipping login")
+            self.update_status(status="Online", last_action="Resumed session")
         else:
-            logger.warning(f"Login might have failed. Current URL: {self.page.url}")
+            self.logger.info(f"Saved session has expired ({elapsed_ms:.0f} ms). Logging in...")
+        return valid
+    
+    def startup_report(self) -> str:
+        """One line with the duration of each startup step (parallel steps overlap)"""
+        steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.startup_timings.items())
+        ready = sum(self.startup_timings.get(name, 0) for name in ("start", "resume", "login"))
+        return f"Startup: {steps}; ready for the first action after {ready:.2f}s"
     
     async def ensure_logged_in(self):
         """Check if logged in, and re-login if necessary"""
         try:
             if not await self.is_logged_in():
-                logger.warning("Not logged in! Attempting to re-login...")
+                self.logger.warning("Not logged in! Attempting to re-login...")
                 await self.login()
                 
                 # Verify login worked
                 if await self.is_logged_in():
-                    logger.info("Re-login successful!")
+                    self.logger.info("Re-login successful!")
                     return True
                 else:
-                    logger.error("Re-login failed!")
+                    self.logger.error("Re-login failed!")
                     return False
             return True
         except Exception as e:
-            logger.error(f"Error in ensure_logged_in: {e}")
+            self.logger.error(f"Error in ensure_logged_in: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             return False
     
-    async def safe_goto(self, url: str, timeout: int = 30000):
-        """Navigate to a URL with login check"""
+    async def _recover_session(self, path: str, state: PageState, reload) -> PageState:
+        """Log in again if a game page came back logged out, then load it once more
+        
+        Args:
+            path: Page that was loaded
+            state: Its snapshot
+            reload: Zero-argument coroutine function loading the page again
+        """
+        if state.logged_in:
+            return state
+        self.logger.warning(f"Session expired (loading {path}). Logging in again...")
+        await self.login()
+        return await reload()
+    
+    async def fetch_html(self, path: str) -> str:
+        """Fetch a game page's HTML for read-only parsing.
+        
+        Uses the context's HTTP client (self.context.request), which shares the
+        browser context's cookies and keeps its connections alive, so no Firefox
+        navigation or render is needed. Falls back to navigating the page if the
+        fast path is disabled or the request fails; with read_only_javascript off
+        that fallback uses a separate JavaScript-disabled context. Network failures
+        and server errors are retried by the guard instead; loading the page in the
+        browser wouldn't help with those.
+        
+        Args:
+            path: Page path such as "/assault/1on1/" (the world parameter is added)
+        """
+        url = f"{self.base_url}{path}?w={self.world}"
+        if self.use_http_fast_path:
+            async def get():
+                self.metrics.count_request()
+                with self.metrics.op('http_get'):
+                    response = await self.context.request.get(url, timeout=self.http_timeout_ms)
+                if response.status >= 500:
+                    raise ServerError(response.status, path)
+                return response
+            try:
+                response = await self.guard.call('http_get', get)
+                if response.ok:
+                    return await response.text()
+                self.logger.warning(f"HTTP fetch of {path} returned {response.status}, falling back to browser")
+            except NavigationError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"HTTP fetch of {path} failed: {e}. Falling back to browser")
+        
+        if not self.read_only_javascript:
+            page = await self._get_reader_page()
+        else:
+            page = self.page
+            # The browser page is leaving whatever page it was on
+            self.navigation.current_path = None
+        await self.waits.goto(page, url)
+        with self.metrics.op('content'):
+            return await page.content()
+    
+    async def _get_reader_page(self) -> Page:
+        """Page in a JavaScript-disabled context for read-only loads
+        
+        The context starts from a copy of the main context's cookies and storage,
+        so it is logged in as the same account.
+        """
+        if self.reader_page is None:
+            self.reader_context = await self.browser.new_context(
+                viewport={'width': 1280, 'height': 720},
+                ignore_https_errors=True,
+                java_script_enabled=False,
+                storage_state=await self.context.storage_state()
+            )
+            if self.resource_policy:
+                await self.resource_policy.install(self.reader_context)
+            self.reader_context.on("request", self.metrics.count_request)
+            self.reader_page = await self.reader_context.new_page()
+        return self.reader_page
+    
+    async def _close_reader(self):
+        """Close the read-only context (it is recreated with fresh cookies when needed)"""
         try:
-            await self.page.goto(url, timeout=timeout)
-        except Exception as e:
-            logger.warning(f"Navigation error: {e}")
-            # Check if logged out
-            if not await self.is_logged_in():
-                logger.warning("Detected logout during navigation. Re-logging in...")
-                await self.ensure_logged_in()
-                # Try navigation again
-                await self.page.goto(url, timeout=timeout)
+            if self.reader_context:
+                await self.reader_context.close()
+        except:
+            pass
+        self.reader_context = None
+        self.reader_page = None
+    
+    async def goto(self, path: str, recover: bool = True) -> PageState:
+        """Navigate the browser page to a game page and wait until it has loaded
+        
+        If the browser is already showing the page and no action has invalidated
+        it since, the navigation is skipped and the cached snapshot is returned.
+        
+        Args:
+            path: Page path such as "/assault/1on1/" (the world parameter is added)
+            recover: Log in again and reload if the page shows the session has expired
+        
+        Returns:
+            PageState snapshot of the page
+        """
+        url = f"{self.base_url}{path}?w={self.world}"
+        state = self.navigation.lookup(url, in_browser=True)
+        if state is not None:
+            self.logger.debug(f"Already on {path}, skipping navigation")
+            self.page_state = state
+            return state
+        
+        await self.waits.goto(self.page, url)
+        state = await self.snapshot(cache=True)
+        if recover:
+            state = await self._recover_session(path, state, lambda: self.goto(path, recover=False))
+        return state
+    
+    async def snapshot(self, cache: bool = False) -> PageState:
+        """Read the current browser page once and parse it into a PageState
+        
+        Call after every navigation or click. Readers take the returned snapshot
+        instead of querying the page again, so each page costs one content() call.
+        
+        Args:
+            cache: Remember the snapshot as the current content of this page's URL.
+                   Only for plain page loads, not form results shown under the same URL.
+        """
+        with self.metrics.op('content'):
+            html = await self.page.content()
+        self.page_state = PageState.from_html(html, self.page.url, self.username)
+        if cache:
+            self.navigation.store(self.page.url, self.page_state, in_browser=True)
+        return self.page_state
+    
+    async def fetch_state(self, path: str, recover: bool = True) -> PageState:
+        """Fetch a page with fetch_html and parse it into a PageState
+        
+        Served from the navigation cache while the page's last snapshot is fresh.
         
-    async def get_current_gold(self) -> int:
-        """Get current gold amount from the status bar"""
+        Args:
+            path: Page path such as "/assault/1on1/"
+            recover: Log in again and refetch if the page shows the session has expired
+        """
+        state = self.navigation.lookup(path)
+        if state is not None:
+            return state
+        html = await self.fetch_html(path)
+        state = PageState.from_html(html, f"{self.base_url}{path}", self.username)
+        if not state.logged_in:
+            if recover:
+                return await self._recover_session(path, state, lambda: self.fetch_state(path, recover=False))
+            return state
+        self.navigation.store(path, state)
+        return state
+    
+    async def get_current_gold(self, state: PageState = None) -> int:
+        """Get current gold amount from the status bar
+        
+        Args:
+            state: Page snapshot to read from. If omitted, the current page is snapshotted.
+        """
         try:
-            # First try: Use the spMoney span (most reliable)
-            gold_span = self.page.locator('#spMoney')
-            if await gold_span.count() > 0:
-                text = await gold_span.text_content()
-                if text and text.strip().isdigit():
-                    gold = int(text.strip())
-                    logger.info(f"Current gold: {gold}")
-                    return gold
-            
-            # Fallback: Look for the gold indicator in the status bar
-            gold_cells = await self.page.locator('td:has(img[name*="Gold"]), td:has(img[alt*="Gold"])').all()
+            if state is None:
+                state = await self.snapshot()
             
-            for cell in gold_cells:
-                text = await cell.text_content()
-                if text and text.strip().isdigit():
-                    gold = int(text.strip())
-                    logger.info(f"Current gold (fallback method): {gold}")
-                    return gold
+            if state.gold is not None:
+                self.logger.info(f"Current gold: {state.gold}")
+                self.update_status(gold=state.gold, **({'level': state.level} if state.level is not None else {}))
+                return state.gold
             
             # If we can't find gold, might be logged out
-            logger.warning("Could not detect gold - may be logged out")
-            if not await self.is_logged_in():
-                logger.warning("Confirmed: not logged in")
+            self.logger.warning("Could not detect gold - may be logged out")
+            await self.capture_page("no gold", state)
+            if not state.logged_in:
+                self.logger.warning("Confirmed: not logged in")
                 return -1  # Return -1 to signal logout
                 
         except Exception as e:
-            logger.error(f"Error getting gold: {e}")
+            self.logger.error(f"Error getting gold: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
         
-        logger.warning("Could not detect gold, returning 0")
+        self.logger.warning("Could not detect gold, returning 0")
         return 0
         
-    async def get_plunder_time_remaining(self) -> int:
-        """Get remaining plunder time in minutes"""
+    async def capture_page(self, reason: str, state: PageState):
+        """Keep an anomalous page and the action trace that led to it (see debug_capture.py)
+        
+        Only queues the capture; compression and the disk write happen on a
+        background thread.
+        """
+        if self.captures is None:
+            return
+        screenshot = None
+        if self.capture_screenshots and self.page is not None and self.page.url == state.url:
+            try:
+                with self.metrics.op('screenshot'):
+                    screenshot = await self.page.screenshot(full_page=True)
+            except Exception as e:
+                self.logger.debug(f"Screenshot for debug capture failed: {e}")
+        if self.captures.capture(reason, state.html, url=state.url, trace=self.metrics.recent_trace(),
+                                 screenshot=screenshot):
+            self.logger.info(f"Captured page for debugging ({reason})")
+    
+    async def get_plunder_time_remaining(self, state: PageState = None) -> int:
+        """Get remaining plunder time in minutes
+        
+        Args:
+            state: Attack page snapshot to read from. If omitted, the current page is snapshotted.
+        """
         try:
-            # Look for plunder time indicator
-            text = await self.page.content()
-            if "Plunder / protect time remaining today:" in text:
-                # Extract the time value
-                import re
-                match = re.search(r'Plunder / protect time remaining today: (\d+) min', text)
-                if match:
-                    time_remaining = int(match.group(1))
-                    logger.info(f"Plunder time remaining: {time_remaining} minutes")
-                    return time_remaining
+            if state is None:
+                state = await self.snapshot()
+            if state.plunder_minutes is not None:
+                self.logger.info(f"Plunder time remaining: {state.plunder_minutes} minutes")
+                return state.plunder_minutes
         except Exception as e:
-            logger.error(f"Error getting plunder time: {e}")
+            self.logger.error(f"Error getting plunder time: {e}")
         return self.plunder_time_remaining
         
+    @timed_action
     async def do_plunder(self):
         """Execute a plunder action"""
-        logger.info("Starting plunder...")
+        self.logger.info("Starting plunder...")
         
         # Navigate to attack page
-        await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-        await asyncio.sleep(2)
+        state = await self.goto(ATTACK_PAGE)
         
         # Update plunder time remaining
-        self.plunder_time_remaining = await self.get_plunder_time_remaining()
+        self.plunder_time_remaining = await self.get_plunder_time_remaining(state)
         
-        if self.plunder_time_remaining < self.plunder_duration_minutes:
-            logger.warning(f"Not enough plunder time remaining ({self.plunder_time_remaining} min)")
+        minutes = self.choose_plunder_minutes(state)
+        if minutes is None:
+            self.logger.warning(f"Not enough plunder time remaining ({self.plunder_time_remaining} min)")
             return False
             
         try:
             # Select the plunder duration from the dropdown
-            logger.info(f"Selecting {self.plunder_duration_minutes} minute plunder duration...")
-            await self.page.select_option('select[name="ravageTime"]', str(self.plunder_duration_minutes))
-            await asyncio.sleep(1)
+            self.logger.info(f"Selecting {minutes} minute plunder duration...")
+            with self.metrics.op('select_option'):
+                await self.page.select_option('select[name="ravageTime"]', str(minutes))
             
-            # Click the plunder button
-            logger.info("Clicking plunder button...")
-            await self.page.click('button[name="PLUNDER_ACTION"]')
-            await asyncio.sleep(3)
+            # Click the plunder button and wait for the plunder countdown
+            self.logger.info("Clicking plunder button...")
+            with self.metrics.op('click'):
+                await self.guard.call('submit', lambda: self.page.click('button[name="PLUNDER_ACTION"]'), idempotent=False)
+            self.navigation.invalidate('plunder')
+            await self.waits.counter(self.page)
             
-            self.last_plunder_time = datetime.now()
-            self.plunder_time_remaining -= self.plunder_duration_minutes
+            self.last_plunder_time = self.clock.now()
+            self.plunder_minutes = minutes
+            self.plunder_ends_at = self.last_plunder_time + timedelta(minutes=minutes)
+            self.plunder_time_remaining -= minutes
+            self.plunder_start_gold = state.gold
             
-            logger.info(f"Plunder started! Will complete in {self.plunder_duration_minutes} minutes")
-            logger.info(f"Plunder time remaining: {self.plunder_time_remaining} minutes")
+            self.record('plunder', minutes=minutes)
+            if self.ledger is not None:
+                self.ledger.plunder_window(self.last_plunder_time, self.plunder_ends_at)
+            self.update_status(
+                plunder_status=f"Plundering ({minutes} min)",
+                plunder_time_remaining=self.plunder_time_remaining,
+                last_action=f"Started {minutes} min plunder"
+            )
+            self.logger.info(f"Plunder started! Will complete in {minutes} minutes")
+            self.logger.info(f"Plunder time remaining: {self.plunder_time_remaining} minutes")
             return True
             
         except Exception as e:
-            logger.error(f"Error during plunder: {e}")
+            self.logger.error(f"Error during plunder: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             return False
             
-    async def get_training_costs(self):
-        """Get the actual training cost for each stat from the page"""
+    @property
+    def min_plunder_minutes(self) -> int:
+        """Shortest plunder the bot will start"""
+        return min(PLUNDER_DURATIONS) if self.plan_plunder_duration else self.plunder_duration_minutes
+    
+    def choose_plunder_minutes(self, state: PageState):
+        """Length of the next plunder: planned, or the configured fixed length
+        
+        Args:
+            state: Attack page snapshot (gold)
+        
+        Returns:
+            Minutes, or None if there isn't enough plunder time left
+        """
+        if not self.plan_plunder_duration:
+            if self.plunder_time_remaining < self.plunder_duration_minutes:
+                return None
+            return self.plunder_duration_minutes
+        now = self.clock.now()
+        minutes_until_reset = (next_daily_reset(now, reset_hour=self.daily_reset_hour) - now).total_seconds() / 60
+        minutes, reason = plan_plunder(
+            self.plunder_time_remaining,
+            state.gold or 0,
+            self.min_gold_reserve,
+            next_training_cost=min(self.training_costs) if self.training_costs else None,
+            gold_per_minute=self.plunder_gold_per_minute,
+            minutes_until_reset=minutes_until_reset,
+        )
+        if minutes is not None:
+            self.logger.info(f"Plunder plan: {minutes} min ({reason})")
+        return minutes
+    
+    async def get_training_costs(self, state: PageState = None):
+        """Get the actual training cost for each stat from the page
+        
+        Args:
+            state: Attributes page snapshot to read from. If omitted, the current page is snapshotted.
+        """
         try:
-            costs = []
-            
-            # Find all train button rows
-            train_buttons = await self.page.locator('img[alt="Train"]').all()
-            
-            for btn in train_buttons:
-                # Navigate up to the row, then find the cost
-                # The cost is in <td class="ltr"><b>XX</b></td>
-                row = btn.locator('xpath=ancestor::tr[1]')
-                cost_cell = row.locator('td.ltr b')
-                cost_text = await cost_cell.text_content()
-                cost = int(cost_text.strip())
-                costs.append(cost)
-                
+            if state is None:
+                state = await self.snapshot()
+            costs = list(state.training_costs)
+            self.training_costs = costs
             if costs:
-                logger.info(f"Training costs found: {costs}")
-                return costs
-            
-            # Default if we can't find any
-            logger.warning("Could not find training costs, using default [1]")
-            return [1]
+                self.logger.info(f"Training costs found: {costs}")
+            return costs
             
         except Exception as e:
-            logger.warning(f"Error getting training costs: {e}. Using default [1]")
-            return [1]
+            self.logger.warning(f"Error getting training costs: {e}")
+            return []
     
+    @timed_action
     async def train_attributes(self):
-        """Train attributes with available gold, keeping minimum reserve"""
-        logger.info("Training attributes...")
+        """Train attributes with available gold, keeping minimum reserve
         
-        # Navigate to status/attributes page
-        await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-        await asyncio.sleep(3)
+        Plans how many points of each stat are affordable (Strength first, then the
+        cheapest) from one read of the attributes page, submits each stat's points in
+        a single request through its quantity field, then verifies the round once from
+        the final gold and stats. Re-plans while gold is left over (e.g. when costs
+        rose faster than expected).
+        """
+        self.logger.info("Training attributes...")
         
-        current_gold = await self.get_current_gold()
+        # Navigate to status/attributes page
+        state = await self.goto(ATTRIBUTES_PAGE)
+        current_gold = await self.get_current_gold(state)
         trained_something = False
         training_count = 0
+        single_points = False  # Fall back to one point per request if a batch is rejected
         
-        # Keep training while we have enough gold above minimum
-        while training_count < 50:  # Max 50 trainings per cycle
+        for round_number in range(1, MAX_TRAINING_ROUNDS + 1):
             try:
                 # Get current training costs for all available stats
-                training_costs = await self.get_training_costs()
+                training_costs = await self.get_training_costs(state)
                 
                 if not training_costs:
-                    logger.info("No training buttons found (all stats maxed)")
+                    self.logger.info("No training buttons found (all stats maxed)")
                     break
                 
-                # Stat order: Strength (0), Attack (1), Defence (2), Agility (3), Stamina (4)
-                strength_cost = training_costs[0] if len(training_costs) > 0 else None
-                min_cost = min(training_costs)
-                cheapest_index = training_costs.index(min_cost)
-                
-                # Decide which stat to train: prioritize Strength, then cheapest
-                train_index = None
-                train_cost = None
+                # Decide the whole batch: prioritize Strength, then cheapest
+                counts, planned_gold = plan_training(
+                    training_costs, current_gold, self.min_gold_reserve,
+                    cost_step=self.training_cost_step, max_points=50 - training_count
+                )
+                if single_points:
+                    counts = [min(count, 1) for count in counts]
                 
-                if strength_cost and current_gold - strength_cost > self.min_gold_reserve:
-                    # Can afford Strength, train it
-                    train_index = 0
-                    train_cost = strength_cost
-                    logger.info(f"Training STRENGTH (priority): costs {strength_cost} gold")
-                elif current_gold - min_cost > self.min_gold_reserve:
-                    # Can't afford Strength but can afford cheapest
-                    train_index = cheapest_index
-                    train_cost = min_cost
-                    stat_names = ["Strength", "Attack", "Defence", "Agility", "Stamina"]
-                    stat_name = stat_names[cheapest_index] if cheapest_index < len(stat_names) else f"stat #{cheapest_index}"
-                    logger.info(f"Training {stat_name} (cheapest): costs {min_cost} gold")
-                else:
+                if not any(counts):
                     # Can't afford any training
-                    logger.info(f"Insufficient gold to train. Current: {current_gold}, Min cost: {min_cost}, Reserve: {self.min_gold_reserve}")
-                    logger.info(f"Would have {current_gold - min_cost} gold after training, need > {self.min_gold_reserve}")
-                    break
-                
-                # Get the train buttons
-                train_buttons = await self.page.locator('img[alt="Train"]').all()
-                
-                if train_index >= len(train_buttons):
-                    logger.error(f"Train button index {train_index} out of range")
+                    min_cost = min(training_costs)
+                    self.logger.info(f"Insufficient gold to train. Current: {current_gold}, Min cost: {min_cost}, Reserve: {self.min_gold_reserve}")
+                    self.logger.info(f"Would have {current_gold - min_cost} gold after training, need > {self.min_gold_reserve}")
                     break
                 
-                # We have enough gold, proceed with training
-                logger.info(f"Gold check passed: {current_gold} - {train_cost} = {current_gold - train_cost} > {self.min_gold_reserve}")
+                plan = ", ".join(f"{stat_label(i)} x{count}" for i, count in enumerate(counts) if count)
+                self.logger.info(f"Training round {round_number}: {plan} (expected gold after: {planned_gold}, reserve: {self.min_gold_reserve})")
                 
-                # Click the selected train button
-                await train_buttons[train_index].click()
-                await asyncio.sleep(3)
+                stats_before = dict(state.stats)
+                for index, count in enumerate(counts):
+                    if count:
+                        await self._submit_training(index, count)
                 
-                # Check if we're still on the attributes page or if we got an error
-                current_url = self.page.url
-                if "/char/attributes" not in current_url:
+                # Verify the whole round once from the final page
+                if "/char/attributes" not in self.page.url:
                     # We might have been redirected, go back
-                    await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-                    await asyncio.sleep(2)
+                    state = await self.goto(ATTRIBUTES_PAGE)
                 else:
-                    # Page might need a moment to update the gold display
-                    await asyncio.sleep(0.5)
+                    state = await self.snapshot(cache=True)
+                new_gold = await self.get_current_gold(state)
                 
-                # Update gold
-                new_gold = await self.get_current_gold()
+                if new_gold >= current_gold or new_gold <= 0:
+                    # No gold was spent: the batch was rejected, training maxed, or we're out of gold
+                    if single_points or sum(counts) == 1:
+                        self.logger.info("Cannot train anymore (training failed or maxed)")
+                        break
+                    self.logger.warning("Batch training spent no gold. Retrying one point per stat...")
+                    single_points = True
+                    continue
+                
+                if state.stats_total:
+                    points = sum(max(0, state.stats[name] - stats_before.get(name, 0)) for name in state.stats)
+                else:
+                    points = sum(counts)  # Stats summary not readable, trust the plan
+                self._learn_training_cost_step(training_costs, state.training_costs, counts)
                 
-                if new_gold >= current_gold or new_gold == 0:
-                    # No gold was spent, training failed or we're out of gold
-                    logger.info("Cannot train anymore (training failed or maxed)")
-                    break
-                    
                 actual_cost = current_gold - new_gold
+                if state.stats_total:
+                    trained_counts = [max(0, state.stats[name] - stats_before.get(name, 0)) for name in STAT_KEYS]
+                else:
+                    trained_counts = list(counts)
+                self.record('train', counts=trained_counts, cost=actual_cost, first=not trained_something)
                 current_gold = new_gold
                 trained_something = True
-                training_count += 1
+                training_count += points
                 
-                logger.info(f"Training #{training_count} - Cost: {actual_cost} gold. Remaining gold: {current_gold}")
+                self.logger.info(f"Trained {points} point(s) in {sum(1 for count in counts if count)} request(s) - Cost: {actual_cost} gold. Remaining gold: {current_gold}")
+                if points < sum(counts):
+                    self.logger.warning(f"Planned {sum(counts)} point(s) but only {points} were trained")
+                if training_count >= 50:  # Max 50 trainings per cycle
+                    break
                     
             except Exception as e:
-                logger.error(f"Error during training: {e}")
+                self.logger.error(f"Error during training: {e}")
                 import traceback
-                logger.error(traceback.format_exc())
+                self.logger.error(traceback.format_exc())
                 break
                 
         if trained_something:
-            logger.info(f"Completed {training_count} trainings. Final gold: {current_gold}")
+            self.logger.info(f"Completed {training_count} trainings. Final gold: {current_gold}")
+            self.update_status(stats=dict(state.stats), last_action=f"Trained {training_count} point(s)")
         else:
-            logger.info("No training was possible")
+            self.logger.info("No training was possible")
             
         return trained_something, current_gold
+    
+    async def _submit_training(self, index: int, count: int):
+        """Train `count` points of one stat in a single request via the form's quantity field
         
+        Args:
+            index: Stat index in page order (Strength = 0)
+            count: Points to train
+        """
+        form = self.page.locator('form:has(img[alt="Train"])').nth(index)
+        quantity = form.locator('input[type="text"]')
+        with self.metrics.op('locator_count'):
+            has_quantity = await quantity.count() > 0
+        if has_quantity:
+            with self.metrics.op('fill'):
+                await quantity.first.fill(f"+{count}")
+        elif count > 1:
+            self.logger.warning(f"No quantity field for {stat_label(index)}; training 1 point instead of {count}")
+        
+        # Click the train button and wait for the result page
+        await self.waits.submit(self.page, form.locator('img[alt="Train"]').first.click)
+        self.navigation.invalidate('train')
+    
+    def _learn_training_cost_step(self, costs_before, costs_after, counts):
+        """Update the expected cost increase per trained point from what the server charged"""
+        if len(costs_before) != len(costs_after):
+            return
+        for before, after, count in zip(costs_before, costs_after, counts):
+            if count and after > before:
+                step = -(-(after - before) // count)  # Round up
+                self.training_cost_step = max(self.training_cost_step or 0, step)
+        
+    @timed_action
     async def sell_cheapest_elixir(self):
         """Sell the cheapest elixir to get gold for plundering"""
-        logger.info("Selling cheapest elixir...")
+        self.logger.info("Selling cheapest elixir...")
         
         # Navigate to elixirs shop
-        await self.page.goto(f"{self.base_url}/town/alchemist/?w={self.world}")
-        await asyncio.sleep(2)
-        
-        current_gold = await self.get_current_gold()
+        current_gold = await self.get_current_gold(await self.goto(ALCHEMIST_PAGE))
         
         try:
             # Try to find and click sell buttons for elixirs
             # Start with cheapest: Consecrated Elixir (50 gold) -> Baptised Elixir (90) -> Blessed Elixir (450)
             
             # Look for sell buttons - they should be near elixir names
-            sell_buttons = await self.page.locator('input[type="image"][alt*="Sell"], img[alt*="Sell"]').all()
+            with self.metrics.op('locator_all'):
+                sell_buttons = await self.page.locator('input[type="image"][alt*="Sell"], img[alt*="Sell"]').all()
             
             if len(sell_buttons) > 0:
                 # Try to sell the cheapest elixir first (usually first sell button)
-                await sell_buttons[0].click()
-                await asyncio.sleep(2)
+                with self.metrics.op('click'):
+                    await self.guard.call('submit', sell_buttons[0].click, idempotent=False)
+                self.navigation.invalidate('sell_elixir')
+                await self.waits.gold_change(self.page, current_gold)
                 
-                new_gold = await self.get_current_gold()
+                new_gold = await self.get_current_gold(await self.snapshot())
                 if new_gold > current_gold:
-                    logger.info(f"Sold elixir. Gold: {current_gold} -> {new_gold}")
+                    self.logger.info(f"Sold elixir. Gold: {current_gold} -> {new_gold}")
+                    self.record('sell_elixir', gold=new_gold - current_gold)
+                    self.update_status(last_action="Sold elixir")
                     return True
                 else:
-                    logger.warning("Sell button clicked but gold didn't increase")
+                    self.logger.warning("Sell button clicked but gold didn't increase")
                     return False
             else:
-                logger.warning("No sell buttons found - you may not have any elixirs to sell")
+                self.logger.warning("No sell buttons found - you may not have any elixirs to sell")
                 return False
                 
         except Exception as e:
-            logger.error(f"Error selling elixir: {e}")
+            self.logger.error(f"Error selling elixir: {e}")
             return False
     
+    @timed_action
     async def buy_elixirs(self):
-        """Buy elixirs if gold > threshold. Prioritize most expensive first."""
-        logger.info("Buying elixirs...")
+        """Buy elixirs if gold > threshold, planning the whole basket from one page read
         
-        # Navigate to elixirs shop
-        await self.page.goto(f"{self.base_url}/town/alchemist/?w={self.world}")
-        await asyncio.sleep(2)
+        The basket (planners.plan_elixir_basket) spends what the reserve and the
+        plundering buffer allow, preferring expensive elixirs. Each elixir kind
+        is bought in one submit where the shop has a quantity field, and the gold
+        is checked once at the end.
         
-        current_gold = await self.get_current_gold()
+        Returns:
+            (bought, state): whether anything was bought, and the alchemist page last read
+        """
+        self.logger.info("Buying elixirs...")
+        
+        # Navigate to elixirs shop
+        state = await self.goto(ALCHEMIST_PAGE)
+        current_gold = await self.get_current_gold(state)
         
         if current_gold < self.elixir_threshold:
-            logger.info(f"Gold ({current_gold}) below elixir threshold ({self.elixir_threshold})")
-            return False
-            
-        # Keep buying the most expensive elixir we can afford until we're close to min_gold_reserve
-        bought_something = False
-        purchases = 0
+            self.logger.info(f"Gold ({current_gold}) below elixir threshold ({self.elixir_threshold})")
+            return False, state
         
-        while current_gold > self.min_gold_reserve + 30:  # Keep buffer for plundering
-            try:
-                # Get page content to parse elixir costs and availability
-                content = await self.page.content()
-                import re
-                
-                # Find all forms that submit to /town/alchemist/buy/
-                # Each form contains an elixir with its cost and buy button
-                forms = re.findall(
-                    r'<form[^>]*action="/town/alchemist/buy/[^"]*"[^>]*>(.*?)</form>',
-                    content,
-                    re.DOTALL
-                )
-                
-                # Parse elixir costs and check if buy button is available
-                elixirs = []
-                for i, form in enumerate(forms):
-                    # Extract elixir name
-                    name_match = re.search(r'<th>\s*(.*?)\s*</th>', form)
-                    if not name_match:
-                        continue
-                    elixir_name = name_match.group(1).strip()
-                    
-                    # Extract cost
-                    cost_match = re.search(r'<td class="ltr"[^>]*><b><span>(\d+)</span></b></td>', form)
-                    if not cost_match:
-                        continue
-                    cost = int(cost_match.group(1))
-                    
-                    # Check if buy button is available (not disabled)
-                    # A disabled button shows btn_kaufen_x.jpg, an active one shows btn_kaufen.jpg
-                    has_buy_button = 'btn_kaufen.jpg' in form and 'btn_kaufen_x.jpg' not in form
-                    
-                    if has_buy_button:
-                        elixirs.append({
-                            'name': elixir_name,
-                            'cost': cost,
-                            'form_index': i
-                        })
-                        logger.debug(f"Found available elixir: {elixir_name} ({cost} gold)")
-                
-                if not elixirs:
-                    logger.info("No elixirs available to buy")
-                    break
-                
-                # Sort by cost descending (buy most expensive first)
-                elixirs.sort(key=lambda x: x['cost'], reverse=True)
-                
-                # Try to buy the most expensive elixir we can afford
-                bought_this_round = False
-                for elixir in elixirs:
-                    if current_gold >= elixir['cost'] and (current_gold - elixir['cost']) >= self.min_gold_reserve:
-                        logger.info(f"Attempting to buy {elixir['name']} for {elixir['cost']} gold...")
-                        
-                        # Find and click the buy button for this elixir
-                        # Look for the button within the form that contains this elixir name
-                        buy_buttons = await self.page.locator('button[type="submit"][name="No alternative text available"]').all()
-                        
-                        if elixir['form_index'] < len(buy_buttons):
-                            # Click the corresponding buy button
-                            await buy_buttons[elixir['form_index']].click()
-                            await asyncio.sleep(2)
-                            
-                            # Check if gold decreased
-                            new_gold = await self.get_current_gold()
-                            if new_gold < current_gold:
-                                logger.info(f"✓ Bought {elixir['name']} for {elixir['cost']} gold. Remaining: {new_gold}")
-                                current_gold = new_gold
-                                bought_something = True
-                                bought_this_round = True
-                                purchases += 1
-                                break
-                            else:
-                                logger.warning(f"Buy button clicked but gold didn't decrease. Current: {new_gold}")
-                                break
-                        else:
-                            logger.warning(f"Could not find buy button for {elixir['name']}")
-                            break
-                
-                if not bought_this_round:
-                    # Couldn't afford any elixir or no more available
+        offers = state.elixir_offers
+        costs = [offer[1] if offer and offer[2] else None for offer in offers]
+        if not any(costs):
+            self.logger.info("No elixirs available to buy")
+            return False, state
+        
+        counts, total_cost = plan_elixir_basket(costs, current_gold, self.min_gold_reserve, buffer=30)
+        if not total_cost:
+            self.logger.info(f"No elixirs purchased. Gold: {current_gold}")
+            return False, state
+        basket = ", ".join(f"{count}x {offers[i][0]}" for i, count in enumerate(counts) if count)
+        self.logger.info(f"Elixir basket: {basket} for {total_cost} gold")
+        
+        try:
+            for index, count in enumerate(counts):
+                if count:
+                    await self._submit_elixir_purchase(index, count)
+        except Exception as e:
+            self.logger.error(f"Error buying elixirs: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+        
+        # Verify the whole basket with one read
+        state = await self.snapshot()
+        new_gold = await self.get_current_gold(state)
+        spent = current_gold - new_gold
+        if spent != total_cost:
+            self.logger.warning(f"Elixir basket should have cost {total_cost} gold, but gold went {current_gold} -> {new_gold}")
+        
+        # Journal the items the spent gold accounts for, most expensive first
+        purchases = 0
+        accounted = 0
+        for index in sorted((i for i, count in enumerate(counts) if count), key=lambda i: -costs[i]):
+            for _ in range(counts[index]):
+                if accounted + costs[index] > spent:
                     break
-                    
-            except Exception as e:
-                logger.error(f"Error buying elixirs: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                break
+                self.record('buy_elixir', name=offers[index][0], cost=costs[index])
+                accounted += costs[index]
+                purchases += 1
         
-        if bought_something:
-            logger.info(f"Purchased {purchases} elixir(s). Final gold: {current_gold}")
+        if purchases:
+            self.logger.info(f"Purchased {purchases} elixir(s). Final gold: {new_gold}")
+            self.update_status(last_action=f"Bought {purchases} elixir(s)")
         else:
-            logger.info(f"No elixirs purchased. Gold: {current_gold}")
-                
-        return bought_something
+            self.logger.info(f"No elixirs purchased. Gold: {new_gold}")
+        return purchases > 0, state
+    
+    async def _submit_elixir_purchase(self, index: int, count: int):
+        """Buy `count` of one elixir, in a single request if its form has a quantity field
+        
+        Args:
+            index: Buy form index in page order
+            count: Elixirs to buy
+        """
+        form = self.page.locator('form[action*="/town/alchemist/buy/"]').nth(index)
+        quantity = form.locator('input[type="text"]')
+        with self.metrics.op('locator_count'):
+            has_quantity = await quantity.count() > 0
+        submits = 1 if has_quantity else count
+        if has_quantity:
+            with self.metrics.op('fill'):
+                await quantity.first.fill(str(count))
+        for _ in range(submits):
+            # Every submit reloads the shop, so the form is located again each time
+            await self.waits.submit(self.page, form.locator('button[type="submit"]').first.click)
+            self.navigation.invalidate('buy_elixir')
         
     async def get_my_stats(self):
         """Get my current stats from attributes page"""
         try:
-            # Navigate to attributes page
-            await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-            await asyncio.sleep(2)
-            
-            content = await self.page.content()
-            import re
-            
-            stats = {}
-            
-            # The stats page has a summary table with abbreviated names (STR, ATT, DEF, AGI, STA)
-            # Pattern: <div style="position:relative;">STR<div ...><span>19</span></div></div>
-            stat_abbrevs = {
-                'STR': 'strength',
-                'ATT': 'attack',
-                'DEF': 'defence',
-                'AGI': 'agility',
-                'STA': 'stamina'
-            }
-            
-            for abbrev, full_name in stat_abbrevs.items():
-                # Look for the abbreviated stat name followed by span with value
-                match = re.search(rf'{abbrev}<div[^>]*><span>(\d+)</span>', content)
-                if match:
-                    stats[full_name] = int(match.group(1))
-                else:
-                    stats[full_name] = 0
-            
-            total = sum(stats.values())
-            logger.info(f"My stats: STR={stats['strength']}, ATT={stats['attack']}, DEF={stats['defence']}, AGI={stats['agility']}, STA={stats['stamina']}, Total={total}")
+            # Read the attributes page (read-only, no navigation needed)
+            state = await self.fetch_state(ATTRIBUTES_PAGE)
+            stats, total = dict(state.stats), state.stats_total
+            if state.level is not None:
+                self.my_level = state.level
+            if total:
+                self.update_status(stats=stats)
+            self.logger.info(f"My stats: STR={stats['strength']}, ATT={stats['attack']}, DEF={stats['defence']}, AGI={stats['agility']}, STA={stats['stamina']}, Total={total}")
             return stats, total
             
         except Exception as e:
-            logger.error(f"Error getting my stats: {e}")
+            self.logger.error(f"Error getting my stats: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             return {}, 0
     
-    async def get_opponent_stats(self):
-        """Get opponent stats from current page"""
+    async def get_opponent_stats(self, state: PageState = None):
+        """Get opponent stats from current page
+        
+        Args:
+            state: Attack page snapshot to read from. If omitted, the current page is snapshotted.
+        """
         try:
-            content = await self.page.content()
-            import re
-            
-            stats = {}
-            stat_names = ['Strength', 'Attack', 'Defence', 'Agility', 'Stamina']
-            
-            for stat in stat_names:
-                # Find stat value in the opponent page
-                match = re.search(rf'<td[^>]*padding-left:30px;">{stat}</td>\s*<td[^>]*>(\d+)</td>', content, re.IGNORECASE)
-                if match:
-                    stats[stat.lower()] = int(match.group(1))
-                else:
-                    stats[stat.lower()] = 0
-            
-            total = sum(stats.values())
-            logger.info(f"Opponent stats: STR={stats['strength']}, ATT={stats['attack']}, DEF={stats['defence']}, AGI={stats['agility']}, STA={stats['stamina']}, Total={total}")
+            if state is None:
+                state = await self.snapshot()
+            stats, total = dict(state.opponent_stats), state.opponent_total
+            self.logger.info(f"Opponent stats: STR={stats['strength']}, ATT={stats['attack']}, DEF={stats['defence']}, AGI={stats['agility']}, STA={stats['stamina']}, Total={total}")
             return stats, total
             
         except Exception as e:
-            logger.error(f"Error getting opponent stats: {e}")
+            self.logger.error(f"Error getting opponent stats: {e}")
             return {}, 0
     
+    @timed_action
     async def attack_player(self):
-        """Attack a player of the target level"""
-        logger.info(f"Attacking player of level {self.target_player_level}...")
+        """Attack a player of the target level
+        
+        A target found by scout_opponent() is attacked straight from the attack
+        page (one navigation, one click) if the page still shows it; otherwise
+        the bot searches for one.
+        """
+        self.logger.info(f"Attacking player of level {self.target_player_level}...")
         
-        # Check gold before attacking - buy elixirs if we have 60+ gold
-        current_gold = await self.get_current_gold()
+        # Check gold before attacking - buy elixirs if we have 60+ gold. Read it from
+        # the server: the browser may still show a page from before the last payout
+        current_gold = await self.get_current_gold(await self.fetch_state(ATTRIBUTES_PAGE))
         if current_gold >= 60:
-            logger.info(f"Gold is {current_gold} (>= 60). Buying elixirs before attacking to avoid losing gold...")
-            await self.buy_elixirs()
-            current_gold = await self.get_current_gold()
-            logger.info(f"After buying elixirs, gold is now {current_gold}")
+            self.logger.info(f"Gold is {current_gold} (>= 60). Buying elixirs before attacking to avoid losing gold...")
+            _, state = await self.buy_elixirs()
+            current_gold = await self.get_current_gold(state)
+            self.logger.info(f"After buying elixirs, gold is now {current_gold}")
         
         # Get my stats first
         my_stats, my_total = await self.get_my_stats()
         if my_total == 0:
-            logger.error("Could not get my stats, aborting attack")
+            self.logger.error("Could not get my stats, aborting attack")
             return False
         
         # Navigate to attack page
-        await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-        await asyncio.sleep(2)
+        state = await self.goto(ATTACK_PAGE)
+        if self._learn_attack_cooldown(state) and not state.search_form:
+            self.logger.info(f"Attack cooldown still running until {self.attack_ready_at:%H:%M:%S}. Not attacking yet")
+            return False
+        
+        target, self.scouted_target = self.scouted_target, None
+        if target is not None:
+            key = opponent_key(self.world, state.opponent_id, state.opponent_name)
+            if key == target['key']:
+                # Stats may have changed since scouting; the page shows the current ones
+                if (await self._vet_opponent(state, my_stats))[0]:
+                    self.logger.info(f"Attacking scouted opponent {target['name']}")
+                    try:
+                        return await self._attack_current(key, my_stats)
+                    except Exception as e:
+                        self.logger.error(f"Error attacking player: {e}")
+                        return False
+            else:
+                self.logger.info(f"Scouted opponent {target['name']} is no longer shown. Searching...")
         
         max_attempts = 10  # Try up to 10 opponents
         attempt = 0
         
         try:
-            # Fill in search criteria
-            # Select "Exact or lower" from the dropdown
-            await self.page.select_option('select[name="searchtype"]', 'lower')
-            await asyncio.sleep(0.5)
-            
-            # Fill in level input field
-            await self.page.fill('input[name="level"]', str(self.target_player_level))
-            
-            # Click search button
-            await self.page.click('button[name="Search"]')
-            await asyncio.sleep(2)
+            # Fill in search criteria and wait for the opponent page
+            await self._search_opponents(self.page)
             
             while attempt < max_attempts:
                 attempt += 1
-                logger.info(f"Checking opponent #{attempt}...")
+                self.logger.info(f"Checking opponent #{attempt}...")
                 
-                # Get opponent stats
-                opp_stats, opp_total = await self.get_opponent_stats()
-                
-                if opp_total == 0:
-                    logger.warning("Could not get opponent stats")
+                state = await self.snapshot()
+                attack_this, key = await self._vet_opponent(state, my_stats)
+                if attack_this is None:
+                    return False
+                if attack_this:
+                    return await self._attack_current(key, my_stats)
+                if not await self._next_opponent():
                     return False
-                
-                # Compare stats
-                if opp_total < my_total:
-                    logger.info(f"Opponent is weaker ({opp_total} < {my_total}). Attacking!")
-                    
-                    # Click attack button
-                    await self.page.click('button[name="Attack"]')
-                    await asyncio.sleep(3)
-                    
-                    # Verify attack was successful by checking for cooldown timer
-                    content = await self.page.content()
-                    import re
-                    
-                    # Look for cooldown timer like "You can attack again in 0:04:55"
-                    has_cooldown = re.search(r'attack again in.*?(\d+):(\d+):(\d+)', content, re.IGNORECASE)
-                    
-                    if has_cooldown:
-                        hours = int(has_cooldown.group(1))
-                        minutes = int(has_cooldown.group(2))
-                        seconds = int(has_cooldown.group(3))
-                        total_min = hours * 60 + minutes
-                        logger.info(f"✓ Attack successful! Cooldown: {hours}h {minutes}m {seconds}s ({total_min} minutes)")
-                        self.last_attack_time = datetime.now()
-                        return True
-                    else:
-                        logger.warning("Attack button clicked but no cooldown timer found. Attack may have failed.")
-                        # Save page for debugging
-                        with open('attack_result.html', 'w', encoding='utf-8') as f:
-                            f.write(content)
-                        logger.info("Saved attack_result.html for debugging")
-                        return False
-                else:
-                    logger.info(f"Opponent is stronger or equal ({opp_total} >= {my_total}). Looking for new opponent...")
-                    
-                    # Click "New Opponent" button
-                    new_opp_button = self.page.locator('img[src*="btn_neuer_gegner"]')
-                    if await new_opp_button.count() > 0:
-                        await new_opp_button.first.click()
-                        await asyncio.sleep(2)
-                    else:
-                        logger.warning("Could not find 'New Opponent' button")
-                        return False
             
-            logger.warning(f"Could not find suitable opponent after {max_attempts} attempts")
+            self.logger.warning(f"Could not find suitable opponent after {max_attempts} attempts")
             return False
                 
         except Exception as e:
-            logger.error(f"Error attacking player: {e}")
+            self.logger.error(f"Error attacking player: {e}")
             return False
-            
-    async def run_plunder_cycle(self):
-        """Run one plunder cycle: plunder -> train -> buy elixirs"""
-        logger.info("=== Starting plunder cycle ===")
+    
+    async def _search_opponents(self, page: Page):
+        """Run the "Exact or lower" search for the target level on an attack page"""
+        with self.metrics.op('select_option'):
+            await page.select_option('select[name="searchtype"]', 'lower')
+        with self.metrics.op('fill'):
+            await page.fill('input[name="level"]', str(self.target_player_level))
+        await self.waits.submit(page, lambda: page.click('button[name="Search"]'), idempotent=True)
+        self.navigation.invalidate('search')
+    
+    async def _vet_opponent(self, state: PageState, my_stats: dict):
+        """Decide whether to attack the opponent shown on an attack page snapshot
+        
+        Attacks if the win model gives more than min_win_probability, unless a
+        recent fight against this player says otherwise. The stats on the page
+        are used; the index's last known stats only if the page shows none.
+        
+        Returns:
+            (attack, key): attack is True/False, or None if the opponent's stats are unknown
+        """
+        key = opponent_key(self.world, state.opponent_id, state.opponent_name)
+        my_total = sum(my_stats.values())
+        opp_level = state.opponent_level
+        
+        # Get opponent stats
+        opp_stats, opp_total = await self.get_opponent_stats(state)
+        if opp_total:
+            self.opponent_index.record(self.world, state.opponent_id, state.opponent_name,
+                                       opp_level, opp_stats)
+        else:
+            known = self.opponent_index.lookup(key)
+            if not known:
+                self.logger.warning("Could not get opponent stats")
+                await self.capture_page("no opponent stats", state)
+                return None, key
+            self.logger.info(f"Page shows no stats for {known['name']}; using the last known ones")
+            opp_stats, opp_total, opp_level = known, known['total'], known['level']
+        
+        # Compare stats, preferring what past fights against this player showed
+        beaten = self.opponent_index.recently_beaten(key)
+        lost_to = self.opponent_index.recently_lost_to(key)
+        if lost_to:
+            self.logger.info(f"Lost to {lost_to['name']} recently. Looking for new opponent...")
+            return False, key
+        if beaten:
+            self.logger.info(f"Beat {beaten['name']} recently (total {opp_total} vs {my_total}). Attacking!")
+            return True, key
+        chance = self.win_model.win_probability(my_stats, opp_stats, self.my_level, opp_level)
+        if chance > self.min_win_probability:
+            self.logger.info(f"Win chance {chance:.0%} (total {opp_total} vs {my_total}). Attacking!")
+            return True, key
+        self.logger.info(f"Win chance only {chance:.0%} (total {opp_total} vs {my_total}). Looking for new opponent...")
+        return False, key
+    
+    async def _attack_current(self, key: str, my_stats: dict) -> bool:
+        """Click Attack on the opponent the browser page shows and record the fight"""
+        # Click attack button and wait for the cooldown countdown
+        with self.metrics.op('click'):
+            await self.guard.call('submit', lambda: self.page.click('button[name="Attack"]'), idempotent=False)
+        self.navigation.invalidate('attack')
+        await self.waits.counter(self.page)
         
-        # Do plunder
-        plunder_success = await self.do_plunder()
+        # Verify attack was successful by checking for cooldown timer
+        # like "You can attack again in 0:04:55"
+        state = await self.snapshot()
+        won = self._record_fight_outcome(key, state, my_stats)
+        self.record('attack', won=won, opponent=state.opponent_name)
+        self.update_status(last_action=f"Attacked {state.opponent_name or 'opponent'}"
+                                       + ("" if won is None else (" (won)" if won else " (lost)")))
         
-        if not plunder_success:
+        if self._learn_attack_cooldown(state):
+            hours, remainder = divmod(state.attack_cooldown_seconds, 3600)
+            minutes, seconds = divmod(remainder, 60)
+            total_min = hours * 60 + minutes
+            self.logger.info(f"✓ Attack successful! Cooldown: {hours}h {minutes}m {seconds}s ({total_min} minutes), "
+                             f"next attack at {self.attack_ready_at:%H:%M:%S}")
+            self.last_attack_time = self.clock.now()
+            return True
+        else:
+            self.logger.warning("Attack button clicked but no cooldown timer found. Attack may have failed.")
+            await self.capture_page("attack without cooldown", state)
             return False
-            
-        # Wait for plunder to complete (10 minutes)
-        logger.info(f"Waiting {self.plunder_duration_minutes} minutes for plunder to complete...")
-        await asyncio.sleep(self.plunder_duration_minutes * 60)
-        
-        # Go to status page and train
-        # train_attributes already checks if we have enough gold (current - cost > min_reserve)
-        trained, current_gold = await self.train_attributes()
-        
-        # After training, check if we should buy elixirs
-        # Only buy if: gold > 100 AND we can't train anymore (stats maxed)
-        if current_gold > self.elixir_threshold:
-            logger.info(f"Gold ({current_gold}) is above elixir threshold ({self.elixir_threshold})")
-            
-            # Check if there are still training buttons available
-            await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-            await asyncio.sleep(2)
-            
-            train_buttons = await self.page.locator('img[alt="Train"], img[name="Train"]').all()
-            
-            if len(train_buttons) == 0:
-                # No training buttons = all stats maxed, buy elixirs
-                logger.info("No training buttons found (all stats maxed). Buying elixirs...")
-                await self.buy_elixirs()
-            else:
-                # Training buttons exist but we stopped training because of gold reserve
-                # Check the training cost again
-                training_costs = await self.get_training_costs()
-                if training_costs:
-                    min_training_cost = min(training_costs)
-                    if current_gold - min_training_cost <= self.min_gold_reserve:
-                        # Can't train without going below reserve, buy elixirs
-                        logger.info(f"Can't train (would leave {current_gold - min_training_cost} gold, need > {self.min_gold_reserve}). Buying elixirs...")
-                        await self.buy_elixirs()
-                    else:
-                        logger.info("Can still train. Not buying elixirs yet.")
-                
+    
+    def _learn_attack_cooldown(self, state: PageState) -> bool:
+        """Set attack_ready_at from the countdown an attack page shows, if it shows one"""
+        if state.attack_cooldown_seconds is None:
+            return False
+        self.attack_ready_at = self.clock.now() + timedelta(seconds=state.attack_cooldown_seconds)
         return True
+    
+    @timed_action
+    async def scout_opponent(self, max_attempts: int = 10):
+        """Find an opponent worth attacking ahead of time, in a second page of the context
+        
+        Runs during waits (see wait_until). The game remembers the last opponent
+        found, so the attack page shows the scouted target until the attack.
+        Does nothing (one HTTP read) while the attack page offers no search.
+        
+        Returns:
+            The scouted target, or None
+        """
+        state = await self.fetch_state(ATTACK_PAGE)
+        if not state.search_form:
+            self.logger.debug("Opponent search not available right now; not scouting")
+            return None
+        my_stats, my_total = await self.get_my_stats()
+        if my_total == 0:
+            return None
+        
+        self.logger.info("Scouting for an opponent while waiting...")
+        page = await self.context.new_page()
+        try:
+            await self.waits.goto(page, f"{self.base_url}{ATTACK_PAGE}?w={self.world}")
+            await self._search_opponents(page)
+            for attempt in range(max_attempts):
+                with self.metrics.op('content'):
+                    html = await page.content()
+                state = PageState.from_html(html, page.url, self.username)
+                attack_this, key = await self._vet_opponent(state, my_stats)
+                if attack_this is None:
+                    return None
+                if attack_this:
+                    self.scouted_target = {'key': key, 'name': state.opponent_name, 'total': state.opponent_total}
+                    self.logger.info(f"Scouted opponent {state.opponent_name} (total {state.opponent_total} vs {my_total})")
+                    return self.scouted_target
+                if not await self._next_opponent(page):
+                    return None
+            self.logger.info(f"No suitable opponent among {max_attempts} scouted")
+            return None
+        finally:
+            await page.close()
+    
+    def _should_scout(self, remaining_seconds: float) -> bool:
+        """Scout during a wait if the attack phase comes next and no target is ready
+        
+        Not during the attack cooldown: the game hides the search form until it ends.
+        """
+        in_cooldown = self.attack_ready_at is not None and self.clock.now() < self.attack_ready_at
+        return (self.scout_ahead and self.scouted_target is None and self.context is not None and not in_cooldown
+                and remaining_seconds > 60 and self.plunder_time_remaining < self.min_plunder_minutes)
+    
+    async def _next_opponent(self, page: Page = None) -> bool:
+        """Click "New Opponent" and wait for the next candidate; False if there is no such button"""
+        page = page or self.page
+        new_opp_button = page.locator('img[src*="btn_neuer_gegner"]')
+        with self.metrics.op('locator_count'):
+            found = await new_opp_button.count() > 0
+        if found:
+            await self.waits.submit(page, new_opp_button.first.click, idempotent=True)
+            self.navigation.invalidate('search')
+            return True
+        self.logger.warning("Could not find 'New Opponent' button")
+        return False
+    
+    def _record_fight_outcome(self, key: str, state: PageState, my_stats: dict = None):
+        """Store the winner shown on the fight report in the opponent index
         
+        With my_stats the fight is also kept for training the win model.
+        
+        Returns:
+            True if we won, False if we lost, None if the page shows no fight report
+        """
+        if state.fight_winner is None:
+            return None
+        won = state.fight_winner.lower() == self.username.lower()
+        if key is not None:
+            self.opponent_index.record_fight(key, won, my_stats=my_stats, my_level=self.my_level,
+                                             account=self.username)
+        self.logger.info(f"Fight result: {'won' if won else 'lost'} (winner: {state.fight_winner})")
+        return won
+    
     async def can_train_with_reserve(self):
         """Check if we can train a stat and still have > 10 gold left"""
-        # Make sure we're on the attributes page to check training cost
-        if "/char/attributes" not in self.page.url:
-            await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-            await asyncio.sleep(2)
-        
-        current_gold = await self.get_current_gold()
+        # Read gold and training costs from the attributes page (read-only)
+        state = await self.fetch_state(ATTRIBUTES_PAGE)
+        current_gold = await self.get_current_gold(state)
         
         # Get all training costs
-        training_costs = await self.get_training_costs()
+        training_costs = await self.get_training_costs(state)
         has_training_available = len(training_costs) > 0
         
         if not has_training_available:
-            logger.info("Cannot train: No training buttons available (all stats maxed)")
+            self.logger.info("Cannot train: No training buttons available (all stats maxed)")
             return False
         
         # Check if we can afford the cheapest training option
@@ -840,195 +1483,330 @@ class HolyWarBot:
         can_train = (current_gold - min_training_cost) > self.min_gold_reserve
         
         if can_train:
-            logger.info(f"Can train: {current_gold} - {min_training_cost} = {current_gold - min_training_cost} > {self.min_gold_reserve}")
+            self.logger.info(f"Can train: {current_gold} - {min_training_cost} = {current_gold - min_training_cost} > {self.min_gold_reserve}")
         else:
-            logger.info(f"Cannot train: {current_gold} - {min_training_cost} = {current_gold - min_training_cost} <= {self.min_gold_reserve}")
+            self.logger.info(f"Cannot train: {current_gold} - {min_training_cost} = {current_gold - min_training_cost} <= {self.min_gold_reserve}")
         
         return can_train
     
+    async def collect_plunder(self) -> PageState:
+        """Load the attack page after a plunder ended (which pays out the gold) and journal the gain"""
+        self.navigation.invalidate('plunder_complete')
+        state = await self.fetch_state(ATTACK_PAGE)
+        if self.plunder_start_gold is not None and state.gold is not None:
+            gold_earned = state.gold - self.plunder_start_gold
+            self.record('plunder_complete', gold_earned=gold_earned)
+            if self.plunder_minutes and gold_earned > 0:
+                rate = gold_earned / self.plunder_minutes
+                previous = self.plunder_gold_per_minute
+                self.plunder_gold_per_minute = rate if previous is None else (previous + rate) / 2
+        self.plunder_start_gold = None
+        self.plunder_minutes = None
+        if self.ledger is not None:
+            self.ledger.plunder_window()
+        self.update_status(plunder_status="Idle", plunder_progress=0, last_action="Collected plunder gold",
+                           **({'gold': state.gold} if state.gold is not None else {}))
+        return state
+    
+    @timed_action
     async def check_active_plunder(self):
         """Check if already plundering and wait for it to complete"""
         try:
-            # Go to attack page to check status
-            await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-            await asyncio.sleep(2)
-            
-            content = await self.page.content()
+            # Read the attack page to check status
+            state = await self.fetch_state(ATTACK_PAGE)
             
-            if "You're now plundering" in content or "You're now protecting" in content:
-                logger.info("Detected active plunder/protection!")
+            if state.active_plunder:
+                self.logger.info("Detected active plunder/protection!")
+                self.plunder_start_gold = state.gold
                 
                 # Try to extract the remaining time from the countdown
-                import re
                 # Look for countdown timer like "0:07:04"
-                countdown_match = re.search(r'<span id="counter\d+">(\d+):(\d+):(\d+)</span>', content)
-                
-                if countdown_match:
-                    hours = int(countdown_match.group(1))
-                    minutes = int(countdown_match.group(2))
-                    seconds = int(countdown_match.group(3))
+                if state.counters:
+                    _, remaining_seconds = state.counters[0]
+                    hours, remainder = divmod(remaining_seconds, 3600)
+                    minutes, seconds = divmod(remainder, 60)
                     total_minutes = hours * 60 + minutes + (1 if seconds > 0 else 0)
+                    self.plunder_ends_at = self.clock.now() + timedelta(hours=hours, minutes=minutes, seconds=seconds)
                     
-                    logger.info(f"Plunder will complete in {hours}h {minutes}m {seconds}s ({total_minutes} minutes)")
-                    logger.info(f"Waiting for plunder to complete...")
+                    self.logger.info(f"Plunder will complete in {hours}h {minutes}m {seconds}s ({total_minutes} minutes)")
+                    self.logger.info(f"Waiting for plunder to complete...")
                     
                     # Wait for the plunder to complete with progress bar
                     # Show progress relative to plunder duration
-                    await wait_with_progress_bar(total_minutes, f"Waiting for active plunder ({total_minutes}/{self.plunder_duration_minutes} min)", self.plunder_duration_minutes)
+                    await self.wait_until(
+                        self.plunder_ends_at,
+                        f"Waiting for active plunder ({total_minutes}/{max(total_minutes, self.plunder_duration_minutes)} min)",
+                        self.plunder_ends_at - timedelta(minutes=max(total_minutes, self.plunder_duration_minutes))
+                    )
                     
                     # After waiting, go back to attack page to collect gold
-                    logger.info("Active plunder complete! Collecting gold...")
-                    await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-                    await asyncio.sleep(3)
-                    logger.info("Gold collected!")
+                    self.logger.info("Active plunder complete! Collecting gold...")
+                    await self.collect_plunder()
+                    self.logger.info("Gold collected!")
                     return True
                 else:
-                    logger.warning("Found active plunder but couldn't parse countdown. Waiting 5 minutes...")
-                    await wait_with_progress_bar(5, "Waiting for active plunder (5/10 min)", self.plunder_duration_minutes)
-                    await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-                    await asyncio.sleep(2)
+                    self.logger.warning("Found active plunder but couldn't parse countdown. Waiting 5 minutes...")
+                    due = self.clock.now() + timedelta(minutes=5)
+                    await self.wait_until(due, "Waiting for active plunder (5/10 min)",
+                                          due - timedelta(minutes=self.plunder_duration_minutes))
+                    await self.collect_plunder()
                     return True
             
-            logger.info("No active plunder detected. Ready to start!")
+            self.logger.info("No active plunder detected. Ready to start!")
             return False
             
         except Exception as e:
-            logger.error(f"Error checking active plunder: {e}")
+            self.logger.error(f"Error checking active plunder: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             return False
     
-    async def run(self):
-        """Main bot loop - follows the exact flowchart logic"""
+    async def run(self, browser: Browser = None):
+        """Main bot loop - follows the exact flowchart logic
+        
+        Args:
+            browser: Shared browser to run in (multi-account mode). If omitted the
+                     bot launches its own Firefox.
+        """
         try:
-            await self.start(headless=config.HEADLESS)
-            await self.login()
-            
-            # Check if already plundering before starting main loop
-            await self.check_active_plunder()
+            await self.start(headless=config.HEADLESS, browser=browser)
             
             # Main game loop - follows flowchart exactly
+            aborted_cycles, last_abort = 0, float('-inf')  # Cycles cut short by network failures
+            session_ready = False
             while True:
-                # Check if still logged in before each cycle
-                if not await self.ensure_logged_in():
-                    logger.error("Cannot continue - login failed. Retrying in 60 seconds...")
-                    await asyncio.sleep(60)
-                    continue
-                
-                # STEP 1: Check if we can train (and have > 10 gold left)
-                logger.info("=== Checking if we can train ===")
-                can_train = await self.can_train_with_reserve()
-                
-                if can_train:
-                    # Train stats repeatedly until we can't train anymore
-                    logger.info("Training stats...")
-                    trained, current_gold = await self.train_attributes()
-                    logger.info(f"Training complete. Gold: {current_gold}")
-                
-                # STEP 2: Go to attack page and check plunder time
-                logger.info("=== Checking plunder time ===")
-                await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-                await asyncio.sleep(2)
-                
-                self.plunder_time_remaining = await self.get_plunder_time_remaining()
-                
-                if self.plunder_time_remaining >= self.plunder_duration_minutes:
-                    # YES - We have plunder time
-                    logger.info(f"Plunder time available: {self.plunder_time_remaining} minutes")
+                try:
+                    if not session_ready:
+                        # Under the same network backoff as the cycles: a server outage at
+                        # startup must not stop (and relaunch) the bot either
+                        started = time.perf_counter()
+                        if await self.resume_session():
+                            self.startup_timings["resume"] = time.perf_counter() - started
+                        else:
+                            await self.login()
+                            self.startup_timings["login"] = time.perf_counter() - started
+                        self.logger.info(self.startup_report())
+                        
+                        # Check if already plundering before starting main loop
+                        await self.check_active_plunder()
+                        session_ready = True
+                    
+                    self.cycles += 1
+                    # Check if still logged in before each cycle
+                    if not await self.ensure_logged_in():
+                        self.logger.error("Cannot continue - login failed. Retrying in 60 seconds...")
+                        await self.wait_until(self.clock.now() + timedelta(seconds=60), "Login retry")
+                        continue
+                    
+                    # STEP 1: Check if we can train (and have > 10 gold left)
+                    self.logger.info("=== Checking if we can train ===")
+                    self.logger.info(self.navigation.report())
+                    can_train = await self.can_train_with_reserve()
                     
-                    # Check: Do I have 10 or more gold?
-                    current_gold = await self.get_current_gold()
+                    if can_train:
+                        # Train stats repeatedly until we can't train anymore
+                        self.logger.info("Training stats...")
+                        trained, current_gold = await self.train_attributes()
+                        self.logger.info(f"Training complete. Gold: {current_gold}")
+                    
+                    # STEP 2: Go to attack page and check plunder time
+                    self.logger.info("=== Checking plunder time ===")
+                    attack_page = await self.fetch_state(ATTACK_PAGE)
+                    if self.attack_ready_at is None or self.attack_ready_at <= self.clock.now():
+                        # E.g. after a restart mid-cooldown; a fight page read right after an
+                        # attack is fresher than this (possibly cached) snapshot
+                        self._learn_attack_cooldown(attack_page)
                     
-                    if current_gold >= self.min_gold_reserve:
-                        # YES - Plunder for 10 minutes
-                        logger.info(f"Gold check passed ({current_gold} >= {self.min_gold_reserve}). Starting plunder...")
-                        plunder_success = await self.do_plunder()
+                    self.plunder_time_remaining = await self.get_plunder_time_remaining(attack_page)
+                    
+                    if self.plunder_time_remaining >= self.min_plunder_minutes:
+                        # YES - We have plunder time
+                        self.logger.info(f"Plunder time available: {self.plunder_time_remaining} minutes")
                         
-                        if plunder_success:
-                            logger.info(f"Plundering for {self.plunder_duration_minutes} minutes...")
-                            await wait_with_progress_bar(self.plunder_duration_minutes, f"Plundering ({self.plunder_duration_minutes} min)", self.plunder_duration_minutes)
-                            logger.info("Plunder complete! Collecting gold...")
-                            
-                            # Go back to attack page to collect the gold
-                            await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-                            await asyncio.sleep(3)
-                            logger.info("Gold collected! Looping back to training check...")
-                            
-                            # Loop back to STEP 1 (training check)
-                            continue
-                    else:
-                        # NO - Sell cheapest elixir, then plunder
-                        logger.info(f"Gold too low ({current_gold} < {self.min_gold_reserve}). Selling elixir...")
-                        sold = await self.sell_cheapest_elixir()
+                        # Check: Do I have 10 or more gold?
+                        current_gold = await self.get_current_gold(attack_page)
                         
-                        if sold:
-                            # After selling, try to plunder
-                            logger.info("Elixir sold. Attempting to plunder...")
+                        if current_gold >= self.min_gold_reserve:
+                            # YES - Plunder for 10 minutes
+                            self.logger.info(f"Gold check passed ({current_gold} >= {self.min_gold_reserve}). Starting plunder...")
                             plunder_success = await self.do_plunder()
                             
                             if plunder_success:
-                                logger.info(f"Plundering for {self.plunder_duration_minutes} minutes...")
-                                await wait_with_progress_bar(self.plunder_duration_minutes, f"Plundering ({self.plunder_duration_minutes} min)", self.plunder_duration_minutes)
-                                logger.info("Plunder complete! Collecting gold...")
+                                self.logger.info(f"Plundering for {self.plunder_minutes} minutes...")
+                                await self.wait_until(self.plunder_ends_at, f"Plundering ({self.plunder_minutes} min)", self.last_plunder_time)
+                                self.logger.info("Plunder complete! Collecting gold...")
                                 
-                                # Go back to attack page to collect the gold
-                                await self.page.goto(f"{self.base_url}/assault/1on1/?w={self.world}")
-                                await asyncio.sleep(3)
-                                logger.info("Gold collected! Looping back to training check...")
+                                # Load the attack page to collect the gold
+                                await self.collect_plunder()
+                                self.logger.info("Gold collected! Looping back to training check...")
                                 
                                 # Loop back to STEP 1 (training check)
                                 continue
                         else:
-                            logger.warning("Could not sell elixir. May not have any elixirs.")
-                            # Continue anyway - might have enough gold now
-                            continue
-                else:
-                    # NO - No plunder time
-                    logger.info(f"No plunder time remaining ({self.plunder_time_remaining} minutes)")
-                    
-                    # Go to status page and check if we can train
-                    logger.info("Checking status page for training...")
-                    await self.page.goto(f"{self.base_url}/char/attributes/?w={self.world}")
-                    await asyncio.sleep(2)
-                    
-                    # Check if we can train
-                    can_train = await self.can_train_with_reserve()
-                    if can_train:
-                        logger.info("Can train while waiting for plunder time. Training...")
-                        trained, current_gold = await self.train_attributes()
-                    
-                    # Attack a player, wait 5 minutes, then check plunder time again
-                    logger.info("Attacking a player...")
-                    await self.attack_player()
-                    
-                    logger.info(f"Waiting {self.attack_cooldown_minutes} minutes for attack cooldown...")
-                    await wait_with_progress_bar(self.attack_cooldown_minutes, f"Attack Cooldown ({self.attack_cooldown_minutes} min)")
+                            # NO - Sell cheapest elixir, then plunder
+                            self.logger.info(f"Gold too low ({current_gold} < {self.min_gold_reserve}). Selling elixir...")
+                            sold = await self.sell_cheapest_elixir()
+                            
+                            if sold:
+                                # After selling, try to plunder
+                                self.logger.info("Elixir sold. Attempting to plunder...")
+                                plunder_success = await self.do_plunder()
+                                
+                                if plunder_success:
+                                    self.logger.info(f"Plundering for {self.plunder_minutes} minutes...")
+                                    await self.wait_until(self.plunder_ends_at, f"Plundering ({self.plunder_minutes} min)", self.last_plunder_time)
+                                    self.logger.info("Plunder complete! Collecting gold...")
+                                    
+                                    # Load the attack page to collect the gold
+                                    await self.collect_plunder()
+                                    self.logger.info("Gold collected! Looping back to training check...")
+                                    
+                                    # Loop back to STEP 1 (training check)
+                                    continue
+                            else:
+                                self.logger.warning("Could not sell elixir. May not have any elixirs.")
+                                # Continue anyway - might have enough gold now
+                                continue
+                    else:
+                        # NO - No plunder time
+                        self.logger.info(f"No plunder time remaining ({self.plunder_time_remaining} minutes)")
+                        
+                        # Check the status page to see if we can train
+                        self.logger.info("Checking status page for training...")
+                        can_train = await self.can_train_with_reserve()
+                        if can_train:
+                            self.logger.info("Can train while waiting for plunder time. Training...")
+                            trained, current_gold = await self.train_attributes()
+                        
+                        # Attack a player unless the server's countdown says the cooldown is still
+                        # running, then wait for its end and check plunder time again
+                        if self.attack_ready_at is None or self.attack_ready_at <= self.clock.now():
+                            self.logger.info("Attacking a player...")
+                            self.attack_ready_at = None
+                            await self.attack_player()
+                        if self.attack_ready_at is None or self.attack_ready_at <= self.clock.now():
+                            # The page showed no countdown (e.g. no opponent found): fall back to the fixed cooldown
+                            self.attack_ready_at = self.clock.now() + timedelta(minutes=self.attack_cooldown_minutes)
+                        
+                        # Wake at the cooldown end, or earlier if the daily plunder time resets first
+                        daily_reset = next_daily_reset(self.clock.now(), reset_hour=self.daily_reset_hour)
+                        cooldown_minutes = (self.attack_ready_at - self.clock.now()).total_seconds() / 60
+                        if daily_reset < self.attack_ready_at:
+                            self.logger.info(f"Daily reset at {daily_reset:%H:%M:%S} comes before the cooldown ends. Waiting for the reset...")
+                            await self.wait_until(daily_reset, "Daily reset")
+                        else:
+                            self.logger.info(f"Waiting {cooldown_minutes:.1f} minutes for attack cooldown (until {self.attack_ready_at:%H:%M:%S})...")
+                            await self.wait_until(self.attack_ready_at, f"Attack Cooldown ({cooldown_minutes:.0f} min)")
+                        
+                        # Loop back to STEP 2 (check plunder time)
+                        continue
                     
-                    # Loop back to STEP 2 (check plunder time)
-                    continue
-                
-                await asyncio.sleep(5)  # Small delay between cycles
+                    with self.metrics.op('sleep'):
+                        await self.clock.sleep(5)  # Small delay between cycles
+                except NavigationError as e:
+                    # The guard has already retried and paused through outages; start the
+                    # cycle over from fresh pages instead of stopping (and relaunching) the bot
+                    # Back off further while failures keep coming within 15 minutes of each other
+                    now = self.clock.monotonic()
+                    aborted_cycles = aborted_cycles + 1 if now - last_abort < 900 else 1
+                    last_abort = now
+                    delay = backoff_seconds(aborted_cycles, 10, 300)
+                    self.logger.error(f"{'Cycle' if session_ready else 'Startup'} aborted by a network failure: {e}. "
+                                      f"Starting over in {delay:.0f}s...")
+                    self.navigation.clear()
+                    self.scouted_target = None
+                    await self.clock.sleep(delay)
                 
         except KeyboardInterrupt:
-            logger.info("Bot interrupted by user")
+            self.logger.info("Bot interrupted by user")
         except Exception as e:
-            logger.error(f"Bot error: {e}")
+            self.logger.error(f"Bot error: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
         finally:
             await self.stop()
 
 
-async def main():
-    # Load configuration from config.py
-    bot = HolyWarBot(config.USERNAME, config.PASSWORD, config.WORLD)
+def build_bot(username: str, password: str, world: str, overrides: dict = None) -> HolyWarBot:
+    """Create a bot configured from config.py
+    
+    Args:
+        username: Game username
+        password: Game password
+        world: Game world (e.g. "17IN")
+        overrides: Per-account settings that replace the config.py values, keyed by
+                   bot attribute name (e.g. {"target_player_level": 2})
+    """
+    bot = HolyWarBot(username, password, world)
     
     # Apply configuration
     bot.min_gold_reserve = config.MIN_GOLD_RESERVE
     bot.elixir_threshold = config.ELIXIR_THRESHOLD
     bot.target_player_level = config.TARGET_PLAYER_LEVEL
     bot.plunder_duration_minutes = config.PLUNDER_DURATION_MINUTES
+    bot.plan_plunder_duration = getattr(config, 'PLAN_PLUNDER_DURATION', True)
     bot.attack_cooldown_minutes = config.ATTACK_COOLDOWN_MINUTES
+    bot.use_http_fast_path = getattr(config, 'HTTP_FAST_PATH', True)
+    bot.daily_reset_hour = getattr(config, 'DAILY_RESET_HOUR', 0)
+    bot.waits.timeouts.update(getattr(config, 'WAIT_TIMEOUTS', {}))
+    bot.navigation.max_age_seconds = getattr(config, 'PAGE_CACHE_MAX_AGE_SECONDS', bot.navigation.max_age_seconds)
+    bot.block_resources = getattr(config, 'BLOCK_RESOURCES', None)
+    bot.blocked_resource_types = getattr(config, 'BLOCKED_RESOURCE_TYPES', DEFAULT_BLOCKED_TYPES)
+    bot.block_third_party = getattr(config, 'BLOCK_THIRD_PARTY', True)
+    bot.read_only_javascript = getattr(config, 'READ_ONLY_JAVASCRIPT', True)
+    bot.opponent_index_path = getattr(config, 'OPPONENT_INDEX_PATH', bot.opponent_index_path)
+    bot.opponent_ttl_seconds = getattr(config, 'OPPONENT_TTL_HOURS', 24) * 3600
+    bot.win_model_path = getattr(config, 'WIN_MODEL_PATH', bot.win_model_path)
+    bot.min_win_probability = getattr(config, 'MIN_WIN_PROBABILITY', bot.min_win_probability)
+    bot.stats_dir = getattr(config, 'STATS_DIR', bot.stats_dir)
+    bot.metrics_port = getattr(config, 'METRICS_PORT', None)
+    bot.hibernate = getattr(config, 'HIBERNATE', None)
+    bot.scout_ahead = getattr(config, 'SCOUT_AHEAD', True)
+    for error_class, policy in getattr(config, 'NAV_RETRY', {}).items():
+        bot.guard.retry.setdefault(error_class, {}).update(policy)
+    bot.circuit_breaker_settings = getattr(config, 'CIRCUIT_BREAKER', {})
+    bot.capture_dir = getattr(config, 'CAPTURE_DIR', bot.capture_dir)
+    bot.capture_max = getattr(config, 'CAPTURE_MAX', bot.capture_max)
+    bot.capture_max_bytes = getattr(config, 'CAPTURE_MAX_BYTES', bot.capture_max_bytes)
+    bot.capture_screenshots = getattr(config, 'CAPTURE_SCREENSHOTS', bot.capture_screenshots)
+    session_dir = getattr(config, 'SESSION_DIR', '.sessions')
+    bot.session_path = os.path.join(session_dir, f"{username}.json") if session_dir else None
+    bot.hibernate_after_seconds = getattr(config, 'HIBERNATE_AFTER_MINUTES', 5) * 60
+    bot.hibernate_wake_seconds = getattr(config, 'HIBERNATE_WAKE_SECONDS', 30)
+    
+    for name, value in (overrides or {}).items():
+        if not hasattr(bot, name):
+            raise ValueError(f"Unknown bot setting for {username}: {name}")
+        setattr(bot, name, value)
+    
+    return bot
+
+
+def apply_process_config():
+    """Apply the config.py settings shared by every bot in this process"""
+    setup_logging(
+        log_file=getattr(config, 'LOG_FILE', None),
+        console=getattr(config, 'LOG_CONSOLE', None),
+        max_bytes=getattr(config, 'LOG_MAX_BYTES', 10 * 1024 * 1024),
+        backup_count=getattr(config, 'LOG_BACKUP_COUNT', 5),
+        rate_limits=getattr(config, 'LOG_RATE_LIMITS', None),
+    )
+    renderer = default_scheduler.renderer
+    renderer.enabled = getattr(config, 'PROGRESS_BARS', None)
+    renderer.refresh_seconds = getattr(config, 'PROGRESS_REFRESH_SECONDS', renderer.refresh_seconds)
+
+
+async def main():
+    apply_process_config()
+    
+    if getattr(config, 'ACCOUNTS', None):
+        # Several accounts configured: run them all in one shared browser
+        from multi_account import run_accounts
+        await run_accounts(config.ACCOUNTS)
+        return
+    
+    # Load configuration from config.py
+    bot = build_bot(config.USERNAME, config.PASSWORD, config.WORLD)
     
     logger.info("=== Holy War Bot Configuration ===")
     logger.info(f"Username: {config.USERNAME}")
@@ -1036,7 +1814,10 @@ async def main():
     logger.info(f"Min Gold Reserve: {config.MIN_GOLD_RESERVE}")
     logger.info(f"Elixir Threshold: {config.ELIXIR_THRESHOLD}")
     logger.info(f"Target Player Level: {config.TARGET_PLAYER_LEVEL}")
-    logger.info(f"Plunder Duration: {config.PLUNDER_DURATION_MINUTES} minutes")
+    if bot.plan_plunder_duration:
+        logger.info("Plunder Duration: planned per plunder (10-60 minutes)")
+    else:
+        logger.info(f"Plunder Duration: {config.PLUNDER_DURATION_MINUTES} minutes")
     logger.info(f"Attack Cooldown: {config.ATTACK_COOLDOWN_MINUTES} minutes")
     logger.info("==================================")
     
@@ -1044,5 +1825,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        shutdown_logging()
 
@@ -0,0 +1,189 @@
+"""
+Holy War Log Pipeline
+Keeps log writes off the event loop and the log files bounded.
+
+setup_logging() replaces the root logger's handlers with one QueueHandler:
+a logging call only checks the rate limits and puts the record on a queue.
+A QueueListener thread formats the records and writes them to the console
+and/or a log file. The file rotates by size; rotated files are gzipped
+(bot.log.1.gz, bot.log.2.gz, ...) and only the newest few are kept.
+
+Lines the bot repeats on every page read ("Current gold: ...") are
+rate-limited per logger: at most one per interval gets through, carrying
+the number of similar lines dropped since the last one.
+
+Log records go to stdout (or the file only); the progress bars
+(scheduler.ProgressRenderer) draw on stderr, so a redirected log never
+contains bar redraws.
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Message prefix -> minimum seconds between two such lines from the same logger
+DEFAULT_RATE_LIMITS = {
+    "Current gold:": 60,
+    "Plunder time remaining:": 60,
+    "Opponent stats:": 10,
+}
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of noisy lines, keeping one per interval per logger
+
+    Args:
+        limits: Message prefix -> minimum seconds between lines with that prefix
+    """
+
+    def __init__(self, limits: dict = None):
+        super().__init__()
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self._last = {}  # (logger name, prefix) -> (monotonic time of last line, lines dropped since)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.limits:
+            return True
+        message = record.getMessage()
+        for prefix, interval in self.limits.items():
+            if message.startswith(prefix):
+                break
+        else:
+            return True
+        key = (record.name, prefix)
+        now = time.monotonic()
+        with self._lock:
+            last, dropped = self._last.get(key, (None, 0))
+            if last is not None and now - last < interval:
+                self._last[key] = (last, dropped + 1)
+                return False
+            self._last[key] = (now, 0)
+        if dropped:
+            record.msg = f"{message} ({dropped} similar line(s) suppressed)"
+            record.args = None
+        return True
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def rotating_file_handler(path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                          backup_count: int = DEFAULT_BACKUP_COUNT) -> logging.Handler:
+    """Size-rotated log file whose rotated copies are gzipped (runs on the listener thread)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                   encoding='utf-8', delay=True)
+    handler.namer = lambda name: name + ".gz"
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+class LogPipeline:
+    """The root QueueHandler and the listener thread that does the writing
+
+    Args:
+        handlers: Handlers the listener writes every record to
+        rate_limits: See RateLimitFilter (None = defaults, {} = off)
+        level: Root logger level
+    """
+
+    def __init__(self, handlers, rate_limits: dict = None, level: int = logging.INFO):
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(RateLimitFilter(rate_limits))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.shared_handlers = tuple(handlers)
+        self.level = level
+        self._running = False
+
+    def add_handler(self, handler: logging.Handler):
+        """Write records to one more handler (e.g. an account's own file)"""
+        # The listener thread reads the tuple once per record, so swapping it is safe
+        self.listener.handlers = self.listener.handlers + (handler,)
+
+    def set_formatter(self, formatter: logging.Formatter):
+        """Change the line format of the console and main file handlers"""
+        for handler in self.shared_handlers:
+            handler.setFormatter(formatter)
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        self._running = True
+
+    def stop(self):
+        """Write out everything queued and close the handlers (blocking)"""
+        if not self._running:
+            return
+        self._running = False
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+_pipeline = None
+
+
+def setup_logging(log_file: str = None, console: bool = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                  backup_count: int = DEFAULT_BACKUP_COUNT, rate_limits: dict = None,
+                  level: int = logging.INFO) -> LogPipeline:
+    """Route all logging through the background pipeline (once per process)
+
+    Args:
+        log_file: Rotated log file, or None for console only
+        console: Also log to stdout; None = only without a log file or when stdout is a terminal
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated (gzipped) files kept
+        rate_limits: Message prefix -> seconds, see RateLimitFilter
+        level: Root logger level
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    if console is None:
+        console = log_file is None or sys.stdout.isatty()
+    handlers = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(stream)
+    if log_file:
+        handlers.append(rotating_file_handler(log_file, max_bytes, backup_count))
+    _pipeline = LogPipeline(handlers, rate_limits=rate_limits, level=level)
+    _pipeline.start()
+    return _pipeline
+
+
+def current_pipeline() -> LogPipeline:
+    """The running pipeline, or None if setup_logging() hasn't been called"""
+    return _pipeline
+
+
+def shutdown_logging():
+    """Flush and stop the pipeline (call before the process exits)"""
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
@@ -0,0 +1,264 @@
+"""
+Holy War Metrics
+Latency histograms, error counters and request counts for one account,
+served as Prometheus text on a localhost port.
+
+Two kinds of timings are recorded:
+    actions     high-level bot actions (do_plunder, train_attributes, ...),
+                timed by the @timed_action decorator
+    browser ops single browser/network operations (navigation, page.content(),
+                clicks, locator counts, HTTP reads, readiness waits), timed
+                with `with metrics.op("click"):`
+
+Every network request the browser context makes is counted against the
+innermost action running at the time, so the cost of each action in requests
+is visible too. Each bot has its own MetricsRegistry and its own port; every
+series carries an account label so scrapes from several accounts can be
+aggregated (p50/p99 via histogram_quantile).
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import time
+from datetime import datetime
+
+# Histogram bucket upper bounds in seconds; actions that include a plunder or
+# cooldown wait take minutes, browser ops take milliseconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+
+# Finished actions and ops kept for debug captures (see debug_capture.py)
+DEFAULT_TRACE_LENGTH = 50
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus layout)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (le, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket (like histogram_quantile)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        previous = 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == float('inf'):
+                    return lower
+                in_bucket = total - previous
+                return lower + (bound - lower) * ((rank - previous) / in_bucket if in_bucket else 0)
+            lower, previous = bound, total
+        return lower
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if bound == float('inf') else repr(float(bound))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Timer:
+    """Context manager recording one timing (and an error if the block raises)"""
+
+    def __init__(self, registry, kind: str, name: str):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if self.kind == 'action':
+            self.registry.action_stack.append(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.kind == 'action':
+            self.registry.action_stack.pop()
+        # A cancelled wait (e.g. Ctrl+C or shutdown) is not an error of the operation
+        failed = exc_type is not None and not issubclass(exc_type, (asyncio.CancelledError, KeyboardInterrupt))
+        seconds = time.perf_counter() - self.started
+        self.registry.observe(self.kind, self.name, seconds, error=failed)
+        self.registry.trace.append((time.time() - seconds, self.kind, self.name, seconds, failed))
+        return False
+
+
+class MetricsRegistry:
+    """Metrics of one account
+
+    Args:
+        account: Account name, used as the "account" label of every series
+        buckets: Histogram bucket upper bounds in seconds
+        trace_length: Finished actions and ops remembered for recent_trace()
+    """
+
+    def __init__(self, account: str, buckets=DEFAULT_BUCKETS, trace_length: int = DEFAULT_TRACE_LENGTH):
+        self.account = account
+        self.buckets = buckets
+        self.histograms = {}  # (kind, name) -> Histogram
+        self.errors = {}  # (kind, name) -> count
+        self.requests = {}  # action -> count
+        self.action_stack = []
+        self.trace = collections.deque(maxlen=trace_length)  # (started, kind, name, seconds, failed)
+
+    @property
+    def current_action(self) -> str:
+        return self.action_stack[-1] if self.action_stack else "idle"
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        """Record one timing; kind is "action" or "op\""""
+        key = (kind, name)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        if error:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def action(self, name: str) -> _Timer:
+        """Time a high-level action; requests made inside it are counted against it"""
+        return _Timer(self, 'action', name)
+
+    def op(self, name: str) -> _Timer:
+        """Time a single browser or network operation"""
+        return _Timer(self, 'op', name)
+
+    def count_request(self, *_):
+        """Count one network request against the current action (usable as a request event handler)"""
+        action = self.current_action
+        self.requests[action] = self.requests.get(action, 0) + 1
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        account = _escape(self.account)
+        lines = []
+        for kind, metric, label, description in (
+            ('action', 'holywar_action_duration_seconds', 'action', 'Duration of high-level bot actions'),
+            ('op', 'holywar_browser_op_duration_seconds', 'op', 'Duration of single browser and network operations'),
+        ):
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (hist_kind, name), histogram in sorted(self.histograms.items()):
+                if hist_kind != kind:
+                    continue
+                labels = f'account="{account}",{label}="{_escape(name)}"'
+                for bound, total in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{{{labels},le="{_format_le(bound)}"}} {total}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+            errors = metric.replace('_duration_seconds', '_errors_total')
+            lines.append(f"# HELP {errors} {description} that failed")
+            lines.append(f"# TYPE {errors} counter")
+            for (error_kind, name), count in sorted(self.errors.items()):
+                if error_kind == kind:
+                    lines.append(f'{errors}{{account="{account}",{label}="{_escape(name)}"}} {count}')
+        lines.append("# HELP holywar_requests_total Network requests made, by the action that caused them")
+        lines.append("# TYPE holywar_requests_total counter")
+        for action, count in sorted(self.requests.items()):
+            lines.append(f'holywar_requests_total{{account="{account}",action="{_escape(action)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def recent_trace(self) -> list:
+        """The last finished actions and ops, oldest first, plus the actions still running"""
+        steps = [{'started': datetime.fromtimestamp(started).isoformat(timespec='milliseconds'),
+                  'kind': kind, 'name': name, 'seconds': round(seconds, 4), 'failed': failed}
+                 for started, kind, name, seconds, failed in self.trace]
+        steps.extend({'started': '', 'kind': 'action', 'name': f"{name} (running)", 'seconds': 0.0, 'failed': False}
+                     for name in self.action_stack)
+        return steps
+
+    def report(self) -> str:
+        """One line per action: count, p50, p99, errors and requests"""
+        lines = []
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            if kind != 'action':
+                continue
+            lines.append(f"{name}: {histogram.count} runs, p50 {histogram.quantile(0.5):.2f}s, "
+                         f"p99 {histogram.quantile(0.99):.2f}s, {self.errors.get((kind, name), 0)} errors, "
+                         f"{self.requests.get(name, 0)} requests")
+        return "\n".join(lines)
+
+
+def timed_action(method):
+    """Decorator timing a HolyWarBot coroutine method as an action named after it"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with self.metrics.action(method.__name__):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class MetricsServer:
+    """Minimal HTTP server answering GET /metrics with a registry's text exposition
+
+    Args:
+        registry: Metrics to serve
+        port: TCP port on 127.0.0.1
+        logger: Logger for the start line
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, logger: logging.Logger = None):
+        self.registry = registry
+        self.port = port
+        self.logger = logger or logging.getLogger(__name__)
+        self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Skip the headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode('latin-1').split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+            if path in ("/", "/metrics"):
+                status, body = "200 OK", self.registry.render()
+            else:
+                status, body = "404 Not Found", "Not found\n"
+            payload = body.encode('utf-8')
+            writer.write(
+                f"HTTP/1.0 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        self.logger.info(f"Metrics at http://127.0.0.1:{self.port}/metrics")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
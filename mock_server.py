@@ -0,0 +1,429 @@
+"""
+Holy War Mock Server
+Local stand-in for www.holy-war.net, for offline runs and benchmarks.
+
+Serves the flows the bot uses (login form, attributes/training, attack page with
+plunder, opponent search and fights, alchemist shop) on top of a small
+in-memory game state. Pages are built from the recorded attack_result.html: its
+status bar, menus and footer wrap every page (with the player's gold, level
+and name filled in), and its fight report is reused for fight results.
+Scripts are stripped, so pages load without the game's JavaScript.
+
+Any username/password logs in; each new account starts with the same
+character. Opponents are a fixed, seeded population of players. Training and
+elixir forms take a quantity; like the game, a batch the player can't afford
+in full is refused and costs nothing.
+
+The game clock can be fast-forwarded so plunders and cooldowns end without
+waiting for them:
+    POST /__mock__/advance?seconds=600   move the game clock forward
+    GET  /__mock__/stats                 request counts and game clock (JSON)
+
+Usage:
+    python3 mock_server.py [--port 8765] [--seed 1]
+Then point the bot at it with base_url = "http://127.0.0.1:8765".
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_PATH = "attack_result.html"
+FIXTURE_PLAYER = "Tvcker"  # Names and ids of the two players in the recorded fight
+FIXTURE_OPPONENT = "dickup arr"
+FIXTURE_OPPONENT_UID = "10293"
+CONTENT_START = '<td class="main_content" style="height:225px;">'
+FOOTER_TABLE = '<table id="footer_table"'
+
+STAT_NAMES = ['strength', 'attack', 'defence', 'agility', 'stamina']
+STAT_ABBREVS = ['STR', 'ATT', 'DEF', 'AGI', 'STA']
+ELIXIRS = [("Consecrated Elixir", 50), ("Baptised Elixir", 90), ("Blessed Elixir", 450)]
+PLUNDER_DURATIONS = (10, 20, 30, 40, 50, 60)
+DAILY_PLUNDER_MINUTES = 120
+ATTACK_COOLDOWN_SECONDS = 5 * 60
+SESSION_COOKIE = "HWSESSION"
+
+
+def _clock(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class Layout:
+    """Page chrome and fight report taken from the recorded fixture"""
+
+    def __init__(self, fixture_path: str = FIXTURE_PATH):
+        with open(fixture_path, encoding='utf-8') as f:
+            html = re.sub(r'<script\b.*?</script>', '', f.read(), flags=re.DOTALL | re.IGNORECASE)
+        start = html.index(CONTENT_START) + len(CONTENT_START)
+        end = html.rindex('<br></td></tr></tbody></table>', 0, html.index(FOOTER_TABLE))
+        self.head = html[:start]
+        self.fight_report = html[start:end]
+        self.foot = html[end:]
+
+    def page(self, player, content: str) -> str:
+        head = re.sub(r'<span id="spMoney">\d+</span>', f'<span id="spMoney">{player.gold}</span>', self.head)
+        head = re.sub(r'(alt="Your level"[^>]*>\s*</a>\s*<br>\s*)\d+', rf'\g<1>{player.level}', head)
+        return (head + content + self.foot).replace(FIXTURE_PLAYER, player.name)
+
+    def fight(self, player, opponent, winner: str, haul: int) -> str:
+        report = self.fight_report.replace(FIXTURE_OPPONENT, opponent.name)
+        report = report.replace(f"UID={FIXTURE_OPPONENT_UID}", f"UID={opponent.uid}")
+        report = re.sub(r'(Winner:</b>(?:\s|&nbsp;)*)[^<]+', rf'\g<1>{FIXTURE_PLAYER if winner == player.name else opponent.name}', report)
+        report = re.sub(r"(Winner's haul:</b>\s*)\d+", rf"\g<1>{haul}", report)
+        cooldown = f'<p>You can attack again in <span id="counter2">{_clock(ATTACK_COOLDOWN_SECONDS)}</span></p>'
+        return self.page(player, report + cooldown)
+
+
+class Player:
+    def __init__(self, uid: int, name: str, level: int, stats: dict, gold: int):
+        self.uid = uid
+        self.name = name
+        self.level = level
+        self.stats = stats
+        self.gold = gold
+        self.elixirs = {name: 0 for name, _ in ELIXIRS}
+        self.plunder_minutes_left = DAILY_PLUNDER_MINUTES
+        self.allowance_day = None
+        self.plunder_started = None  # (started_at, ends_at, minutes) of the running plunder
+        self.attack_ready_at = 0.0
+        self.search_level = level
+        self.opponent_uid = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.stats.values())
+
+    def training_cost(self, stat: str, ahead: int = 0) -> int:
+        """Cost of the next point of a stat (or of the point `ahead` points later)"""
+        return 5 + 3 * (self.stats[stat] + ahead)
+
+
+class GameState:
+    """The whole mock world: accounts, opponents, sessions and the game clock
+
+    Args:
+        seed: Seed for the opponent population and fight outcomes
+        opponents: Size of the opponent population
+    """
+
+    def __init__(self, seed: int = 1, opponents: int = 200):
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.offset = 0.0  # Seconds the game clock is ahead of the wall clock
+        self.players = {}  # name -> Player
+        self.sessions = {}  # token -> name
+        self.opponents = {}
+        for uid in range(20000, 20000 + opponents):
+            level = self.random.randint(1, 8)
+            stats = {stat: self.random.randint(level, level * 6) for stat in STAT_NAMES}
+            self.opponents[uid] = Player(uid, f"npc{uid}", level, stats, self.random.randint(0, 200))
+        self.requests = 0
+        self.requests_by_path = {}
+
+    def now(self) -> float:
+        return time.time() + self.offset
+
+    def login(self, name: str) -> str:
+        if name not in self.players:
+            stats = {stat: 5 for stat in STAT_NAMES}
+            self.players[name] = Player(10000 + len(self.players), name, 4, stats, 100)
+        token = uuid.uuid4().hex
+        self.sessions[token] = name
+        return token
+
+    def settle(self, player: Player):
+        """Apply everything that happened on the game clock since the player's last request"""
+        now = self.now()
+        day = datetime.fromtimestamp(now).date()
+        if player.allowance_day != day:
+            player.allowance_day = day
+            player.plunder_minutes_left = DAILY_PLUNDER_MINUTES
+        if player.plunder_started and now >= player.plunder_started[1]:
+            minutes = player.plunder_started[2]
+            player.gold += minutes * (1 + player.level // 2)
+            player.plunder_started = None
+
+    def find_opponent(self, player: Player):
+        candidates = [uid for uid, opponent in self.opponents.items() if opponent.level <= player.search_level]
+        player.opponent_uid = self.random.choice(candidates) if candidates else None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Routes requests to the page renderers; the server carries `game` and `layout`"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def game(self) -> GameState:
+        return self.server.game
+
+    @property
+    def layout(self) -> Layout:
+        return self.server.layout
+
+    # --- plumbing -------------------------------------------------------
+
+    def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=utf-8", headers: dict = None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _redirect(self, path: str, headers: dict = None):
+        self._send(303, headers={"Location": f"{path}?w=17IN", **(headers or {})})
+
+    def _form(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length).decode('utf-8') if length else ""
+        return {key: values[0] for key, values in parse_qs(data, keep_blank_values=True).items()}
+
+    def _player(self):
+        cookies = self.headers.get("Cookie", "")
+        match = re.search(rf'{SESSION_COOKIE}=([0-9a-f]+)', cookies)
+        name = self.game.sessions.get(match.group(1)) if match else None
+        return self.game.players.get(name) if name else None
+
+    def _count(self, path: str):
+        self.game.requests += 1
+        self.game.requests_by_path[path] = self.game.requests_by_path.get(path, 0) + 1
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        path = url.path if url.path.endswith("/") else url.path + "/"
+        with self.game.lock:
+            if path.startswith("/__mock__/"):
+                return self._control(path, parse_qs(url.query))
+            self._count(path)
+            form = self._form() if method == "POST" else {}
+            if path == "/auth/loginform/":
+                return self._send(200, self.login_page())
+            if path == "/auth/login/":
+                token = self.game.login(form.get("login", "player"))
+                return self._redirect("/char/attributes/", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+            if path.startswith("/public/"):
+                return self._send(404, "Not found\n", "text/plain")
+            player = self._player()
+            if player is None:
+                return self._send(200, self.login_page())
+            self.game.settle(player)
+            if path == "/char/attributes/":
+                return self._send(200, self.attributes_page(player))
+            if path == "/char/attributes/train/":
+                self.train(player, form)
+                return self._redirect("/char/attributes/")
+            if path == "/assault/1on1/":
+                return self._send(200, self.assault(player, form) if method == "POST" else self.assault_page(player))
+            if path == "/town/alchemist/":
+                return self._send(200, self.alchemist_page(player))
+            if path == "/town/alchemist/buy/":
+                self.buy(player, form)
+                return self._redirect("/town/alchemist/")
+            if path == "/town/alchemist/sell/":
+                self.sell(player, form)
+                return self._redirect("/town/alchemist/")
+            return self._send(200, self.layout.page(player, "<p>Welcome</p>"))
+
+    def _control(self, path: str, query: dict):
+        if path == "/__mock__/advance/":
+            self.game.offset += float(query.get("seconds", ["0"])[0])
+        stats = {'requests': self.game.requests, 'requests_by_path': self.game.requests_by_path,
+                 'clock_offset_seconds': self.game.offset}
+        return self._send(200, json.dumps(stats), "application/json")
+
+    # --- actions --------------------------------------------------------
+
+    def train(self, player: Player, form: dict):
+        index = int(form.get("stat", 0))
+        stat = STAT_NAMES[index]
+        points = max(1, int(form.get("quantity", "+1").lstrip("+") or 1))
+        # Each point costs more than the one before
+        total = sum(player.training_cost(stat, ahead) for ahead in range(points))
+        if player.gold < total:
+            return
+        player.gold -= total
+        player.stats[stat] += points
+
+    def buy(self, player: Player, form: dict):
+        name, cost = ELIXIRS[int(form.get("elixir", 0))]
+        count = max(1, int(form.get("quantity", "1").lstrip("+") or 1))
+        if player.gold >= cost * count:
+            player.gold -= cost * count
+            player.elixirs[name] += count
+
+    def sell(self, player: Player, form: dict):
+        name, cost = ELIXIRS[int(form.get("elixir", 0))]
+        if player.elixirs[name] > 0:
+            player.elixirs[name] -= 1
+            player.gold += cost // 2
+
+    def assault(self, player: Player, form: dict) -> str:
+        now = self.game.now()
+        if "PLUNDER_ACTION" in form and not player.plunder_started:
+            minutes = int(form.get("ravageTime", 10))
+            if minutes in PLUNDER_DURATIONS and minutes <= player.plunder_minutes_left:
+                player.plunder_minutes_left -= minutes
+                player.plunder_started = (now, now + minutes * 60, minutes)
+        elif "Search" in form:
+            player.search_level = int(form.get("level") or player.level)
+            self.game.find_opponent(player)
+        elif "new_opponent" in form:
+            self.game.find_opponent(player)
+        elif "Attack" in form and player.opponent_uid and now >= player.attack_ready_at and not player.plunder_started:
+            return self.fight(player, self.game.opponents[player.opponent_uid])
+        return self.assault_page(player)
+
+    def fight(self, player: Player, opponent: Player) -> str:
+        chance = player.total / (player.total + opponent.total)
+        won = self.game.random.random() < chance
+        winner, loser = (player, opponent) if won else (opponent, player)
+        haul = max(1, loser.gold // 10) if loser.gold else 0
+        loser.gold -= haul
+        winner.gold += haul
+        player.attack_ready_at = self.game.now() + ATTACK_COOLDOWN_SECONDS
+        player.opponent_uid = None
+        return self.layout.fight(player, opponent, winner.name, haul)
+
+    # --- pages ----------------------------------------------------------
+
+    def login_page(self) -> str:
+        return (
+            '<html><head><title>Holy War | Login</title></head><body>'
+            '<form method="post" action="/auth/login/?w=17IN">'
+            '<input type="text" name="login"><input type="password" name="pass">'
+            '<button type="submit"><img alt="Login" src="/public/img/en/btn_login.gif"></button>'
+            '</form></body></html>'
+        )
+
+    def attributes_page(self, player: Player) -> str:
+        summary = "".join(
+            f'<td><div style="position:relative;">{abbrev}<div style="position:absolute;"><span>{player.stats[stat]}</span></div></div></td>'
+            for abbrev, stat in zip(STAT_ABBREVS, STAT_NAMES)
+        )
+        rows = "".join(
+            f'<tr><td>{stat.capitalize()}</td><td>{player.stats[stat]}</td>'
+            f'<td class="ltr" style="text-align:right;"><b><span>{player.training_cost(stat)}</span></b></td>'
+            f'<td><form method="post" action="/char/attributes/train/?w=17IN">'
+            f'<input type="hidden" name="stat" value="{index}"><input type="text" name="quantity" value="+1" size="3">'
+            f'<button type="submit" style="border:0px; padding:0px;"><img alt="Train" src="/public/img/en/btn_train.gif"></button>'
+            f'</form></td></tr>'
+            for index, stat in enumerate(STAT_NAMES)
+        )
+        return self.layout.page(player, f'<b>Attributes</b><table><tbody><tr>{summary}</tr></tbody></table>'
+                                        f'<table><tbody>{rows}</tbody></table>')
+
+    def assault_page(self, player: Player) -> str:
+        now = self.game.now()
+        if player.plunder_started:
+            # The opponent search stays open while plundering; only the fight itself is refused
+            return self.layout.page(player, (
+                f"<p>You're now plundering.</p>"
+                f'<p>Time left: <span id="counter1">{_clock(player.plunder_started[1] - now)}</span></p>'
+            ) + self.attack_section(player))
+        options = "".join(f'<option value="{minutes}">{minutes} min</option>' for minutes in PLUNDER_DURATIONS)
+        plunder = (
+            f'<p>Plunder / protect time remaining today: {player.plunder_minutes_left} min</p>'
+            f'<form method="post" action="/assault/1on1/?w=17IN"><select name="ravageTime">{options}</select>'
+            f'<button type="submit" name="PLUNDER_ACTION" value="1">Plunder</button></form>'
+        )
+        return self.layout.page(player, plunder + self.attack_section(player))
+
+    def attack_section(self, player: Player) -> str:
+        now = self.game.now()
+        if now < player.attack_ready_at:
+            attack = (f'<p>You still have to wait <span id="counter2">{_clock(player.attack_ready_at - now)}</span> '
+                      f'before you can attack again.</p>')
+        else:
+            attack = (
+                f'<form method="post" action="/assault/1on1/?w=17IN">'
+                f'<select name="searchtype"><option value="lower">Lower level</option><option value="higher">Higher level</option></select>'
+                f'<input type="text" name="level" value="{player.search_level}">'
+                f'<button type="submit" name="Search" value="1">Search</button></form>'
+            )
+            if player.opponent_uid:
+                attack += self.opponent_block(self.game.opponents[player.opponent_uid])
+        return attack
+
+    def opponent_block(self, opponent: Player) -> str:
+        rows = f'<tr><td style="padding-left:30px;">Level</td><td>{opponent.level}</td></tr>'
+        rows += "".join(
+            f'<tr><td style="padding-left:30px;">{stat.capitalize()}</td><td>{opponent.stats[stat]}</td></tr>'
+            for stat in STAT_NAMES
+        )
+        return (
+            f'<a class="std_link" href="/char/diplomacy/profile/?w=17IN&amp;UID={opponent.uid}">{opponent.name}</a>'
+            f'<table><tbody>{rows}</tbody></table>'
+            f'<form method="post" action="/assault/1on1/?w=17IN">'
+            f'<button type="submit" name="Attack" value="1">Attack</button>'
+            f'<button type="submit" name="new_opponent" value="1" style="border:0px; padding:0px;">'
+            f'<img alt="New opponent" src="/public/img/en/btn_neuer_gegner.jpg"></button></form>'
+        )
+
+    def alchemist_page(self, player: Player) -> str:
+        forms = ""
+        for index, (name, cost) in enumerate(ELIXIRS):
+            button = "btn_kaufen.jpg" if player.gold >= cost else "btn_kaufen_x.jpg"
+            forms += (
+                f'<form method="post" action="/town/alchemist/buy/?w=17IN"><input type="hidden" name="elixir" value="{index}">'
+                f'<table><tbody><tr><th>{name}</th></tr>'
+                f'<tr><td class="ltr" style="text-align:right;"><b><span>{cost}</span></b></td></tr></tbody></table>'
+                f'<input type="text" name="quantity" value="1" size="3">'
+                f'<button type="submit" name="No alternative text available" style="border:0px; padding:0px;">'
+                f'<img alt="No alternative text available" src="/public/img/en/{button}"></button></form>'
+            )
+        for index, (name, cost) in enumerate(ELIXIRS):
+            if player.elixirs[name]:
+                forms += (
+                    f'<form method="post" action="/town/alchemist/sell/?w=17IN"><input type="hidden" name="elixir" value="{index}">'
+                    f'{name} x{player.elixirs[name]} <input type="image" alt="Sell" src="/public/img/en/btn_sell.gif"></form>'
+                )
+        return self.layout.page(player, f'<b>Alchemist</b>{forms}')
+
+
+def make_server(port: int = 8765, seed: int = 1, fixture_path: str = FIXTURE_PATH) -> ThreadingHTTPServer:
+    """Create the mock server on 127.0.0.1 (port 0 picks a free port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    server.daemon_threads = True
+    server.game = GameState(seed=seed)
+    server.layout = Layout(fixture_path)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Holy War site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fixture", default=FIXTURE_PATH)
+    args = parser.parse_args()
+    server = make_server(args.port, args.seed, args.fixture)
+    print(f"Mock Holy War server at http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Holy War Multi-Account Runner
+Runs several HolyWarBot instances in one Firefox process.
+
+Each account gets its own browser context (separate cookies, storage and page),
+its own bot state, its own log file and its own stats files (in logs/<username>/),
+while all bots share one browser and one event loop. Logins are staggered so the
+accounts don't hit the login form at the same moment.
+
+Usage:
+    Set ACCOUNTS in config.py, then run either of:
+        python3 multi_account.py
+        python3 holy_war_bot.py
+"""
+
+import asyncio
+import logging
+import os
+from playwright.async_api import async_playwright
+import config
+from holy_war_bot import apply_process_config, build_bot, logger
+from log_pipeline import current_pipeline, rotating_file_handler, shutdown_logging
+
+DEFAULT_LOGIN_STAGGER_SECONDS = 20
+DEFAULT_LOG_DIR = "logs"
+
+
+def _setup_account_logging(bot, log_dir: str):
+    """Write the bot's records to its own rotated file
+    
+    With the log pipeline running, the file is written by its listener thread
+    (only this account's records pass the filter); otherwise directly.
+    """
+    handler = rotating_file_handler(os.path.join(log_dir, f"{bot.username}.log"),
+                                    max_bytes=getattr(config, 'LOG_MAX_BYTES', 10 * 1024 * 1024),
+                                    backup_count=getattr(config, 'LOG_BACKUP_COUNT', 5))
+    pipeline = current_pipeline()
+    if pipeline is None:
+        bot.logger.addHandler(handler)
+        return
+    handler.addFilter(logging.Filter(bot.logger.name))
+    pipeline.add_handler(handler)
+
+
+async def _run_staggered(bot, browser, delay_seconds: float):
+    """Wait for this account's login slot, then run the bot's main loop"""
+    if delay_seconds > 0:
+        bot.logger.info(f"Waiting {delay_seconds:.0f}s before logging in (staggered start)...")
+        await bot.clock.sleep(delay_seconds)
+    await bot.run(browser=browser)
+
+
+async def run_accounts(accounts: list, headless: bool = None, login_stagger_seconds: float = None,
+                       log_dir: str = None):
+    """Run every configured account concurrently in one shared browser
+
+    Args:
+        accounts: List of dicts with "username", "password" and optional "world".
+                  Any other keys override that bot's settings (e.g. "target_player_level").
+        headless: Run Firefox without a window (defaults to config.HEADLESS)
+        login_stagger_seconds: Delay between consecutive account logins
+        log_dir: Directory for the per-account log files
+    """
+    if headless is None:
+        headless = config.HEADLESS
+    if login_stagger_seconds is None:
+        login_stagger_seconds = getattr(config, 'LOGIN_STAGGER_SECONDS', DEFAULT_LOGIN_STAGGER_SECONDS)
+    if log_dir is None:
+        log_dir = getattr(config, 'LOG_DIR', DEFAULT_LOG_DIR)
+    metrics_port = getattr(config, 'METRICS_PORT', None)
+
+    # Tag console lines with the logger name (which ends in the account name)
+    tagged = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] %(message)s')
+    pipeline = current_pipeline()
+    if pipeline is not None:
+        pipeline.set_formatter(tagged)
+    else:
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(tagged)
+
+    bots = []
+    for account in accounts:
+        settings = dict(account)
+        username = settings.pop('username')
+        password = settings.pop('password')
+        world = settings.pop('world', config.WORLD)
+        # Each account keeps its stats journal and snapshots next to its log file
+        settings.setdefault('stats_dir', os.path.join(log_dir, username))
+        if getattr(config, 'CAPTURE_DIR', None):
+            # One capture ring per account
+            settings.setdefault('capture_dir', os.path.join(config.CAPTURE_DIR, username))
+        if metrics_port:
+            # One metrics port per account: METRICS_PORT, METRICS_PORT + 1, ...
+            settings.setdefault('metrics_port', metrics_port + len(bots))
+        bot = build_bot(username, password, world, overrides=settings)
+        _setup_account_logging(bot, log_dir)
+        bots.append(bot)
+
+    usernames = [bot.username for bot in bots]
+    if len(set(usernames)) != len(usernames):
+        raise ValueError("Each account in ACCOUNTS must have a unique username")
+
+    logger.info(f"=== Holy War Bot: {len(bots)} accounts in one browser ===")
+    logger.info(f"Accounts: {', '.join(usernames)}")
+    logger.info(f"Login stagger: {login_stagger_seconds}s")
+
+    playwright = await async_playwright().start()
+    browser = None
+    try:
+        logger.info("Launching shared Firefox browser...")
+        browser = await playwright.firefox.launch(
+            headless=headless,
+            timeout=60000  # 60 second timeout
+        )
+
+        # Each run() handles its own errors and cleanup, so one account failing
+        # doesn't stop the others
+        results = await asyncio.gather(
+            *(_run_staggered(bot, browser, i * login_stagger_seconds) for i, bot in enumerate(bots)),
+            return_exceptions=True
+        )
+        for bot, result in zip(bots, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Account {bot.username} exited with error: {result}")
+    finally:
+        try:
+            if browser:
+                await browser.close()
+        except:
+            pass
+        await playwright.stop()
+        logger.info("All accounts stopped")
+
+
+if __name__ == "__main__":
+    accounts = getattr(config, 'ACCOUNTS', None)
+    if not accounts:
+        raise SystemExit("No ACCOUNTS configured in config.py")
+    apply_process_config()
+    try:
+        asyncio.run(run_accounts(accounts))
+    finally:
+        shutdown_logging()
@@ -0,0 +1,140 @@
+"""
+Holy War Navigation Manager
+Tracks which page the browser is on, when each page was last loaded, and which
+actions make which pages stale.
+
+Every loaded page is kept as a PageState snapshot. A navigation or fetch for a
+page whose snapshot is still fresh is served from the cache instead of going
+back to the server. Each page depends on a set of tags (its own content plus
+the gold shown in the status bar); actions invalidate tags, e.g. training
+invalidates the attributes page and gold, plundering invalidates the attack
+page. Snapshots also expire after a maximum age, since plunder time and
+countdowns change on their own.
+"""
+
+import itertools
+from urllib.parse import urlsplit
+from clock import Clock, default_clock
+
+ATTACK_PAGE = "/assault/1on1/"
+ATTRIBUTES_PAGE = "/char/attributes/"
+ALCHEMIST_PAGE = "/town/alchemist/"
+
+# What each page shows. Gold is in the status bar of every page.
+PAGE_TAGS = {
+    ATTACK_PAGE: {'gold', 'assault'},
+    ATTRIBUTES_PAGE: {'gold', 'attributes'},
+    ALCHEMIST_PAGE: {'gold', 'alchemist'},
+}
+DEFAULT_PAGE_TAGS = {'gold', 'other'}
+
+# What each action changes
+ACTION_INVALIDATES = {
+    'train': {'attributes', 'gold'},
+    'plunder': {'assault'},
+    'plunder_complete': {'assault', 'gold'},
+    'buy_elixir': {'alchemist', 'gold'},
+    'sell_elixir': {'alchemist', 'gold'},
+    'attack': {'assault', 'gold'},
+    'search': {'assault'},  # Opponent search replaces the attack page's content
+    'login': {'gold', 'assault', 'attributes', 'alchemist', 'other'},
+}
+
+DEFAULT_MAX_AGE_SECONDS = 30
+
+
+def page_path(url: str) -> str:
+    """Normalize a URL or path to the page path used as cache key ("/char/attributes/")"""
+    path = urlsplit(url).path or "/"
+    if not path.endswith("/"):
+        path += "/"
+    return path
+
+
+class NavigationManager:
+    """Freshness cache of page snapshots plus the browser page's current location
+
+    Args:
+        max_age_seconds: Snapshots older than this are never served from the cache
+        clock: Time source for snapshot ages
+    """
+
+    def __init__(self, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS, clock: Clock = None):
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock or default_clock
+        self.current_path = None  # Page the browser is showing
+        self.current_load = None  # (sequence, loaded_at) of the browser page
+        self._sequence = itertools.count(1)  # Orders loads and invalidations
+        self._snapshots = {}  # path -> (sequence, loaded_at, PageState)
+        self._invalidated = {}  # tag -> sequence of the last action that changed it
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, path: str, sequence: int, loaded_at: float) -> bool:
+        if self.clock.monotonic() - loaded_at > self.max_age_seconds:
+            return False
+        for tag in PAGE_TAGS.get(path, DEFAULT_PAGE_TAGS):
+            if self._invalidated.get(tag, 0) > sequence:
+                return False
+        return True
+
+    def lookup(self, url: str, in_browser: bool = False):
+        """Return the fresh cached snapshot for a page, or None (counted as hit/miss)
+
+        Args:
+            url: URL or path of the page
+            in_browser: Only count it as fresh if the browser page is still showing it
+                        (for navigations, which must leave the browser on that page)
+        """
+        path = page_path(url)
+        entry = self._snapshots.get(path)
+        if in_browser and not self.is_current(path):
+            entry = None
+        if entry is not None and self._is_fresh(path, entry[0], entry[1]):
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def is_current(self, url: str) -> bool:
+        """True if the browser page is showing this page and it hasn't gone stale"""
+        path = page_path(url)
+        if path != self.current_path or self.current_load is None:
+            return False
+        return self._is_fresh(path, *self.current_load)
+
+    def store(self, url: str, state, in_browser: bool = False):
+        """Remember a freshly loaded snapshot
+
+        Args:
+            url: URL or path the snapshot was loaded from
+            state: The PageState
+            in_browser: True if the browser page is now showing it
+        """
+        path = page_path(url)
+        load = (next(self._sequence), self.clock.monotonic())
+        self._snapshots[path] = (*load, state)
+        if in_browser:
+            self.current_path = path
+            self.current_load = load
+
+    def invalidate(self, action: str):
+        """Mark every page affected by an action as stale"""
+        sequence = next(self._sequence)
+        for tag in ACTION_INVALIDATES[action]:
+            self._invalidated[tag] = sequence
+
+    def clear(self):
+        """Forget every snapshot (e.g. after the browser context was replaced)"""
+        self._snapshots.clear()
+        self.current_path = None
+        self.current_load = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        return f"Navigation cache: {self.hits}/{lookups} page loads served from cache ({self.hit_rate:.0%})"
@@ -0,0 +1,224 @@
+"""
+Holy War Opponent Index
+Local SQLite store of every opponent the bot has looked at.
+
+Each time an opponent page is seen, its stats and level are appended to the
+observation history and the opponent's latest row is updated. attack_player
+uses the index to attack players it recently beat again, to skip players it
+recently lost to, and to judge an opponent from its last known stats when the
+page doesn't show them. Observations older than the TTL are treated as
+unknown, and history older than the retention period is pruned.
+
+Every fight is also kept with both sides' stats and levels at the time and
+its outcome; win_model.py learns the attack decision from that table. Fights
+are not pruned.
+
+Opponents are keyed by world and player id ("17IN:uid:10293"), or by name if
+the page doesn't show an id. Several accounts (bots) can share one database file.
+"""
+
+import sqlite3
+from clock import Clock, default_clock
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_RETENTION_SECONDS = 30 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    opponent_key TEXT NOT NULL,
+    level INTEGER,
+    strength INTEGER NOT NULL,
+    attack INTEGER NOT NULL,
+    defence INTEGER NOT NULL,
+    agility INTEGER NOT NULL,
+    stamina INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_key ON observations (opponent_key, observed_at);
+CREATE INDEX IF NOT EXISTS idx_observations_time ON observations (observed_at);
+
+CREATE TABLE IF NOT EXISTS opponents (
+    opponent_key TEXT PRIMARY KEY,
+    world TEXT NOT NULL,
+    player_id INTEGER,
+    name TEXT,
+    level INTEGER,
+    strength INTEGER NOT NULL,
+    attack INTEGER NOT NULL,
+    defence INTEGER NOT NULL,
+    agility INTEGER NOT NULL,
+    stamina INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    observed_at REAL NOT NULL,
+    last_won INTEGER,
+    last_fight_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_opponents_observed ON opponents (observed_at);
+
+CREATE TABLE IF NOT EXISTS fights (
+    id INTEGER PRIMARY KEY,
+    opponent_key TEXT NOT NULL,
+    account TEXT,
+    fought_at REAL NOT NULL,
+    won INTEGER NOT NULL,
+    my_level INTEGER,
+    my_strength INTEGER NOT NULL,
+    my_attack INTEGER NOT NULL,
+    my_defence INTEGER NOT NULL,
+    my_agility INTEGER NOT NULL,
+    my_stamina INTEGER NOT NULL,
+    opp_level INTEGER,
+    opp_strength INTEGER NOT NULL,
+    opp_attack INTEGER NOT NULL,
+    opp_defence INTEGER NOT NULL,
+    opp_agility INTEGER NOT NULL,
+    opp_stamina INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fights_time ON fights (fought_at);
+"""
+
+# PRAGMA user_version of a database migrated by this code (see OpponentIndex._migrate)
+SCHEMA_VERSION = 1
+
+STAT_COLUMNS = ('strength', 'attack', 'defence', 'agility', 'stamina')
+
+
+def opponent_key(world: str, player_id: int = None, name: str = None):
+    """Return the index key for an opponent, or None if neither id nor name is known"""
+    if player_id is not None:
+        return f"{world}:uid:{player_id}"
+    if name:
+        return f"{world}:name:{name}"
+    return None
+
+
+class OpponentIndex:
+    """SQLite-backed record of observed opponents
+
+    Args:
+        path: Database file (":memory:" for a throwaway index)
+        ttl_seconds: Observations older than this count as unknown
+        retention_seconds: Observation history older than this is deleted by prune()
+        clock: Time source for timestamps and ages
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 retention_seconds: float = DEFAULT_RETENTION_SECONDS, clock: Clock = None):
+        self.path = path
+        self.clock = clock or default_clock
+        self.ttl_seconds = ttl_seconds
+        self.retention_seconds = retention_seconds
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets several bots share the file; NORMAL sync keeps each write cheap
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+        self.prune()
+
+    def close(self):
+        self.conn.close()
+
+    def _migrate(self):
+        """Bring a database written by older code up to SCHEMA_VERSION (once per file)"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Level/total indexes of candidate queries the bot no longer runs
+            self.conn.execute("DROP INDEX IF EXISTS idx_opponents_level_total")
+            self.conn.execute("DROP INDEX IF EXISTS idx_opponents_total")
+        if version < SCHEMA_VERSION:
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def record(self, world: str, player_id: int, name: str, level: int, stats: dict, observed_at: float = None):
+        """Store one observation of an opponent's stats and return its key (None if unidentifiable)"""
+        key = opponent_key(world, player_id, name)
+        if key is None:
+            return None
+        observed_at = observed_at or self.clock.time()
+        values = [int(stats.get(column, 0)) for column in STAT_COLUMNS]
+        total = sum(values)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO observations (opponent_key, level, strength, attack, defence, agility, stamina, total, observed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, level, *values, total, observed_at)
+            )
+            self.conn.execute(
+                "INSERT INTO opponents (opponent_key, world, player_id, name, level, strength, attack, defence, agility, stamina, total, observed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (opponent_key) DO UPDATE SET "
+                "name = COALESCE(excluded.name, name), level = COALESCE(excluded.level, level), "
+                "strength = excluded.strength, attack = excluded.attack, defence = excluded.defence, "
+                "agility = excluded.agility, stamina = excluded.stamina, total = excluded.total, "
+                "observed_at = excluded.observed_at",
+                (key, world, player_id, name, level, *values, total, observed_at)
+            )
+        return key
+
+    def record_fight(self, key: str, won: bool, fought_at: float = None, my_stats: dict = None,
+                     my_level: int = None, account: str = None):
+        """Remember the outcome of the last fight against an opponent
+        
+        With my_stats, the fight is also added to the fights table, together with
+        the opponent's latest observed stats.
+        """
+        fought_at = fought_at or self.clock.time()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE opponents SET last_won = ?, last_fight_at = ? WHERE opponent_key = ?",
+                (int(won), fought_at, key)
+            )
+            if my_stats:
+                self.conn.execute(
+                    "INSERT INTO fights (opponent_key, account, fought_at, won, my_level, "
+                    "my_strength, my_attack, my_defence, my_agility, my_stamina, "
+                    "opp_level, opp_strength, opp_attack, opp_defence, opp_agility, opp_stamina) "
+                    "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, level, strength, attack, defence, agility, stamina "
+                    "FROM opponents WHERE opponent_key = ?",
+                    (key, account, fought_at, int(won), my_level,
+                     *(int(my_stats.get(column, 0)) for column in STAT_COLUMNS), key)
+                )
+
+    def fights(self, world: str = None):
+        """Every recorded fight, oldest first (optionally only one world's)"""
+        query = "SELECT * FROM fights"
+        params = ()
+        if world:
+            query += " WHERE opponent_key LIKE ?"
+            params = (f"{world}:%",)
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY fought_at", params).fetchall()]
+
+    def lookup(self, key: str):
+        """Return the opponent's latest row if it is within the TTL, else None"""
+        if key is None:
+            return None
+        row = self.conn.execute(
+            "SELECT * FROM opponents WHERE opponent_key = ? AND observed_at >= ?",
+            (key, self.clock.time() - self.ttl_seconds)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def recently_beaten(self, key: str):
+        """Return the fresh row if we won our last fight against this opponent within the TTL"""
+        row = self.lookup(key)
+        if row and row['last_won'] and row['last_fight_at'] >= self.clock.time() - self.ttl_seconds:
+            return row
+        return None
+
+    def recently_lost_to(self, key: str):
+        """Return the fresh row if we lost our last fight against this opponent within the TTL"""
+        row = self.lookup(key)
+        if row and row['last_won'] == 0 and row['last_fight_at'] >= self.clock.time() - self.ttl_seconds:
+            return row
+        return None
+
+    def prune(self):
+        """Delete observation history older than the retention period"""
+        cutoff = self.clock.time() - self.retention_seconds
+        with self.conn:
+            self.conn.execute("DELETE FROM observations WHERE observed_at < ?", (cutoff,))
+            self.conn.execute("DELETE FROM opponents WHERE observed_at < ?", (cutoff,))
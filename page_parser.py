@@ -0,0 +1,288 @@
+"""
+Holy War Page Parsers
+Reads game state out of page HTML in a single pass.
+
+They work on any HTML string, whether it came from the Playwright page
+(page.content()) or from a plain HTTP fetch, so read-only status checks
+don't need a browser navigation. PageState bundles everything the bot reads
+from one page into a single immutable snapshot, built from one HTML fetch.
+
+Extraction is one finditer() over the HTML with a combined token pattern.
+Every token starts with a literal, so the regex engine only stops at the few
+positions that can begin one. Each page type (attack, attributes, alchemist)
+gets a pattern with just the tokens that page can show; unknown pages get all
+of them. Tokens that need context (the Train button and cost of one table row,
+the name and cost of one shop form) are combined by a small state machine as
+the scan goes. parse_benchmark.py measures the parse time and allocations.
+"""
+
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from urllib.parse import urlsplit
+
+STAT_NAMES = ['strength', 'attack', 'defence', 'agility', 'stamina']
+
+# The stats page has a summary table with abbreviated names (STR, ATT, DEF, AGI, STA)
+# Pattern: <div style="position:relative;">STR<div ...><span>19</span></div></div>
+STAT_ABBREVS = {
+    'STR': 'strength',
+    'ATT': 'attack',
+    'DEF': 'defence',
+    'AGI': 'agility',
+    'STA': 'stamina'
+}
+
+# Page types, by URL path prefix
+ATTACK_KIND = 'attack'
+ATTRIBUTES_KIND = 'attributes'
+ALCHEMIST_KIND = 'alchemist'
+PAGE_KINDS = (
+    ("/assault/", ATTACK_KIND),
+    ("/char/attributes/", ATTRIBUTES_KIND),
+    ("/town/alchemist/", ALCHEMIST_KIND),
+)
+
+# (token, patterns, page kinds; None = every page). Each pattern must start with a
+# literal (no group or alternation in front) and must not consume text another
+# token starts in.
+TOKENS = (
+    # Status bar: the gold counter only exists when logged in
+    ('gold', r'<span id="spMoney">\s*(?P<gold_value>\d+)', None),
+    ('money', r'id="spMoney"', None),
+    ('level', r'alt="Your level"[^>]*>\s*</a>\s*<br>\s*(?P<level_value>\d+)', None),
+    ('login', r'alt="Login"', None),
+    ('logout', (r'logout', r'Logout', r'LOGOUT'), None),
+    # Countdown timers like <span id="counter1">0:07:04</span>
+    ('counter', r'<span id="counter(?P<counter_id>\d+)">(?P<hours>\d+):(?P<minutes>\d+):(?P<seconds>\d+)</span>', None),
+    # Attack page: plunder time, opponent and fight report
+    ('plunder', r'Plunder / protect time remaining today: (?P<plunder_value>\d+) min', {ATTACK_KIND}),
+    ('active', (r"You're now plundering", r"You're now protecting"), {ATTACK_KIND}),
+    ('opponent_stat', r'padding-left:30px;">(?P<opponent_stat_name>(?i:strength|attack|defence|agility|stamina|level))'
+                      r'</td>\s*<td[^>]*>(?P<opponent_stat_value>\d+)</td>', {ATTACK_KIND}),
+    # Opponent profile link: <a class="std_link" href="/char/diplomacy/profile/?w=17IN&amp;UID=10293">dickup arr</a>
+    ('opponent', r'href="/char/diplomacy/profile/\?[^"]*UID=(?P<opponent_uid>\d+)[^"]*">\s*(?P<opponent_name>[^<]+?)\s*</a>',
+     {ATTACK_KIND}),
+    # Fight report: <b>Winner:</b>&nbsp;Tvcker</td>
+    ('winner', r'Winner:</b>(?:\s|&nbsp;)*(?P<winner_name>[^<]+?)\s*</td>', {ATTACK_KIND}),
+    # "You can attack again in 0:04:55" after a fight, "You still have to wait <span id="counter2">0:04:10</span>
+    # before you can attack again" on the attack page (the time is read separately, it may be a counter token)
+    ('cooldown', (r'attack again in', r'Attack again in', r'ATTACK AGAIN IN', r'have to wait'), {ATTACK_KIND}),
+    # Opponent search form (hidden during the attack cooldown)
+    ('search_form', r'name="searchtype"', {ATTACK_KIND}),
+    # Attributes page: summary table and one row per stat with a Train button and its cost
+    ('my_stat', tuple(rf'{abbrev}<div[^>]*><span>(?P<my_stat_value_{abbrev}>\d+)</span>' for abbrev in STAT_ABBREVS),
+     {ATTRIBUTES_KIND}),
+    ('row_open', (r'<tr\b', r'<TR\b'), {ATTRIBUTES_KIND}),
+    ('row_close', (r'</tr>', r'</TR>'), {ATTRIBUTES_KIND}),
+    ('train', (r'alt="Train"', r'alt="train"'), {ATTRIBUTES_KIND}),
+    # Costs are in <td class="ltr"><b>XX</b></td> (training) or <td class="ltr"><b><span>XX</span></b></td> (shop)
+    ('cost', r'ltr\b[^"]*"[^>]*>\s*<b>\s*(?:<span>)?\s*(?P<cost_value>\d+)', {ATTRIBUTES_KIND, ALCHEMIST_KIND}),
+    # Alchemist: one form per elixir posting to /town/alchemist/buy/
+    ('form_open', r'action="/town/alchemist/buy/', {ALCHEMIST_KIND}),
+    ('form_close', r'</form>', {ALCHEMIST_KIND}),
+    ('form_name', r'<th>\s*(?P<form_name_value>.*?)\s*</th>', {ALCHEMIST_KIND}),
+    # A disabled buy button shows btn_kaufen_x.jpg, an active one btn_kaufen.jpg
+    ('buy_button', r'btn_kaufen(?P<buy_disabled>_x)?\.jpg', {ALCHEMIST_KIND}),
+)
+
+# The time after "attack again in" / "have to wait", on the same line
+COOLDOWN_TIME_RE = re.compile(r'.*?(\d+):(\d+):(\d+)')
+
+
+def _token_re(kind):
+    """Combined pattern for one page kind, and a map from its end-marker groups to token names
+
+    Every alternative is a top-level branch starting with a literal, which lets
+    the regex engine skip ahead to the characters that can start a token. Each
+    branch ends with an empty marker group, so match.lastgroup tells which one matched.
+    """
+    branches = []
+    markers = {}
+    for name, patterns, kinds in TOKENS:
+        if kinds is not None and kind is not None and kind not in kinds:
+            continue
+        for i, pattern in enumerate((patterns,) if isinstance(patterns, str) else patterns):
+            marker = f"{name}__{i}"
+            branches.append(f"{pattern}(?P<{marker}>)")
+            markers[marker] = name
+    return re.compile("|".join(branches)), markers
+
+
+TOKEN_RES = {kind: _token_re(kind) for kind in (None, ATTACK_KIND, ATTRIBUTES_KIND, ALCHEMIST_KIND)}
+
+
+def page_kind(url: str):
+    """Return the page type of a URL or path, or None if it isn't one with its own tokens"""
+    path = urlsplit(url).path
+    for prefix, kind in PAGE_KINDS:
+        if path.startswith(prefix):
+            return kind
+    return None
+
+
+def extract(html: str, url: str = "", username: str = None) -> dict:
+    """Scan a page once and return every value found, as PageState field values"""
+    gold = level = plunder_minutes = opponent_id = opponent_name = opponent_level = None
+    fight_winner = attack_cooldown_seconds = None
+    has_money = has_login = has_logout = active_plunder = search_form = False
+    counters = []
+    my_stats = {}
+    opponent_stats = {}
+    training_costs = []
+    offers = []
+    # Open table row (Train button seen, first cost) and open shop form (name, first cost, buttons)
+    in_row = row_train = False
+    row_cost = None
+    in_form = form_enabled = form_disabled = False
+    form_name = form_cost = None
+
+    token_re, markers = TOKEN_RES[page_kind(url)]
+    for match in token_re.finditer(html):
+        token = markers[match.lastgroup]
+        if token == 'cost':
+            value = int(match.group('cost_value'))
+            if in_row and row_cost is None:
+                row_cost = value
+            if in_form and form_cost is None:
+                form_cost = value
+        elif token == 'row_open':
+            in_row, row_train, row_cost = True, False, None
+        elif token == 'row_close':
+            # Only innermost rows count: a row closed after a nested one is not reopened
+            if in_row and row_train and row_cost is not None:
+                training_costs.append(row_cost)
+            in_row = False
+        elif token == 'train':
+            row_train = in_row
+        elif token == 'counter':
+            hours, minutes, seconds = (int(match.group(name)) for name in ('hours', 'minutes', 'seconds'))
+            counters.append((match.group('counter_id'), hours * 3600 + minutes * 60 + seconds))
+        elif token == 'gold':
+            has_money = True
+            if gold is None:
+                gold = int(match.group('gold_value'))
+        elif token == 'money':
+            has_money = True
+        elif token == 'my_stat':
+            abbrev = match.group(0)[:3]
+            my_stats.setdefault(STAT_ABBREVS[abbrev], int(match.group(f'my_stat_value_{abbrev}')))
+        elif token == 'opponent_stat':
+            name = match.group('opponent_stat_name').lower()
+            value = int(match.group('opponent_stat_value'))
+            if name == 'level':
+                if opponent_level is None:
+                    opponent_level = value
+            else:
+                opponent_stats.setdefault(name, value)
+        elif token == 'level':
+            if level is None:
+                level = int(match.group('level_value'))
+        elif token == 'login':
+            has_login = True
+        elif token == 'logout':
+            has_logout = True
+        elif token == 'plunder':
+            if plunder_minutes is None:
+                plunder_minutes = int(match.group('plunder_value'))
+        elif token == 'active':
+            active_plunder = True
+        elif token == 'search_form':
+            search_form = True
+        elif token == 'opponent':
+            if opponent_id is None:
+                opponent_id = int(match.group('opponent_uid'))
+                opponent_name = match.group('opponent_name')
+        elif token == 'winner':
+            if fight_winner is None:
+                fight_winner = match.group('winner_name').replace("&nbsp;", " ").strip()
+        elif token == 'cooldown':
+            if attack_cooldown_seconds is None:
+                time_match = COOLDOWN_TIME_RE.match(html, match.end())
+                if time_match:
+                    hours, minutes, seconds = (int(value) for value in time_match.groups())
+                    attack_cooldown_seconds = hours * 3600 + minutes * 60 + seconds
+        elif token == 'form_open':
+            in_form, form_enabled, form_disabled = True, False, False
+            form_name = form_cost = None
+        elif token == 'form_close':
+            if in_form:
+                if form_name is None or form_cost is None:
+                    offers.append(None)  # Keeps its place in the buy-form order
+                else:
+                    offers.append((form_name, form_cost, form_enabled and not form_disabled))
+            in_form = False
+        elif token == 'form_name':
+            if in_form and form_name is None:
+                form_name = match.group('form_name_value').strip()
+        elif token == 'buy_button':
+            if in_form:
+                if match.group('buy_disabled'):
+                    form_disabled = True
+                else:
+                    form_enabled = True
+
+    if has_money:
+        logged_in = True
+    elif has_login:
+        logged_in = False
+    else:
+        # Nothing on the page proves a session unless it shows our name and a logout link
+        logged_in = bool(username and has_logout and username in html)
+
+    my_stats = {name: my_stats.get(name, 0) for name in STAT_NAMES}
+    opponent_stats = {name: opponent_stats.get(name, 0) for name in STAT_NAMES}
+    return dict(
+        logged_in=logged_in,
+        gold=gold,
+        level=level,
+        plunder_minutes=plunder_minutes,
+        active_plunder=active_plunder,
+        training_costs=tuple(training_costs),
+        stats=MappingProxyType(my_stats),
+        stats_total=sum(my_stats.values()),
+        opponent_stats=MappingProxyType(opponent_stats),
+        opponent_total=sum(opponent_stats.values()),
+        opponent_id=opponent_id,
+        opponent_name=opponent_name,
+        opponent_level=opponent_level,
+        fight_winner=fight_winner,
+        counters=tuple(counters),
+        attack_cooldown_seconds=attack_cooldown_seconds,
+        search_form=search_form,
+        elixir_offers=tuple(offers),
+    )
+
+
+@dataclass(frozen=True)
+class PageState:
+    """Immutable snapshot of everything the bot reads from one loaded page
+
+    Fields are None (or empty) when the page doesn't show them, e.g. training
+    costs only exist on the attributes page.
+    """
+    url: str
+    html: str = field(repr=False)
+    logged_in: bool
+    gold: int = None
+    level: int = None
+    plunder_minutes: int = None
+    active_plunder: bool = False
+    training_costs: tuple = ()
+    stats: MappingProxyType = None
+    stats_total: int = 0
+    opponent_stats: MappingProxyType = None
+    opponent_total: int = 0
+    opponent_id: int = None
+    opponent_name: str = None
+    opponent_level: int = None
+    fight_winner: str = None
+    counters: tuple = ()
+    attack_cooldown_seconds: int = None
+    search_form: bool = False  # Attack page shows the opponent search
+    elixir_offers: tuple = ()  # Alchemist: (name, cost, buyable) or None per buy form
+
+    @classmethod
+    def from_html(cls, html: str, url: str = "", username: str = None) -> "PageState":
+        """Parse every value the page type can show out of one page's HTML"""
+        return cls(url=url, html=html, **extract(html, url, username))
@@ -0,0 +1,101 @@
+"""
+Holy War Parser Microbenchmark
+Measures how long PageState.from_html takes and how much memory it allocates,
+per page type, so parser changes can be compared.
+
+Pages measured:
+    attack_result.html     the saved fight report (attack page type)
+    attributes, attack,    pages rendered by mock_server.py inside the same
+    plundering, alchemist  fixture chrome, like the live site serves them
+    --fixture PATH         any other saved page (its type comes from --url)
+
+Reported per page: size, median and best parse time over several rounds,
+parse time per KB, peak memory allocated during one parse and the blocks
+still held afterwards (the PageState itself).
+
+Usage:
+    python3 parse_benchmark.py [--runs 500] [--fixture page.html --url /char/attributes/]
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+import mock_server
+from page_parser import PageState, page_kind
+
+
+def mock_pages(fixture_path: str = mock_server.FIXTURE_PATH):
+    """Render the mock server's pages for one account: {name: (html, url)}"""
+    game = mock_server.GameState(seed=1)
+    layout = mock_server.Layout(fixture_path)
+    # The renderers only need the handler's game and layout
+    handler = mock_server.MockHandler.__new__(mock_server.MockHandler)
+    handler.server = SimpleNamespace(game=game, layout=layout)
+    game.login("bench")
+    player = game.players["bench"]
+    player.gold = 2000
+    pages = {
+        "attributes": (handler.attributes_page(player), "/char/attributes/"),
+        "attack": (handler.assault_page(player), "/assault/1on1/"),
+        "alchemist": (handler.alchemist_page(player), "/town/alchemist/"),
+    }
+    now = game.now()
+    player.plunder_started = (now, now + 1200, 20)
+    pages["plundering"] = (handler.assault_page(player), "/assault/1on1/")
+    return pages
+
+
+def measure(html: str, url: str, runs: int, rounds: int = 5) -> dict:
+    """Time and trace PageState.from_html on one page"""
+    PageState.from_html(html, url)  # Warm up (pattern caches)
+    per_parse = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(runs):
+            PageState.from_html(html, url)
+        per_parse.append((time.perf_counter() - started) / runs)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        state = PageState.from_html(html, url)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del state
+    return {
+        'bytes': len(html),
+        'median_us': statistics.median(per_parse) * 1e6,
+        'best_us': min(per_parse) * 1e6,
+        'peak_bytes': peak - before,
+        'retained_bytes': after - before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark of the page parser")
+    parser.add_argument("--runs", type=int, default=500, help="Parses per timing round")
+    parser.add_argument("--fixture", action="append", default=[], metavar="PATH", help="Extra saved page to measure")
+    parser.add_argument("--url", action="append", default=[], help="URL or path of each --fixture (sets its page type)")
+    args = parser.parse_args()
+
+    with open(mock_server.FIXTURE_PATH, encoding='utf-8') as f:
+        pages = {mock_server.FIXTURE_PATH: (f.read(), "/assault/1on1/")}
+    pages.update(mock_pages())
+    for i, path in enumerate(args.fixture):
+        with open(path, encoding='utf-8') as f:
+            pages[path] = (f.read(), args.url[i] if i < len(args.url) else "")
+
+    print(f"{'page':<22} {'type':<11} {'KB':>6} {'median us':>10} {'best us':>9} {'us/KB':>7} {'peak KB':>8} {'kept KB':>8}")
+    for name, (html, url) in pages.items():
+        result = measure(html, url, args.runs)
+        kb = result['bytes'] / 1024
+        print(f"{name:<22} {page_kind(url) or 'any':<11} {kb:>6.1f} {result['median_us']:>10.0f} {result['best_us']:>9.0f} "
+              f"{result['median_us'] / kb:>7.1f} {result['peak_bytes'] / 1024:>8.1f} {result['retained_bytes'] / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
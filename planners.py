@@ -0,0 +1,189 @@
+"""
+Holy War Planners
+Pure planning functions that decide a whole batch of actions up front from one
+page read, so the bot can execute them in as few requests as possible.
+"""
+
+import math
+
+# Stat order on the attributes page: Strength (0), Attack (1), Defence (2), Agility (3), Stamina (4)
+STAT_LABELS = ["Strength", "Attack", "Defence", "Agility", "Stamina"]
+
+
+# Lengths offered by the attack page's ravageTime dropdown, in minutes
+PLUNDER_DURATIONS = (10, 20, 30, 40, 50, 60)
+
+# Time between one plunder ending and the next one starting (collection, training, navigation)
+PLUNDER_OVERHEAD_MINUTES = 1.0
+
+
+def stat_label(index: int) -> str:
+    return STAT_LABELS[index] if index < len(STAT_LABELS) else f"stat #{index}"
+
+
+def plan_training(costs, gold: int, reserve: int, cost_step: int = None, max_points: int = 50):
+    """Plan how many points of each stat to train with the available gold
+
+    Follows the bot's training policy point by point: train Strength while it is
+    affordable, otherwise the cheapest stat, and never let the gold drop to the
+    reserve or below (gold - cost must stay > reserve).
+
+    Each trained point makes the next one of that stat more expensive. Until the
+    increase is known (cost_step None), at most one point per stat is planned,
+    so every planned point costs exactly what the page shows.
+
+    Args:
+        costs: Current training cost of each stat, in page order
+        gold: Current gold
+        reserve: Minimum gold to keep (min_gold_reserve)
+        cost_step: Cost increase per trained point of a stat (None = not known yet)
+        max_points: Upper bound on the points planned in one batch
+
+    Returns:
+        (counts, gold_left): points to train per stat, and the gold expected afterwards
+    """
+    costs = list(costs)
+    counts = [0] * len(costs)
+    if not costs:
+        return counts, gold
+
+    for _ in range(max_points):
+        available = [cost for cost in costs if cost is not None]
+        if not available:
+            break
+        strength_cost = costs[0]
+        min_cost = min(available)
+        if strength_cost is not None and strength_cost and gold - strength_cost > reserve:
+            index = 0
+        elif gold - min_cost > reserve:
+            index = costs.index(min_cost)
+        else:
+            break
+        gold -= costs[index]
+        counts[index] += 1
+        costs[index] = None if cost_step is None else costs[index] + cost_step
+
+    return counts, gold
+
+
+def plan_elixir_basket(costs, gold: int, reserve: int, buffer: int = 30, max_items: int = 50):
+    """Plan which elixirs to buy with the gold above the reserve, in one go
+
+    Bounded knapsack under the rules of buying one elixir at a time: a purchase
+    is only made while gold > reserve + buffer, and never takes the gold below
+    the reserve. The basket spends as much as those rules allow, each elixir any
+    number of times up to max_items in total. Among baskets spending the same
+    amount the one with the fewest items wins, which favours the expensive
+    elixirs like buying the most expensive one first did.
+
+    Args:
+        costs: Cost of each elixir on offer (None = not buyable), in page order
+        gold: Current gold
+        reserve: Minimum gold to keep (min_gold_reserve)
+        buffer: Extra gold kept for plundering on top of the reserve
+        max_items: Upper bound on the elixirs bought in one basket
+
+    Returns:
+        (counts, total_cost): elixirs to buy per offer, and what they cost together
+    """
+    counts = [0] * len(costs)
+    budget = gold - reserve
+    offers = [(i, cost) for i, cost in enumerate(costs) if cost]
+    if gold <= reserve + buffer or not offers:
+        return counts, 0
+    # Work in units of the costs' common divisor to keep the table small
+    unit = 0
+    for _, cost in offers:
+        unit = math.gcd(unit, cost)
+    size = budget // unit
+    # Everything bought before the last item must leave gold > reserve + buffer
+    prefix_limit = (gold - reserve - buffer - 1) // unit
+
+    # best[b] = fewest items spending exactly b units (None = not reachable), last[b] = offer added
+    best = [0] + [None] * size
+    last = [None] * (size + 1)
+    for b in range(1, size + 1):
+        for i, cost in offers:
+            weight = cost // unit
+            if weight <= b and best[b - weight] is not None and best[b - weight] < max_items:
+                items = best[b - weight] + 1
+                if best[b] is None or items < best[b]:
+                    best[b], last[b] = items, i
+
+    # Pick the last item, then the best reachable prefix it can follow
+    choice = None  # (units spent, -items, prefix units, last offer)
+    for i, cost in offers:
+        weight = cost // unit
+        for prefix in range(min(prefix_limit, size - weight), -1, -1):
+            if best[prefix] is not None and best[prefix] < max_items:
+                candidate = (prefix + weight, -(best[prefix] + 1), prefix, i)
+                if choice is None or candidate[:2] > choice[:2]:
+                    choice = candidate
+                break
+    if choice is None:
+        return counts, 0
+    _, _, b, i = choice
+    counts[i] += 1
+    while b:
+        counts[last[b]] += 1
+        b -= costs[last[b]] // unit
+    return counts, choice[0] * unit
+
+
+def plan_plunder(minutes_left: int, gold: int, reserve: int, next_training_cost: int = None,
+                 gold_per_minute: float = None, minutes_until_reset: float = None,
+                 overhead_minutes: float = PLUNDER_OVERHEAD_MINUTES, durations=PLUNDER_DURATIONS):
+    """Choose the length of the next plunder
+
+    The payout grows with the plunder's length, so the day's plunder minutes earn
+    about the same gold however they are split. The split decides how many cycles
+    (attack page load, collection reload, training pass) that gold costs:
+
+    1. Use as few plunders as the remaining minutes allow (ceil(left / longest)).
+    2. Among the lengths that keep that minimum, take the shortest one whose
+       expected payout makes the next training point affordable, so training
+       starts earlier at no extra cycle. Otherwise take the longest.
+    3. If the daily reset comes before the last of those plunders could start,
+       the minutes not started by then are lost: take the longest plunder that
+       still leaves time to start another one before the reset, or the longest
+       one if none does.
+
+    Args:
+        minutes_left: Plunder minutes left today
+        gold: Current gold
+        reserve: Minimum gold to keep (min_gold_reserve)
+        next_training_cost: Cost of the cheapest stat to train, if known
+        gold_per_minute: Observed plunder payout per minute, if known
+        minutes_until_reset: Minutes until the daily plunder time resets, if known
+        overhead_minutes: Time between one plunder ending and the next starting
+        durations: Plunder lengths the game offers
+
+    Returns:
+        (minutes, reason): the plunder length (None if no length fits) and why it was chosen
+    """
+    options = sorted(d for d in durations if d <= minutes_left)
+    if not options:
+        return None, f"only {minutes_left} min left"
+    longest = options[-1]
+    # Minutes that can't be split into offered lengths are never used
+    usable = minutes_left - minutes_left % min(durations)
+    cycles = math.ceil(usable / longest)
+
+    if minutes_until_reset is not None:
+        last_start = usable - longest + (cycles - 1) * overhead_minutes
+        if last_start >= minutes_until_reset:
+            fits = [d for d in options if d + overhead_minutes < minutes_until_reset]
+            if fits:
+                return fits[-1], (f"daily reset in {minutes_until_reset:.0f} min, "
+                                  f"leaves time to start one more plunder before it")
+            return longest, f"daily reset in {minutes_until_reset:.0f} min, last plunder before it"
+
+    candidates = [d for d in options if math.ceil((usable - d) / longest) + 1 == cycles]
+    if gold_per_minute and next_training_cost is not None and gold - next_training_cost <= reserve:
+        for minutes in candidates:
+            if gold + minutes * gold_per_minute - next_training_cost > reserve:
+                if minutes < longest:
+                    return minutes, (f"{cycles} plunder(s) for {usable} min, "
+                                     f"the first one affords training ({next_training_cost} gold)")
+                break
+    return candidates[-1], f"{cycles} plunder(s) for {usable} min"
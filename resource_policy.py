@@ -0,0 +1,77 @@
+"""
+Holy War Resource Policy
+Request routing that keeps page loads lean.
+
+The bot only reads HTML and clicks form elements, so images, fonts, media and
+stylesheets are never needed, nor is anything from hosts other than the game.
+Blocked images are answered locally with a 1x1 transparent GIF instead of
+being aborted: the <img> elements stay in the DOM with their alt text and a
+real box, so selectors like img[alt="Train"] can still be found and clicked.
+"""
+
+import base64
+import logging
+from urllib.parse import urlsplit
+from playwright.async_api import BrowserContext, Route
+
+DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media', 'stylesheet')
+
+# 1x1 transparent GIF served in place of every blocked image
+PLACEHOLDER_GIF = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+
+def site_domain(url: str) -> str:
+    """Return the registrable part of a URL's host ("www.holy-war.net" -> "holy-war.net")"""
+    host = urlsplit(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+class ResourcePolicy:
+    """Context route handler that blocks unneeded resource types and third-party hosts
+
+    Args:
+        base_url: Game URL; its domain and subdomains count as first-party
+        blocked_types: Playwright resource types to block
+        block_third_party: Abort every request to another domain
+        logger: Logger for the install line
+    """
+
+    def __init__(self, base_url: str, blocked_types=DEFAULT_BLOCKED_TYPES, block_third_party: bool = True,
+                 logger: logging.Logger = None):
+        self.domain = site_domain(base_url)
+        self.blocked_types = frozenset(blocked_types)
+        self.block_third_party = block_third_party
+        self.logger = logger or logging.getLogger(__name__)
+        self.allowed = 0
+        self.blocked = 0
+
+    def _is_first_party(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        return host == self.domain or host.endswith("." + self.domain)
+
+    async def handle(self, route: Route):
+        request = route.request
+        if self.block_third_party and not self._is_first_party(request.url):
+            self.blocked += 1
+            await route.abort("blockedbyclient")
+            return
+        resource_type = request.resource_type
+        if resource_type in self.blocked_types:
+            self.blocked += 1
+            if resource_type == 'image':
+                await route.fulfill(status=200, content_type="image/gif", body=PLACEHOLDER_GIF)
+            else:
+                await route.abort("blockedbyclient")
+            return
+        self.allowed += 1
+        await route.continue_()
+
+    async def install(self, context: BrowserContext):
+        """Route every request of the context through this policy"""
+        await context.route("**/*", self.handle)
+        blocked = ", ".join(sorted(self.blocked_types)) or "nothing"
+        third_party = "blocked" if self.block_third_party else "allowed"
+        self.logger.info(f"Resource policy: blocking {blocked}; third-party hosts {third_party}")
+
+    def report(self) -> str:
+        return f"Resource policy: {self.blocked} requests blocked, {self.allowed} allowed"
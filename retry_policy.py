@@ -0,0 +1,243 @@
+"""
+Holy War Retry Policy
+One layer every navigation, HTTP read and form submission goes through, so a
+slow or failing game server is ridden out instead of crashing the bot.
+
+Failures are classified:
+    timeout     the page or request didn't answer in time
+    connection  refused, reset or unresolvable connection
+    server      HTTP 5xx from the game server
+Anything else (a missing button, a script error) is not a network problem and
+is raised at once.
+
+Each class has its own retry budget and exponential backoff with jitter, so
+accounts don't retry in lockstep. Form submissions that change the game
+(train, buy, plunder, attack) are never repeated; a failure is raised and
+the caller reads the page again.
+
+A circuit breaker per host counts consecutive failures. Past the threshold
+it opens: every account on that host pauses until the pause ends (longer on
+each trip), then a single probe decides whether traffic resumes. Failures of
+requests already in flight when it opened don't count; only a failed probe
+opens it again. A server
+outage therefore costs a few requests per pause instead of a retry storm or
+a restart loop.
+"""
+
+import asyncio
+import logging
+import random
+from urllib.parse import urlsplit
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from clock import Clock, default_clock
+
+# Per failure class: attempts in total, first backoff and backoff cap (seconds)
+DEFAULT_RETRY = {
+    'timeout': {'attempts': 3, 'base_seconds': 2.0, 'max_seconds': 30.0},
+    'connection': {'attempts': 4, 'base_seconds': 5.0, 'max_seconds': 60.0},
+    'server': {'attempts': 4, 'base_seconds': 5.0, 'max_seconds': 120.0},
+}
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 60.0
+DEFAULT_MAX_OPEN_SECONDS = 900.0
+
+# Substrings of Playwright/Firefox error messages that mean the connection failed
+CONNECTION_MARKERS = (
+    "NS_ERROR_NET", "NS_ERROR_CONNECTION_REFUSED", "NS_ERROR_UNKNOWN_HOST", "NS_ERROR_PROXY",
+    "ECONNREFUSED", "ECONNRESET", "ETIMEDOUT", "ENOTFOUND", "EAI_AGAIN", "socket hang up",
+    "net::ERR_",
+)
+
+
+class NavigationError(Exception):
+    """A navigation, request or submission failed for good (retries used up or not retryable)"""
+
+    def __init__(self, message: str, error_class: str = None):
+        super().__init__(message)
+        self.error_class = error_class
+
+
+class ServerError(Exception):
+    """The game server answered with a 5xx status"""
+
+    def __init__(self, status: int, url: str = ""):
+        super().__init__(f"HTTP {status} from {url}" if url else f"HTTP {status}")
+        self.status = status
+
+
+def classify_error(error: BaseException):
+    """Failure class of an exception ("timeout", "connection", "server"), or None if not a network failure"""
+    if isinstance(error, ServerError):
+        return 'server'
+    if isinstance(error, (PlaywrightTimeoutError, asyncio.TimeoutError)):
+        return 'timeout'
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        if any(marker in message for marker in CONNECTION_MARKERS):
+            return 'connection'
+    return None
+
+
+def backoff_seconds(attempt: int, base_seconds: float, max_seconds: float, rng: random.Random = random) -> float:
+    """Delay before retry number `attempt` (1-based): exponential, capped, half of it jittered"""
+    delay = min(max_seconds, base_seconds * 2 ** (attempt - 1))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one host, shared by every account on it
+
+    Args:
+        failure_threshold: Consecutive failures that open the breaker
+        open_seconds: First pause; doubled on every trip without a success in between
+        max_open_seconds: Longest pause
+        clock: Time source for the pauses
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, open_seconds: float = DEFAULT_OPEN_SECONDS,
+                 max_open_seconds: float = DEFAULT_MAX_OPEN_SECONDS, clock: Clock = None):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.clock = clock or default_clock
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = None  # Monotonic time the pause ends; None = closed
+        self._probe = None  # Task sending the half-open probe
+
+    @property
+    def state(self) -> str:
+        if self.opened_until is None:
+            return "closed"
+        return "open" if self.clock.monotonic() < self.opened_until else "half-open"
+
+    async def acquire(self, logger: logging.Logger = None):
+        """Wait until a request may go out (immediately while closed)"""
+        while self.opened_until is not None:
+            remaining = self.opened_until - self.clock.monotonic()
+            if remaining > 0:
+                if logger:
+                    logger.warning(f"Game server unavailable; pausing this account for {remaining:.0f}s")
+                await self.clock.sleep(remaining)
+            elif self._probe is not None and not self._probe.done():
+                await self.clock.sleep(1)  # Another account is probing
+            else:
+                self._probe = asyncio.current_task()
+                return
+
+    def record_success(self):
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = None
+        self._probe = None
+
+    def record_failure(self):
+        if self.opened_until is not None:
+            if self._probe is None or self._probe is not _current_task():
+                return  # Sent before the breaker opened; this pause already covers it
+        else:
+            self.failures += 1
+            if self.failures < self.failure_threshold:
+                return
+        pause = min(self.max_open_seconds, self.open_seconds * 2 ** self.trips)
+        self.trips += 1
+        self.opened_until = self.clock.monotonic() + pause
+        self._probe = None
+
+    def release(self):
+        """Give up a probe slot without a verdict (e.g. the request was cancelled)"""
+        if self._probe is _current_task():
+            self._probe = None
+
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:  # No running event loop
+        return None
+
+
+_breakers = {}
+
+
+def breaker_for(url: str, clock: Clock = None, **settings) -> CircuitBreaker:
+    """The process-wide breaker of a URL's host (created with `settings` on first use)"""
+    host = urlsplit(url).netloc or url
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(clock=clock, **settings)
+    return breaker
+
+
+class NavigationGuard:
+    """Runs network operations with classified retries, backoff and the host's circuit breaker
+
+    Args:
+        retry: Overrides for DEFAULT_RETRY, keyed by failure class
+        breaker: Circuit breaker of the game host (see breaker_for); None = no breaker
+        clock: Time source for the backoff sleeps
+        logger: Logger for retries and pauses
+    """
+
+    def __init__(self, retry: dict = None, breaker: CircuitBreaker = None, clock: Clock = None,
+                 logger: logging.Logger = None):
+        self.retry = {error_class: dict(policy) for error_class, policy in DEFAULT_RETRY.items()}
+        for error_class, policy in (retry or {}).items():
+            self.retry.setdefault(error_class, {}).update(policy)
+        self.breaker = breaker
+        self.clock = clock or default_clock
+        self.logger = logger or logging.getLogger(__name__)
+        self.rng = random.Random()
+        self.retries = {}  # failure class -> retries made
+        self.failures = {}  # failure class -> operations that failed for good
+
+    async def call(self, name: str, operation, idempotent: bool = True):
+        """Run `operation` (a zero-argument coroutine function) under the retry policy
+
+        Args:
+            name: What is being done, for the log ("navigation", "http_get", "submit", ...)
+            idempotent: Whether it is safe to repeat. Submissions that change the game
+                        are not; they fail on the first network error.
+
+        Raises:
+            NavigationError: on a network failure that wasn't (or couldn't be) retried away
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.breaker is not None:
+                await self.breaker.acquire(self.logger)
+            try:
+                result = await operation()
+            except asyncio.CancelledError:
+                if self.breaker is not None:
+                    self.breaker.release()
+                raise
+            except Exception as e:
+                error_class = classify_error(e)
+                if self.breaker is not None:
+                    # The server answered: whatever went wrong, it is up
+                    if error_class is None or (error_class == 'timeout' and name == 'submit'):
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_failure()
+                if error_class is None:
+                    raise
+                policy = self.retry.get(error_class, {'attempts': 1})
+                if not idempotent or attempt >= policy['attempts']:
+                    self.failures[error_class] = self.failures.get(error_class, 0) + 1
+                    raise NavigationError(f"{name} failed ({error_class}, attempt {attempt}): {e}", error_class) from e
+                delay = backoff_seconds(attempt, policy['base_seconds'], policy['max_seconds'], self.rng)
+                self.retries[error_class] = self.retries.get(error_class, 0) + 1
+                self.logger.warning(f"{name} failed ({error_class}): {e}. Retry {attempt}/{policy['attempts'] - 1} in {delay:.1f}s")
+                await self.clock.sleep(delay)
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+
+    def report(self) -> str:
+        retries = ", ".join(f"{error_class} {count}" for error_class, count in sorted(self.retries.items())) or "none"
+        failures = ", ".join(f"{error_class} {count}" for error_class, count in sorted(self.failures.items())) or "none"
+        return f"Network retries: {retries}; gave up: {failures}"
@@ -0,0 +1,182 @@
+"""
+Holy War Deadline Scheduler
+Central place where bots wait for absolute deadlines (plunder end, attack
+cooldown end, next daily reset).
+
+Each registered deadline is a single timer on the event loop, so a waiting bot
+is woken exactly once when its deadline is due instead of ticking every second.
+Progress bars for all pending deadlines are drawn by one shared renderer that
+refreshes at a fixed, low rate on stderr, apart from the log lines on stdout,
+and can be switched off entirely for service mode (e.g. when stderr is a file).
+
+Time comes from the scheduler's Clock; with a SimulatedClock waits return at
+once after moving the clock to the deadline, and no bars are drawn.
+"""
+
+import asyncio
+import itertools
+import sys
+from datetime import datetime, timedelta
+from clock import Clock, default_clock
+
+DEFAULT_REFRESH_SECONDS = 5
+BAR_FORMAT = '║ {desc}: {bar} {percentage:3.0f}% | {n_fmt}/{total_fmt}s ║'
+
+
+class Deadline:
+    """A pending wait registered with the scheduler"""
+
+    def __init__(self, name: str, owner: str, started_at: datetime, due: datetime):
+        self.name = name
+        self.owner = owner
+        self.started_at = started_at
+        self.due = due
+        self.bar = None
+
+    @property
+    def total_seconds(self) -> int:
+        return max(0, int((self.due - self.started_at).total_seconds()))
+
+    def elapsed_seconds(self, now: datetime) -> int:
+        return min(self.total_seconds, max(0, int((now - self.started_at).total_seconds())))
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner}: {self.name}" if self.owner else self.name
+
+
+class ProgressRenderer:
+    """One shared, rate-limited progress display for every pending deadline
+
+    Args:
+        enabled: True/False to force bars on/off, None to draw them only when
+                 the stream is a terminal (off under systemd, which logs to a file)
+        refresh_seconds: How often the bars are redrawn
+        clock: Time source for the bars' progress
+        stream: Where the bars are drawn (stderr by default, so they never mix with the log)
+    """
+
+    def __init__(self, enabled: bool = None, refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+                 clock: Clock = None, stream=None):
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock or default_clock
+        self.stream = stream
+        self._entries = []
+        self._task = None
+
+    @property
+    def active(self) -> bool:
+        if self.enabled is None:
+            return self.output.isatty()
+        return self.enabled
+
+    @property
+    def output(self):
+        return self.stream or sys.stderr
+
+    def add(self, entry: Deadline):
+        if not self.active:
+            return
+        from tqdm import tqdm
+
+        print("\n" + "="*80, file=self.output)
+        entry.bar = tqdm(total=entry.total_seconds, desc=entry.label, unit="s", file=self.output,
+                         bar_format=BAR_FORMAT,
+                         initial=entry.elapsed_seconds(self.clock.now()),
+                         ncols=78,
+                         leave=True)
+        self._entries.append(entry)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._render_loop())
+
+    def remove(self, entry: Deadline, completed: bool):
+        if entry not in self._entries:
+            return
+        self._entries.remove(entry)
+        if completed:
+            entry.bar.n = entry.total_seconds
+        entry.bar.refresh()
+        entry.bar.close()
+        print("="*80, file=self.output)
+        if not self._entries and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _render_loop(self):
+        while self._entries:
+            await asyncio.sleep(self.refresh_seconds)
+            now = self.clock.now()
+            for entry in list(self._entries):
+                entry.bar.n = entry.elapsed_seconds(now)
+                entry.bar.refresh()
+
+
+class DeadlineScheduler:
+    """Wakes each waiting task exactly once, when its absolute deadline is due
+
+    Args:
+        renderer: Progress display (a new one on the scheduler's clock by default)
+        clock: Time source; deadlines are local times on this clock
+    """
+
+    def __init__(self, renderer: ProgressRenderer = None, clock: Clock = None):
+        self.clock = clock or default_clock
+        self.renderer = renderer or ProgressRenderer(clock=self.clock)
+        self._pending = {}
+        self._ids = itertools.count()
+
+    async def wait_until(self, due: datetime, name: str, owner: str = "", started_at: datetime = None):
+        """Sleep until the given wall-clock deadline
+
+        Args:
+            due: Absolute deadline
+            name: What is being waited for (e.g. "Plundering (10 min)")
+            owner: Account name, shown next to the progress bar
+            started_at: When the awaited activity began, so the progress bar shows
+                        progress relative to its full duration (defaults to now)
+        """
+        if self.clock.simulated:
+            await self.clock.sleep_until(due)
+            return
+        now = self.clock.now()
+        entry = Deadline(name, owner, started_at or now, due)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        delay = max(0.0, (due - now).total_seconds())
+        # Deadlines are converted to the loop's monotonic clock once, at registration
+        handle = loop.call_at(loop.time() + delay, _wake, future)
+
+        entry_id = next(self._ids)
+        self._pending[entry_id] = entry
+        self.renderer.add(entry)
+        completed = False
+        try:
+            await future
+            completed = True
+        finally:
+            handle.cancel()
+            del self._pending[entry_id]
+            self.renderer.remove(entry, completed)
+
+    def pending(self):
+        """Pending deadlines, soonest first"""
+        return sorted(self._pending.values(), key=lambda entry: entry.due)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def next_daily_reset(now: datetime = None, reset_hour: int = 0) -> datetime:
+    """Return the next time the daily plunder allowance resets"""
+    now = now or default_clock.now()
+    reset = now.replace(hour=reset_hour, minute=0, second=0, microsecond=0)
+    if reset <= now:
+        reset += timedelta(days=1)
+    return reset
+
+
+# Shared by every bot in the process (multi-account mode included)
+default_scheduler = DeadlineScheduler()
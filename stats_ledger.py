@@ -0,0 +1,333 @@
+"""
+Holy War Stats Ledger
+Append-only journal of everything the bot does with gold, plus the
+bot_stats.json / bot_state.json snapshots built from it.
+
+record() applies the event to the in-memory totals and queues it; both are
+O(1), so actions never wait on the disk. A background thread writes queued
+events in batches as JSON lines, fsyncs once per batch, and rewrites the two
+snapshot files every few seconds when something changed. When the journal
+grows past its size limit it is compacted to a single checkpoint line holding
+the totals, so it stays small however long the bot runs. On startup the
+journal is replayed (last checkpoint plus the events after it) to restore the
+totals; a line cut short by a crash is skipped. Without a journal (first run,
+or stats written by an older version) the totals start from the existing
+bot_stats.json, which becomes the journal's first checkpoint.
+
+Event types and their fields:
+    plunder          minutes
+    plunder_complete gold_earned
+    train            counts (points per stat, page order), cost, first (first batch of a session)
+    buy_elixir       name, cost
+    sell_elixir      gold
+    attack           won (True/False/None if unknown), opponent
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from clock import Clock, default_clock
+
+STAT_KEYS = ('strength', 'attack', 'defence', 'agility', 'stamina')
+ELIXIR_KINDS = ('consecrated', 'baptised', 'blessed')
+
+DEFAULT_FLUSH_SECONDS = 1.0
+DEFAULT_SNAPSHOT_SECONDS = 10.0
+DEFAULT_COMPACT_BYTES = 1024 * 1024
+
+
+def empty_stats(session_start: str = None) -> dict:
+    """Totals in the bot_stats.json layout"""
+    return {
+        'session_start': session_start or datetime.now().isoformat(),
+        'total_gold_earned': 0,
+        'total_gold_spent': 0,
+        'gold_spent_on_stats': 0,
+        'gold_spent_on_elixirs': 0,
+        'stat_upgrades': {stat: 0 for stat in STAT_KEYS},
+        'elixirs_purchased': {kind: {'count': 0, 'total_cost': 0} for kind in ELIXIR_KINDS},
+        'elixirs_sold': {'count': 0, 'total_gold': 0},
+        'plunder_count': 0,
+        'plunder_total_minutes': 0,
+        'attack_count': 0,
+        'victories': 0,
+        'defeats': 0,
+        'training_sessions': 0,
+        'total_trainings': 0,
+    }
+
+
+def merge_stats(stats: dict, saved: dict) -> dict:
+    """Fill the totals from a saved bot_stats.json, keeping only known keys of the right type"""
+    for key, value in saved.items():
+        if key not in stats:
+            continue
+        if isinstance(stats[key], dict) and isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if isinstance(stats[key].get(inner_key), dict) and isinstance(inner_value, dict):
+                    merge_stats(stats[key][inner_key], inner_value)
+                elif isinstance(inner_value, dict):
+                    stats[key][inner_key] = dict(inner_value)  # E.g. an elixir kind we don't list
+                elif isinstance(inner_value, int):
+                    stats[key][inner_key] = inner_value
+        elif isinstance(value, type(stats[key])):
+            stats[key] = value
+    return stats
+
+
+def elixir_kind(name: str) -> str:
+    """Map an elixir name from the shop ("Consecrated Elixir") to its stats key"""
+    first = name.split()[0].lower() if name.split() else ""
+    return first if first in ELIXIR_KINDS else "other"
+
+
+def apply_event(stats: dict, event: dict):
+    """Fold one journal event into the totals"""
+    kind = event['type']
+    if kind == 'plunder':
+        stats['plunder_count'] += 1
+        stats['plunder_total_minutes'] += event['minutes']
+    elif kind == 'plunder_complete':
+        stats['total_gold_earned'] += max(0, event['gold_earned'])
+    elif kind == 'train':
+        points = 0
+        for stat, count in zip(STAT_KEYS, event['counts']):
+            stats['stat_upgrades'][stat] += count
+            points += count
+        stats['total_trainings'] += points
+        stats['gold_spent_on_stats'] += event['cost']
+        stats['total_gold_spent'] += event['cost']
+        if event.get('first', True):
+            stats['training_sessions'] += 1
+    elif kind == 'buy_elixir':
+        entry = stats['elixirs_purchased'].setdefault(elixir_kind(event['name']), {'count': 0, 'total_cost': 0})
+        entry['count'] += 1
+        entry['total_cost'] += event['cost']
+        stats['gold_spent_on_elixirs'] += event['cost']
+        stats['total_gold_spent'] += event['cost']
+    elif kind == 'sell_elixir':
+        stats['elixirs_sold']['count'] += 1
+        stats['elixirs_sold']['total_gold'] += event['gold']
+        stats['total_gold_earned'] += event['gold']
+    elif kind == 'attack':
+        stats['attack_count'] += 1
+        if event.get('won') is True:
+            stats['victories'] += 1
+        elif event.get('won') is False:
+            stats['defeats'] += 1
+
+
+def _write_json_atomic(path: str, data: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class StatsLedger:
+    """Journaled gold/action totals with periodic JSON snapshots
+
+    Args:
+        journal_path: Append-only JSON-lines journal
+        stats_path: Where the totals are materialized (bot_stats.json)
+        state_path: Where the current status is materialized (bot_state.json)
+        flush_seconds: Longest time an event waits in memory before being fsynced
+        snapshot_seconds: Minimum interval between snapshot rewrites
+        compact_bytes: Journal size that triggers compaction to a checkpoint
+        logger: Logger for write errors
+        clock: Time source for event and status timestamps
+    """
+
+    def __init__(self, journal_path: str, stats_path: str, state_path: str,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS, snapshot_seconds: float = DEFAULT_SNAPSHOT_SECONDS,
+                 compact_bytes: int = DEFAULT_COMPACT_BYTES, logger: logging.Logger = None,
+                 clock: Clock = None):
+        self.journal_path = journal_path
+        self.stats_path = stats_path
+        self.state_path = state_path
+        self.flush_seconds = flush_seconds
+        self.snapshot_seconds = snapshot_seconds
+        self.compact_bytes = compact_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self.clock = clock or default_clock
+
+        self.stats = self._replay()
+        self.state = {
+            'status': "Offline",
+            'gold': 0,
+            'level': 0,
+            'plunder_status': "Idle",
+            'plunder_progress': 0,
+            'plunder_time_remaining': 0,
+            'last_action': "",
+            'last_update': self.clock.now().isoformat(),
+            'stats': {stat: 0 for stat in STAT_KEYS},
+        }
+        self._plunder_window = None  # (started_at, ends_at) of the running plunder
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._dirty = True
+        self._closed = False
+        self._thread = None
+
+    def _replay(self) -> dict:
+        """Rebuild the totals from the journal (or from bot_stats.json if it has none)"""
+        stats = None
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partial line from a crash mid-write
+                    if event.get('type') == 'checkpoint':
+                        stats = event['stats']
+                        continue
+                    if stats is None:
+                        stats = empty_stats(event.get('time'))
+                    try:
+                        apply_event(stats, event)
+                    except (KeyError, TypeError):
+                        continue
+        return stats if stats is not None else self._seed()
+
+    def _seed(self) -> dict:
+        """Start the totals from an existing bot_stats.json and checkpoint them into a new journal"""
+        stats = empty_stats(self.clock.now().isoformat())
+        try:
+            with open(self.stats_path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return stats
+        if not isinstance(saved, dict):
+            return stats
+        merge_stats(stats, saved)
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._write_checkpoint(stats)
+        self.logger.info(f"Stats journal started from the totals in {self.stats_path}")
+        return stats
+
+    def _write_checkpoint(self, stats: dict):
+        """Replace the journal with a single checkpoint line of the totals"""
+        checkpoint = {'type': 'checkpoint', 'time': self.clock.now().isoformat(timespec='seconds'),
+                      'stats': stats}
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(checkpoint) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is None:
+            directory = os.path.dirname(self.journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._writer, name="stats-ledger", daemon=True)
+            self._thread.start()
+
+    def record(self, event_type: str, **fields):
+        """Append one event to the journal and the in-memory totals"""
+        event = {'type': event_type, 'time': self.clock.now().isoformat(timespec='seconds'), **fields}
+        with self._lock:
+            apply_event(self.stats, event)
+            self._queue.put(event)
+            self._dirty = True
+
+    def update_state(self, **fields):
+        """Update the bot_state.json fields (not journaled: it only shows the latest status)"""
+        with self._lock:
+            self.state.update(fields)
+            self.state['last_update'] = self.clock.now().isoformat()
+            self._dirty = True
+
+    def plunder_window(self, started_at: datetime = None, ends_at: datetime = None):
+        """Set (or clear) the running plunder, from which plunder_progress is computed"""
+        with self._lock:
+            self._plunder_window = (started_at, ends_at) if started_at and ends_at else None
+            self._dirty = True
+
+    def _writer(self):
+        journal = open(self.journal_path, 'a', encoding='utf-8')
+        last_snapshot = 0.0
+        try:
+            while True:
+                batch = []
+                try:
+                    batch.append(self._queue.get(timeout=self.flush_seconds))
+                    while True:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                stopping = None in batch
+                events = [event for event in batch if event is not None]
+                if events:
+                    journal.write("".join(json.dumps(event) + "\n" for event in events))
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                    if journal.tell() > self.compact_bytes:
+                        journal.close()
+                        self._compact()
+                        journal = open(self.journal_path, 'a', encoding='utf-8')
+                now = time.monotonic()
+                if self._dirty and (stopping or now - last_snapshot >= self.snapshot_seconds):
+                    self._write_snapshots()
+                    last_snapshot = now
+                if stopping:
+                    return
+        except Exception as e:
+            self.logger.error(f"Stats ledger writer stopped: {e}")
+        finally:
+            journal.close()
+
+    def _compact(self):
+        """Replace the journal with one checkpoint of the current totals"""
+        with self._lock:
+            # Everything still queued is already part of self.stats, so the
+            # checkpoint covers it; drop it instead of writing it twice
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stats = json.loads(json.dumps(self.stats))
+            if None in pending:
+                self._queue.put(None)
+        self._write_checkpoint(stats)
+        self.logger.debug(f"Compacted stats journal ({len(pending)} queued events folded into the checkpoint)")
+
+    def _write_snapshots(self):
+        with self._lock:
+            stats = json.loads(json.dumps(self.stats))
+            state = dict(self.state)
+            window = self._plunder_window
+            self._dirty = False
+        if window:
+            started_at, ends_at = window
+            total = (ends_at - started_at).total_seconds()
+            elapsed = (self.clock.now() - started_at).total_seconds()
+            state['plunder_progress'] = int(min(100, max(0, elapsed / total * 100))) if total > 0 else 100
+        try:
+            _write_json_atomic(self.stats_path, stats)
+            _write_json_atomic(self.state_path, state)
+        except OSError as e:
+            self.logger.warning(f"Could not write stats snapshots: {e}")
+
+    def close(self):
+        """Flush every queued event, write the final snapshots and stop the writer (blocking)"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime, timedelta
+from clock import SimulatedClock
+from debug_capture import DebugCapture, list_captures, load_capture
+
+
+def test_unusable_directory_drops_captures_and_close_returns(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    captures = DebugCapture(str(blocker / "captures"), queue_size=2)
+    for _ in range(5):
+        captures.capture("before failure", "<html></html>")
+    captures.start()
+    captures._thread.join(timeout=5)
+    assert not captures._thread.is_alive()
+
+    assert captures.capture("after failure", "<html></html>") is False
+    started = time.monotonic()
+    captures.close(timeout=1)
+    assert time.monotonic() - started < 3
+    assert captures.written == 0
+    assert captures.dropped == 6  # 3 that didn't fit the queue, 2 discarded, 1 after the failure
+
+
+def test_capture_time_comes_from_the_clock(tmp_path):
+    clock = SimulatedClock()
+    clock.offset = 3 * 24 * 3600
+    captures = DebugCapture(str(tmp_path), account="bot", clock=clock)
+    captures.start()
+    captures.capture("attack without cooldown", "<html></html>")
+    captures.close()
+
+    [path] = list_captures(str(tmp_path))
+    captured_at = datetime.fromisoformat(load_capture(path)['time'])
+    assert captured_at > datetime.now() + timedelta(days=2)
@@ -0,0 +1,39 @@
+from planners import plan_training
+
+
+def charge(stats, counts, base=5, step=3):
+    """Gold the server takes for a batch when each point costs base + step * stat (like mock_server.py)"""
+    spent = 0
+    for index, count in enumerate(counts):
+        for _ in range(count):
+            spent += base + step * stats[index]
+            stats[index] += 1
+    return spent
+
+
+def test_unknown_step_trains_one_point_per_stat():
+    counts, gold_left = plan_training([20] * 5, 100, 10)
+    assert counts == [1, 1, 1, 1, 0]
+    assert gold_left == 20
+
+
+def test_rising_cost_never_spends_the_reserve():
+    stats = [5] * 5
+    gold, reserve = 100, 10
+    cost_step = None
+    for _ in range(10):
+        costs = [5 + 3 * stat for stat in stats]
+        counts, planned = plan_training(costs, gold, reserve, cost_step=cost_step)
+        if not any(counts):
+            break
+        gold -= charge(stats, counts)
+        assert gold == planned
+        assert gold > reserve
+        cost_step = 3  # Learned from the first batch
+
+
+def test_known_step_batches_within_reserve():
+    counts, gold_left = plan_training([20, 30, 30, 30, 30], 100, 10, cost_step=3)
+    assert counts == [3, 0, 0, 0, 0]
+    assert gold_left == 100 - 20 - 23 - 26
+    assert charge([5, 8, 8, 8, 8], counts) == 100 - gold_left
@@ -0,0 +1,33 @@
+import asyncio
+from clock import SimulatedClock
+from retry_policy import CircuitBreaker
+
+
+def test_in_flight_failures_while_open_do_not_retrip():
+    async def scenario():
+        clock = SimulatedClock()
+        breaker = CircuitBreaker(failure_threshold=2, open_seconds=60, clock=clock)
+        for _ in range(2):
+            await breaker.acquire()
+        for _ in range(5):  # Several accounts' requests fail around the same time
+            breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.trips == 1
+        opened_until = breaker.opened_until
+
+        await clock.sleep(61)
+        assert breaker.state == "half-open"
+        breaker.record_failure()  # A straggler, not the probe
+        assert breaker.opened_until == opened_until
+
+        await breaker.acquire()  # This task probes
+        breaker.record_failure()
+        assert breaker.trips == 2
+        assert breaker.opened_until - clock.monotonic() > 100  # Second pause is doubled
+
+        await clock.sleep(121)
+        await breaker.acquire()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
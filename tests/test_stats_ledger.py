@@ -0,0 +1,39 @@
+import json
+from stats_ledger import StatsLedger
+
+
+def open_ledger(directory):
+    return StatsLedger(str(directory / "bot_journal.jsonl"), str(directory / "bot_stats.json"),
+                       str(directory / "bot_state.json"), flush_seconds=0.01, snapshot_seconds=0)
+
+
+def test_first_run_keeps_the_totals_of_an_existing_stats_file(tmp_path):
+    (tmp_path / "bot_stats.json").write_text(json.dumps({
+        'session_start': "2025-11-21T21:28:02",
+        'total_gold_spent': 324,
+        'gold_spent_on_stats': 324,
+        'stat_upgrades': {'strength': 0, 'attack': 1, 'defence': 1, 'agility': 1, 'stamina': 1},
+        'plunder_count': 2,
+        'plunder_total_minutes': 20,
+        'training_sessions': 2,
+        'total_trainings': 4,
+    }))
+    ledger = open_ledger(tmp_path)
+    ledger.start()
+    ledger.record('plunder', minutes=10)
+    ledger.close()
+
+    reopened = open_ledger(tmp_path)
+    assert reopened.stats['plunder_count'] == 3
+    assert reopened.stats['plunder_total_minutes'] == 30
+    assert reopened.stats['total_gold_spent'] == 324
+    assert reopened.stats['stat_upgrades']['attack'] == 1
+    assert reopened.stats['session_start'] == "2025-11-21T21:28:02"
+    assert reopened.stats['elixirs_sold'] == {'count': 0, 'total_gold': 0}
+    assert json.loads((tmp_path / "bot_stats.json").read_text())['plunder_count'] == 3
+
+
+def test_no_stats_file_starts_from_zero(tmp_path):
+    ledger = open_ledger(tmp_path)
+    assert ledger.stats['plunder_count'] == 0
+    assert not (tmp_path / "bot_journal.jsonl").exists()
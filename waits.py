@@ -0,0 +1,142 @@
+"""
+Holy War Readiness Waits
+Waits on the condition an action actually needs instead of a fixed sleep.
+
+Every wait has its own timeout and records how long it really took, so slow
+server responses show up in the numbers instead of hiding behind sleeps.
+Navigations and form submissions run through the bot's NavigationGuard
+(retry_policy.py) when one is set.
+"""
+
+import logging
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+# Default timeouts per condition, in milliseconds
+DEFAULT_TIMEOUTS = {
+    'navigation': 30000,
+    'load': 15000,
+    'url': 15000,
+    'gold': 8000,
+    'counter': 10000,
+}
+
+# Countdown spans like <span id="counter1">0:07:04</span> (the clock is counterCurrentTime)
+COUNTER_SELECTOR = 'span[id^="counter"]:not(#counterCurrentTime)'
+
+GOLD_CHANGED_JS = """(previous) => {
+    const el = document.getElementById('spMoney');
+    return el !== null && el.textContent.trim() !== String(previous);
+}"""
+
+
+class WaitStats:
+    """Timing record for one wait condition"""
+
+    def __init__(self):
+        self.count = 0
+        self.timeouts = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, timed_out: bool):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if timed_out:
+            self.timeouts += 1
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+class ReadinessWaiter:
+    """Waits for page conditions with per-condition timeouts and timing records
+
+    Condition waits return True when the condition was met and False when they
+    timed out, so callers can fall back to reading the page as it is.
+
+    Args:
+        timeouts: Overrides for DEFAULT_TIMEOUTS (milliseconds, keyed by condition)
+        logger: Logger for the per-wait debug lines and timeout warnings
+        metrics: MetricsRegistry that also receives every wait as a browser op (optional)
+        guard: NavigationGuard for retries and the circuit breaker (optional)
+    """
+
+    def __init__(self, timeouts: dict = None, logger: logging.Logger = None, metrics=None, guard=None):
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics
+        self.guard = guard
+        self.stats = {}
+
+    async def _guarded(self, name: str, operation, idempotent: bool = True):
+        if self.guard is None:
+            return await operation()
+        return await self.guard.call(name, operation, idempotent=idempotent)
+
+    async def _timed(self, condition: str, awaitable, raise_on_timeout: bool = False) -> bool:
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            await awaitable
+            return True
+        except PlaywrightTimeoutError:
+            timed_out = True
+            self.logger.warning(f"Timed out waiting for {condition} after {self.timeouts[condition]} ms")
+            if raise_on_timeout:
+                raise
+            return False
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.setdefault(condition, WaitStats()).record(elapsed, timed_out)
+            if self.metrics is not None:
+                self.metrics.observe('op', condition, elapsed, error=timed_out)
+            self.logger.debug(f"Wait for {condition}: {elapsed:.2f}s{' (timeout)' if timed_out else ''}")
+
+    async def goto(self, page: Page, url: str, wait_until: str = "load"):
+        """Navigate and wait for the given load state (retried by the guard; raises once it gives up)"""
+        await self._guarded('navigation', lambda: self._timed(
+            'navigation', page.goto(url, wait_until=wait_until, timeout=self.timeouts['navigation']),
+            raise_on_timeout=True))
+
+    async def load(self, page: Page, state: str = "load") -> bool:
+        """Wait for the page to reach a load state"""
+        return await self._timed('load', page.wait_for_load_state(state, timeout=self.timeouts['load']))
+
+    async def submit(self, page: Page, action, wait_until: str = "load", idempotent: bool = False) -> bool:
+        """Run a click that submits a form and wait for the resulting page to load
+
+        Args:
+            action: Zero-argument coroutine function performing the click
+            idempotent: Safe to resubmit after a network error (e.g. a search);
+                        submissions that spend gold or start something are not
+        """
+        async def _submit():
+            async with page.expect_navigation(wait_until=wait_until, timeout=self.timeouts['load']):
+                await action()
+        return await self._guarded('submit', lambda: self._timed('load', _submit()), idempotent=idempotent)
+
+    async def url(self, page: Page, pattern) -> bool:
+        """Wait until the page URL matches a glob, regex or predicate"""
+        return await self._timed('url', page.wait_for_url(pattern, timeout=self.timeouts['url']))
+
+    async def gold_change(self, page: Page, previous_gold: int) -> bool:
+        """Wait until the #spMoney value differs from previous_gold"""
+        return await self._timed('gold', page.wait_for_function(
+            GOLD_CHANGED_JS, arg=previous_gold, timeout=self.timeouts['gold']))
+
+    async def counter(self, page: Page) -> bool:
+        """Wait for a countdown span (counterN) to appear, e.g. after starting a plunder or attack"""
+        return await self._timed('counter', page.wait_for_selector(
+            COUNTER_SELECTOR, state="attached", timeout=self.timeouts['counter']))
+
+    def summary(self) -> str:
+        """One line per condition: count, average, max and timeouts"""
+        lines = []
+        for condition, stats in sorted(self.stats.items()):
+            lines.append(f"{condition}: {stats.count} waits, avg {stats.avg_seconds:.2f}s, "
+                         f"max {stats.max_seconds:.2f}s, {stats.timeouts} timeouts")
+        return "\n".join(lines)
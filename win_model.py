@@ -0,0 +1,205 @@
+"""
+Holy War Win Model
+Estimates the chance of winning a fight from both sides' stats and levels,
+learned from the fights the bots have recorded (opponent_index.py, fights table).
+
+The model is a logistic regression over:
+    log_ratio      log(my total / opponent total)
+    <stat>_share   (my stat - opponent stat) / (my total + opponent total), per stat
+    level_diff     (my level - opponent level) / 10
+    bias
+
+Its default weights (log_ratio 1, everything else 0) give
+my total / (my total + opponent total): attacking above the default threshold
+of 0.5, an untrained model picks exactly the opponents the old "weaker total"
+rule did. Training pulls the weights from that prior towards the recorded outcomes
+(L2 penalty towards the prior), so a few dozen fights can't swing it far.
+
+Usage:
+    python3 win_model.py train [--db opponents.db] [--out win_model.json] [--holdout 0.25] [--world 17IN]
+    python3 win_model.py evaluate [--db opponents.db] [--model win_model.json] [--holdout 0.25] [--world 17IN]
+
+train fits on the older fights and reports on the newest holdout share, then
+refits on all of them and saves the model. evaluate reports a saved model on
+the newest holdout share (or all fights with --holdout 1).
+"""
+
+import argparse
+import json
+import math
+import os
+from opponent_index import OpponentIndex, STAT_COLUMNS
+
+FEATURES = ('log_ratio',) + tuple(f"{stat}_share" for stat in STAT_COLUMNS) + ('level_diff', 'bias')
+PRIOR_WEIGHTS = {'log_ratio': 1.0}
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_L2 = 1.0
+DEFAULT_EPOCHS = 2000
+DEFAULT_LEARNING_RATE = 0.5
+
+
+def features(my_stats: dict, opp_stats: dict, my_level: int = None, opp_level: int = None):
+    """Feature vector (in FEATURES order) of one fight; a missing level counts as equal"""
+    mine = [max(0, int(my_stats.get(stat, 0))) for stat in STAT_COLUMNS]
+    theirs = [max(0, int(opp_stats.get(stat, 0))) for stat in STAT_COLUMNS]
+    my_total, opp_total = sum(mine) or 1, sum(theirs) or 1
+    combined = my_total + opp_total
+    level_diff = (my_level - opp_level) / 10 if my_level is not None and opp_level is not None else 0.0
+    return ([math.log(my_total / opp_total)]
+            + [(a - b) / combined for a, b in zip(mine, theirs)]
+            + [level_diff, 1.0])
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1 / (1 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1 + e)
+
+
+class WinModel:
+    """Logistic win-probability model
+
+    Args:
+        weights: Feature name -> weight; missing features take the prior weight
+        trained_on: Number of fights the weights were fitted to (0 = prior only)
+    """
+
+    def __init__(self, weights: dict = None, trained_on: int = 0):
+        self.weights = {name: PRIOR_WEIGHTS.get(name, 0.0) for name in FEATURES}
+        self.weights.update(weights or {})
+        self.trained_on = trained_on
+
+    def predict(self, x) -> float:
+        return _sigmoid(sum(self.weights[name] * value for name, value in zip(FEATURES, x)))
+
+    def win_probability(self, my_stats: dict, opp_stats: dict, my_level: int = None, opp_level: int = None) -> float:
+        """Chance of winning against an opponent with these stats"""
+        return self.predict(features(my_stats, opp_stats, my_level, opp_level))
+
+    def fit(self, samples, l2: float = DEFAULT_L2, epochs: int = DEFAULT_EPOCHS,
+            learning_rate: float = DEFAULT_LEARNING_RATE):
+        """Fit to [(feature vector, won)] by gradient descent, penalised towards the prior weights"""
+        samples = list(samples)
+        if not samples:
+            return self
+        prior = [PRIOR_WEIGHTS.get(name, 0.0) for name in FEATURES]
+        w = [self.weights[name] for name in FEATURES]
+        n = len(samples)
+        for _ in range(epochs):
+            gradient = [l2 * (wi - pi) / n for wi, pi in zip(w, prior)]
+            for x, won in samples:
+                error = _sigmoid(sum(wi * xi for wi, xi in zip(w, x))) - won
+                for i, xi in enumerate(x):
+                    gradient[i] += error * xi / n
+            w = [wi - learning_rate * gi for wi, gi in zip(w, gradient)]
+        self.weights = dict(zip(FEATURES, w))
+        self.trained_on = n
+        return self
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'weights': self.weights, 'trained_on': self.trained_on}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WinModel":
+        """The saved model, or the prior if the file doesn't exist"""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        return cls({name: data['weights'][name] for name in FEATURES if name in data['weights']},
+                   data.get('trained_on', 0))
+
+
+def fight_samples(rows):
+    """[(feature vector, won)] from fights table rows"""
+    samples = []
+    for row in rows:
+        my_stats = {stat: row[f"my_{stat}"] for stat in STAT_COLUMNS}
+        opp_stats = {stat: row[f"opp_{stat}"] for stat in STAT_COLUMNS}
+        samples.append((features(my_stats, opp_stats, row['my_level'], row['opp_level']), int(row['won'])))
+    return samples
+
+
+def split_chronological(samples, holdout: float):
+    """(older, newest holdout share) of samples already in time order"""
+    cut = len(samples) - int(round(len(samples) * holdout))
+    return samples[:cut], samples[cut:]
+
+
+def evaluate(model: WinModel, samples, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """Log loss, Brier score and accuracy, plus the attacks each rule would accept and their win rate"""
+    n = len(samples)
+    if not n:
+        return {'fights': 0}
+    log_loss = brier = correct = 0.0
+    accepted = accepted_won = rule_accepted = rule_won = 0
+    for x, won in samples:
+        p = min(max(model.predict(x), 1e-9), 1 - 1e-9)
+        log_loss -= math.log(p if won else 1 - p)
+        brier += (p - won) ** 2
+        correct += (p >= 0.5) == bool(won)
+        if p > threshold:
+            accepted += 1
+            accepted_won += won
+        if x[0] > 0:  # Old rule: opponent total below mine
+            rule_accepted += 1
+            rule_won += won
+    return {
+        'fights': n,
+        'log_loss': log_loss / n,
+        'brier': brier / n,
+        'accuracy': correct / n,
+        'accepted': accepted,
+        'accepted_win_rate': accepted_won / accepted if accepted else None,
+        'rule_accepted': rule_accepted,
+        'rule_win_rate': rule_won / rule_accepted if rule_accepted else None,
+    }
+
+
+def format_report(name: str, report: dict) -> str:
+    if not report['fights']:
+        return f"{name}: no fights"
+    rate = lambda value: f"{value:.0%}" if value is not None else "n/a"
+    return (f"{name}: {report['fights']} fights, log loss {report['log_loss']:.3f}, Brier {report['brier']:.3f}, "
+            f"accuracy {report['accuracy']:.0%}; would attack {report['accepted']} (won {rate(report['accepted_win_rate'])}), "
+            f"weaker-total rule {report['rule_accepted']} (won {rate(report['rule_win_rate'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the win-probability model on recorded fights")
+    parser.add_argument("command", choices=("train", "evaluate"))
+    parser.add_argument("--db", default="opponents.db", help="Opponent index with the recorded fights")
+    parser.add_argument("--model", "--out", dest="model", default="win_model.json", help="Model file")
+    parser.add_argument("--world", help="Only fights on this world")
+    parser.add_argument("--holdout", type=float, default=0.25, help="Newest share of fights held out for evaluation")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Attack above this win probability")
+    parser.add_argument("--l2", type=float, default=DEFAULT_L2, help="Pull towards the prior weights")
+    args = parser.parse_args()
+
+    index = OpponentIndex(args.db)
+    try:
+        samples = fight_samples(index.fights(args.world))
+    finally:
+        index.close()
+    if not samples:
+        raise SystemExit("No recorded fights")
+    train, test = split_chronological(samples, args.holdout)
+
+    if args.command == "train":
+        if test:
+            print(format_report("Prior", evaluate(WinModel(), test, args.threshold)))
+            print(format_report("Trained", evaluate(WinModel().fit(train, l2=args.l2), test, args.threshold)))
+        model = WinModel().fit(samples, l2=args.l2)
+        model.save(args.model)
+        weights = ", ".join(f"{name} {weight:+.3f}" for name, weight in model.weights.items())
+        print(f"Saved {args.model} ({model.trained_on} fights): {weights}")
+    else:
+        print(format_report(args.model, evaluate(WinModel.load(args.model), test or samples, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()